@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+
+def _ensure_src_on_path() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+    src_path = repo_root / "src"
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+
+
+_ensure_src_on_path()
+
+from generation_types import GenerationConfig, GenerationPlan, GenerationState
+from prompts import audit_section_prompt
+
+
+def _load_json_object(path: Path, label: str) -> dict[str, Any]:
+    payload: Any = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError(f"{label} file must contain a JSON object")
+    return payload
+
+
+def _load_state(path: Path | None, plan: GenerationPlan) -> GenerationState:
+    if path is None:
+        return GenerationState.from_plan(plan)
+    payload = _load_json_object(path, "state")
+    return GenerationState(
+        known_entities=list(payload.get("known_entities") or []),
+        terminology_map=dict(payload.get("terminology_map") or {}),
+        timeline=list(payload.get("timeline") or []),
+        covered_key_points=list(payload.get("covered_key_points") or []),
+        remaining_key_points=list(payload.get("remaining_key_points") or []),
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Report estimated token usage per part of each first-attempt section prompt (no LLM calls)."
+    )
+    parser.add_argument("--plan-path", type=Path, required=True, help="Generation plan JSON file.")
+    parser.add_argument(
+        "--state-path",
+        type=Path,
+        default=None,
+        help="Generation state JSON file. Defaults to the initial state of the plan.",
+    )
+    parser.add_argument(
+        "--recent-text-path",
+        type=Path,
+        default=None,
+        help="Text file used as the recent generated text for every section.",
+    )
+    parser.add_argument(
+        "--prompt-compression",
+        type=str,
+        choices=["on", "off"],
+        default="on",
+    )
+    parser.add_argument(
+        "--prompt-language",
+        type=str,
+        choices=["en", "zh"],
+        default="en",
+    )
+    return parser
+
+
+def audit_plan(
+    plan: GenerationPlan,
+    state: GenerationState,
+    recent_text: str,
+    config: GenerationConfig,
+) -> list[dict[str, Any]]:
+    report: list[dict[str, Any]] = []
+    for index, section in enumerate(plan.sections):
+        breakdown = audit_section_prompt(
+            plan=plan,
+            state=state,
+            section_spec=section,
+            recent_text=recent_text,
+            section_index=index,
+            config=config,
+            prompt_language=config.prompt_language,
+        )
+        report.append(
+            {
+                "section_index": index,
+                "title": section.title,
+                "total_tokens": sum(breakdown.values()),
+                "breakdown": breakdown,
+            }
+        )
+    return report
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    plan = GenerationPlan.from_dict(_load_json_object(args.plan_path, "plan"))
+    state = _load_state(args.state_path, plan)
+    recent_text = (
+        args.recent_text_path.read_text(encoding="utf-8") if args.recent_text_path else ""
+    )
+    config = GenerationConfig(
+        prompt_compression_enabled=args.prompt_compression == "on",
+        prompt_language=args.prompt_language,
+    )
+    report = audit_plan(plan=plan, state=state, recent_text=recent_text, config=config)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
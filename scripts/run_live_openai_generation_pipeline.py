@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 from dataclasses import asdict
+import hashlib
 import json
 import logging
 from pathlib import Path
@@ -157,6 +158,17 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--top-p", type=float, default=0.9)
     parser.add_argument("--max-new-tokens", type=int, default=16384)
     parser.add_argument("--prefix-window-tokens", type=int, default=1200)
+    parser.add_argument(
+        "--response-cache-dir",
+        type=str,
+        default=None,
+        help=(
+            "Optional directory caching LLM responses so reruns of the same plan skip finished calls. "
+            "Entries are scoped to the model setup (--model, --base-url, --temperature, --top-p, "
+            "--max-new-tokens, --enable-reasoning); changing any of them starts a fresh namespace "
+            "in the same directory."
+        ),
+    )
     parser.add_argument(
         "--prompt-language",
         type=str,
@@ -179,6 +191,31 @@ def _resolve_switch(raw_value: str | None, default_value: bool) -> bool:
     return raw_value == "on"
 
 
+def build_backend_config(args: argparse.Namespace) -> OpenAIBackendConfig:
+    # For generation tasks, we need JSON output and disable reasoning to avoid parsing issues
+    return OpenAIBackendConfig(
+        base_url=args.base_url or DEFAULT_BASE_URL,
+        model=args.model or DEFAULT_MODEL,
+        temperature=args.temperature,
+        top_p=args.top_p,
+        max_new_tokens=args.max_new_tokens,
+        reasoning=args.enable_reasoning if args.enable_reasoning else False
+    )
+
+
+def response_cache_namespace(backend_config: OpenAIBackendConfig) -> str:
+    """Identify the model setup, so cached responses are only replayed for the same one."""
+    setup = (
+        backend_config.model,
+        backend_config.base_url,
+        backend_config.temperature,
+        backend_config.top_p,
+        backend_config.max_new_tokens,
+        backend_config.reasoning,
+    )
+    return hashlib.blake2b(repr(setup).encode("utf-8"), digest_size=8).hexdigest()
+
+
 def resolve_generation_config(args: argparse.Namespace) -> tuple[GenerationConfig, dict[str, Any]]:
     preset = dict(PROFILE_PRESETS[args.profile])
     default_retry_strategy = str(preset.pop("section_retry_strategy", "balanced"))
@@ -209,6 +246,8 @@ def resolve_generation_config(args: argparse.Namespace) -> tuple[GenerationConfi
     config = GenerationConfig(
         prefix_window_tokens=args.prefix_window_tokens,
         prompt_language=args.prompt_language,
+        response_cache_dir=args.response_cache_dir,
+        response_cache_namespace=response_cache_namespace(build_backend_config(args)),
         **preset,
     )
     snapshot = {
@@ -229,17 +268,7 @@ def main() -> None:
     setup_logging(verbose=args.verbose)
 
     logger.info("Preparing model and pipeline configuration")
-    # For generation tasks, we need JSON output and disable reasoning to avoid parsing issues
-    model = OpenAILLMModel(
-        config=OpenAIBackendConfig(
-            base_url=args.base_url or DEFAULT_BASE_URL,
-            model=args.model or DEFAULT_MODEL,
-            temperature=args.temperature,
-            top_p=args.top_p,
-            max_new_tokens=args.max_new_tokens,
-            reasoning=args.enable_reasoning if args.enable_reasoning else False
-        )
-    )
+    model = OpenAILLMModel(config=build_backend_config(args))
 
     config, config_snapshot = resolve_generation_config(args)
     logger.info(
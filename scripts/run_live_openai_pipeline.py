@@ -73,6 +73,12 @@ def build_parser() -> argparse.ArgumentParser:
                         choices=["auto", "token", "char"],
                         help="Length calculation mode: auto (detect script), token, or char.")
     parser.add_argument("--prefix-window-tokens", type=int, default=160)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Pack up to N chunks into one request. Only applies with --prefix-window-tokens 0.",
+    )
     parser.add_argument("--temperature", type=float, default=0.2)
     parser.add_argument("--top-p", type=float, default=0.9)
     parser.add_argument("--max-new-tokens", type=int, default=240)
@@ -107,6 +113,7 @@ def main() -> None:
     logger.info(f"  chunk_size={args.chunk_size}")
     logger.info(f"  length_mode={args.length_mode}")
     logger.info(f"  prefix_window_tokens={args.prefix_window_tokens}")
+    logger.info(f"  batch_size={args.batch_size}")
     logger.info(f"  temperature={args.temperature}")
     logger.info(f"  top_p={args.top_p}")
     logger.info(f"  max_new_tokens={args.max_new_tokens}")
@@ -130,6 +137,7 @@ def main() -> None:
             chunk_size=args.chunk_size,
             length_mode=args.length_mode,
             prefix_window_tokens=args.prefix_window_tokens,
+            batch_size=args.batch_size,
             fidelity_threshold=0.0,
             max_retries=1,
             global_anchor_mode="head",
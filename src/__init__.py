@@ -32,10 +32,12 @@ from pipelines import (
 from prompts import (
     PromptLanguage,
     RewriteRequest,
+    audit_section_prompt,
     render_consistency_prompt,
     render_plan_prompt,
     render_rewrite_prompt,
     render_section_prompt,
+    render_section_prompt_batch,
     render_section_prompt_compressed,
     render_section_repair_prompt,
 )
@@ -59,14 +61,16 @@ from quality import (
     compare_chunked_vs_one_shot,
     evaluate_generation_coherence,
 )
-from tokenization import Tokenizer, WhitespaceTokenizer, take_last_tokens
+from tokenization import BatchTokenizer, Tokenizer, WhitespaceTokenizer, encode_batch, take_last_tokens
 
 __all__ = [
     "config",
     "protocols",
     "types",
     "Tokenizer",
+    "BatchTokenizer",
     "WhitespaceTokenizer",
+    "encode_batch",
     "take_last_tokens",
     "LLMTask",
     "LLMRequest",
@@ -90,6 +94,8 @@ __all__ = [
     "render_plan_prompt",
     "render_section_prompt",
     "render_section_prompt_compressed",
+    "render_section_prompt_batch",
+    "audit_section_prompt",
     "render_section_repair_prompt",
     "render_consistency_prompt",
     "FidelityVerifier",
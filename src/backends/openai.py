@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
 import os
+import random
+import re
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Callable
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Sequence
 
 from model import LLMModel, LLMRequest, RewriteModel
+from prompts.batch import parse_batch_response, render_batch_prompt
 from prompts.rephrase import RewriteRequest, render_rewrite_prompt
 
 DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
@@ -15,6 +25,26 @@ DEFAULT_TEMPERATURE = 0.4
 DEFAULT_TOP_P = 0.9
 DEFAULT_BASE_URL_ENV_VAR = "LLM_BASE_URL"
 DEFAULT_MODEL_ENV_VAR = "LLM_MODEL"
+DEFAULT_MAX_CONCURRENCY = 8
+CLIENT_CACHE_TTL_SECONDS = 3600.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 600.0
+DEFAULT_HTTPX_MAX_CONNECTIONS = 128
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_TTL_SECONDS = 3600.0
+
+logger = logging.getLogger(__name__)
+
+# Substring markers used to classify provider errors that arrive without a status code
+_ERROR_MARKER_PATTERN = re.compile(r"(429|rate limit|timeout|50[0234])", re.IGNORECASE)
+_SERVER_ERROR_MARKERS = frozenset({"500", "502", "503", "504"})
+
+_CLIENT_CACHE: dict[tuple[str, str, Any], tuple[float, Any]] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+_RESPONSE_CACHE: OrderedDict[str, tuple[float, str]] = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_RESPONSE_CACHE_STATS = {"hits": 0, "misses": 0}
 
 
 @dataclass(frozen=True)
@@ -29,29 +59,185 @@ class OpenAIBackendConfig:
     # Reasoning mode: None for default, False to disable, True to enable
     # Some models (like stepfun/step-3.5-flash) output thinking content which can break JSON parsing
     reasoning: bool | None = None
+    # Upper bound on in-flight requests (and pooled connections) for async batch calls
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    # HTTP transport: long reads cover large generations; the SDK's own retries are
+    # disabled so the backoff in `_generate_with_retry` stays authoritative
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    httpx_max_connections: int = DEFAULT_HTTPX_MAX_CONNECTIONS
+
+
+class _TransportSettings(NamedTuple):
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    max_connections: int = DEFAULT_HTTPX_MAX_CONNECTIONS
+
+    @classmethod
+    def from_config(cls, config: OpenAIBackendConfig) -> _TransportSettings:
+        return cls(config.connect_timeout, config.read_timeout, config.httpx_max_connections)
+
 
+def _build_timeout(transport: _TransportSettings) -> Any:
+    import httpx
 
-def _default_client_factory(api_key: str, base_url: str) -> Any:
+    return httpx.Timeout(
+        connect=transport.connect_timeout,
+        read=transport.read_timeout,
+        write=60.0,
+        pool=10.0,
+    )
+
+
+def _build_client(api_key: str, base_url: str, transport: _TransportSettings) -> Any:
+    import httpx
     from openai import OpenAI
 
-    return OpenAI(api_key=api_key, base_url=base_url)
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_keepalive_connections=min(64, transport.max_connections),
+            max_connections=transport.max_connections,
+        )
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=_build_timeout(transport),
+        max_retries=0,
+    )
+
+
+def _default_client_factory(
+    api_key: str,
+    base_url: str,
+    transport: _TransportSettings = _TransportSettings(),
+) -> Any:
+    """Return a shared client per (api_key, base_url, transport) so pipelines reuse one pool.
+
+    Entries expire after `CLIENT_CACHE_TTL_SECONDS`. Passing an explicit
+    `client=` (as tests do) or a custom `client_factory` bypasses the cache.
+    """
+    key = (api_key, base_url, transport)
+    now = time.monotonic()
+    with _CLIENT_CACHE_LOCK:
+        cached = _CLIENT_CACHE.get(key)
+        if cached is not None and now - cached[0] < CLIENT_CACHE_TTL_SECONDS:
+            return cached[1]
+        client = _build_client(api_key, base_url, transport)
+        _CLIENT_CACHE[key] = (now, client)
+        return client
+
+
+def clear_client_cache() -> None:
+    with _CLIENT_CACHE_LOCK:
+        _CLIENT_CACHE.clear()
+
+
+def _response_cache_key(base_url: str, create_kwargs: dict[str, Any]) -> str:
+    # Digest keeps keys small however long the prompt is
+    payload = repr((base_url, sorted(create_kwargs.items())))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _response_cache_get(key: str) -> str | None:
+    now = time.monotonic()
+    with _RESPONSE_CACHE_LOCK:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None and now - cached[0] < RESPONSE_CACHE_TTL_SECONDS:
+            _RESPONSE_CACHE.move_to_end(key)
+            _RESPONSE_CACHE_STATS["hits"] += 1
+            return cached[1]
+        if cached is not None:
+            del _RESPONSE_CACHE[key]
+        _RESPONSE_CACHE_STATS["misses"] += 1
+        return None
+
+
+def _response_cache_put(key: str, result: str) -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), result)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def clear_response_cache() -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE.clear()
+        _RESPONSE_CACHE_STATS["hits"] = 0
+        _RESPONSE_CACHE_STATS["misses"] = 0
+
+
+def response_cache_stats() -> dict[str, int]:
+    with _RESPONSE_CACHE_LOCK:
+        return {**_RESPONSE_CACHE_STATS, "size": len(_RESPONSE_CACHE)}
+
+
+def _default_async_client_factory(
+    api_key: str,
+    base_url: str,
+    max_connections: int = DEFAULT_MAX_CONCURRENCY,
+    transport: _TransportSettings = _TransportSettings(),
+) -> Any:
+    import httpx
+    from openai import AsyncOpenAI
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+    )
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=_build_timeout(transport),
+        max_retries=0,
+    )
+
+
+def _load_openai_error_types() -> tuple[Any, Any, Any]:
+    """Return (RateLimitError, APIStatusError, APITimeoutError), or Nones without openai."""
+    try:
+        import openai
+        return openai.RateLimitError, openai.APIStatusError, openai.APITimeoutError
+    except Exception:
+        return None, None, None
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Return the server's Retry-After hint in seconds, if the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        # HTTP-date form is rare for LLM providers; fall back to jittered backoff
+        return None
+
+
+def _part_text(part: Any) -> str:
+    if isinstance(part, dict):
+        text = part.get("text") if part.get("type") == "text" else None
+    else:
+        text = getattr(part, "text", None)
+    return text if isinstance(text, str) else ""
 
 
 def _extract_text_content(raw_content: Any) -> str:
     if isinstance(raw_content, str):
         return raw_content
     if isinstance(raw_content, list):
-        parts: list[str] = []
-        for item in raw_content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                text = item.get("text", "")
-                if isinstance(text, str):
-                    parts.append(text)
-            else:
-                text = getattr(item, "text", "")
-                if isinstance(text, str):
-                    parts.append(text)
-        return "".join(parts)
+        return "".join(_part_text(part) for part in raw_content)
     return ""
 
 
@@ -72,35 +258,301 @@ def _extract_message_content(message: Any) -> str:
     return ""
 
 
+class _ResolvedSettings(NamedTuple):
+    base_url: str
+    model: str
+    api_key: str | None
+
+
+def _resolve_settings(config: OpenAIBackendConfig) -> _ResolvedSettings:
+    """Resolve env overrides for a config.
+
+    Only the raw env lookups run per call (so overrides set after import still
+    apply); the strip/compare resolution is memoized per (config, env values).
+    """
+    return _resolve_settings_cached(
+        config,
+        os.environ.get(config.api_key_env_var, ""),
+        os.environ.get(DEFAULT_BASE_URL_ENV_VAR, ""),
+        os.environ.get(DEFAULT_MODEL_ENV_VAR, ""),
+    )
+
+
+@lru_cache(maxsize=16)
+def _resolve_settings_cached(
+    config: OpenAIBackendConfig,
+    env_api_key: str,
+    env_base_url: str,
+    env_model: str,
+) -> _ResolvedSettings:
+    base_url = config.base_url
+    env_base_url = env_base_url.strip()
+    if env_base_url and config.base_url == DEFAULT_BASE_URL:
+        base_url = env_base_url
+
+    model = config.model
+    env_model = env_model.strip()
+    if env_model and config.model == DEFAULT_MODEL:
+        model = env_model
+
+    api_key = config.api_key or env_api_key.strip() or None
+    return _ResolvedSettings(base_url=base_url, model=model, api_key=api_key)
+
+
+def _dedupe_requests(
+    requests: Sequence[LLMRequest],
+) -> tuple[list[LLMRequest], list[int]]:
+    """Return the distinct requests and, per input, the index of its distinct request."""
+    index_by_request: dict[LLMRequest, int] = {}
+    slots = [index_by_request.setdefault(request, len(index_by_request)) for request in requests]
+    if len(index_by_request) < len(slots):
+        logger.debug(f"[LLM] Deduplicated {len(slots)} requests to {len(index_by_request)}")
+    return list(index_by_request), slots
+
+
+def _extract_stream_delta(chunk: Any) -> tuple[str, str]:
+    """Return (content, reasoning) text carried by one streamed chunk."""
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        return "", ""
+    delta = getattr(choices[0], "delta", None)
+    content = getattr(delta, "content", None)
+    reasoning = getattr(delta, "reasoning", None)
+    return (
+        _extract_text_content(content) if content else "",
+        reasoning if isinstance(reasoning, str) else "",
+    )
+
+
 class OpenAILLMModel(LLMModel):
     def __init__(
         self,
         config: OpenAIBackendConfig | None = None,
         client: Any | None = None,
         client_factory: Callable[[str, str], Any] | None = None,
+        async_client: Any | None = None,
+        async_client_factory: Callable[[str, str], Any] | None = None,
     ) -> None:
         self._config = config or OpenAIBackendConfig()
-        self._base_url = self._resolve_base_url(self._config)
-        self._model = self._resolve_model(self._config)
+        settings = _resolve_settings(self._config)
+        self._base_url = settings.base_url
+        self._model = settings.model
+        self._base_create_kwargs = self._build_base_create_kwargs()
+        self._async_client = async_client
+        self._async_client_factory = async_client_factory
+        # Factory-built async clients pool connections on the loop that first used them
+        self._loop_async_clients: dict[asyncio.AbstractEventLoop, Any] = {}
+        self._batch_loop: asyncio.AbstractEventLoop | None = None
         if client is not None:
             self._client = client
             return
 
         api_key = self._resolve_api_key(self._config)
-        factory = client_factory or _default_client_factory
-        self._client = factory(api_key, self._base_url)
+        if client_factory is not None:
+            self._client = client_factory(api_key, self._base_url)
+        else:
+            self._client = _default_client_factory(
+                api_key,
+                self._base_url,
+                _TransportSettings.from_config(self._config),
+            )
 
     def generate(self, request: LLMRequest) -> str:
-        create_kwargs: dict[str, Any] = {
+        create_kwargs = self._build_create_kwargs(request)
+        if request.stream:
+            return self._generate_stream_with_retry(create_kwargs, request)
+        if not self._is_cacheable(request):
+            return self._generate_with_retry(create_kwargs, request)
+
+        cache_key = _response_cache_key(self._base_url, create_kwargs)
+        cached = _response_cache_get(cache_key)
+        if cached is not None:
+            logger.debug(f"[LLM] [{request.task}] Response cache hit")
+            return cached
+        result = self._generate_with_retry(create_kwargs, request)
+        _response_cache_put(cache_key, result)
+        return result
+
+    def generate_stream(
+        self,
+        request: LLMRequest,
+        on_delta: Callable[[str], None] | None = None,
+    ) -> str:
+        """Stream the completion, forwarding each text delta to `on_delta`.
+
+        Returns the full stripped text once the stream ends.
+        """
+        return self._generate_stream_with_retry(
+            self._build_create_kwargs(request),
+            request,
+            on_delta=on_delta,
+        )
+
+    async def agenerate(self, request: LLMRequest) -> str:
+        create_kwargs = self._build_create_kwargs(request)
+        if not self._is_cacheable(request):
+            return await self._agenerate_with_retry(create_kwargs, request)
+
+        cache_key = _response_cache_key(self._base_url, create_kwargs)
+        cached = _response_cache_get(cache_key)
+        if cached is not None:
+            logger.debug(f"[LLM] [{request.task}] Response cache hit")
+            return cached
+        result = await self._agenerate_with_retry(create_kwargs, request)
+        _response_cache_put(cache_key, result)
+        return result
+
+    async def agenerate_many(
+        self,
+        requests: Sequence[LLMRequest],
+        dedupe: bool = False,
+    ) -> list[str]:
+        """Run independent requests concurrently, bounded by `max_concurrency`.
+
+        Results are returned in the same order as `requests`. With `dedupe`,
+        identical requests are sent once and share the response.
+        """
+        if dedupe:
+            unique, slots = _dedupe_requests(requests)
+            results = await self.agenerate_many(unique)
+            return [results[slot] for slot in slots]
+
+        semaphore = asyncio.Semaphore(max(self._config.max_concurrency, 1))
+
+        async def _bounded(request: LLMRequest) -> str:
+            async with semaphore:
+                return await self.agenerate(request)
+
+        return list(await asyncio.gather(*(_bounded(request) for request in requests)))
+
+    def generate_many(
+        self,
+        requests: Sequence[LLMRequest],
+        dedupe: bool = False,
+    ) -> list[str]:
+        """Synchronous entrypoint for `agenerate_many`.
+
+        A private event loop is kept on the instance so the pooled async
+        connections stay valid across calls; `close` releases both. Must not
+        be called from inside a running event loop; use `agenerate_many` there.
+        """
+        if self._batch_loop is None or self._batch_loop.is_closed():
+            self._batch_loop = asyncio.new_event_loop()
+        return self._batch_loop.run_until_complete(self.agenerate_many(requests, dedupe=dedupe))
+
+    def close(self) -> None:
+        """Close the async client and the private event loop used by `generate_many`.
+
+        Must not be called from inside a running event loop; use `aclose` there.
+        """
+        batch_loop = self._batch_loop
+        self._batch_loop = None
+        if batch_loop is not None and not batch_loop.is_closed():
+            try:
+                batch_loop.run_until_complete(self.aclose())
+            finally:
+                batch_loop.close()
+        self._loop_async_clients.clear()
+
+    async def aclose(self) -> None:
+        """Close the async client built for the running event loop, if any.
+
+        Clients passed in as `async_client` belong to the caller and stay open.
+        """
+        client = self._loop_async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def generate_batch(
+        self,
+        requests: Sequence[LLMRequest],
+        dedupe: bool = False,
+    ) -> list[str]:
+        """Pack independent requests into one completion and demultiplex the answers.
+
+        `max_new_tokens` applies to the whole packed response. Slots the model
+        fails to tag are regenerated with individual calls. With `dedupe`,
+        identical requests occupy a single slot.
+        """
+        if dedupe:
+            unique, slots = _dedupe_requests(requests)
+            results = self.generate_batch(unique)
+            return [results[slot] for slot in slots]
+
+        if len(requests) <= 1:
+            return [self.generate(request) for request in requests]
+
+        batch_prompt = render_batch_prompt([request.prompt for request in requests])
+        raw = self.generate(LLMRequest(task=requests[0].task, prompt=batch_prompt))
+        answers = parse_batch_response(raw, len(requests))
+
+        results: list[str] = []
+        for idx, (request, answer) in enumerate(zip(requests, answers)):
+            if answer is None:
+                logger.warning(
+                    f"[LLM] [{request.task}] Batch answer {idx} missing, regenerating individually"
+                )
+                answer = self.generate(request)
+            results.append(answer)
+        return results
+
+    def _is_cacheable(self, request: LLMRequest) -> bool:
+        # Sampled output is only reused when the caller explicitly opts in
+        return request.cacheable or self._config.temperature == 0
+
+    def _build_base_create_kwargs(self) -> Mapping[str, Any]:
+        """Request-independent kwargs, built once and shared read-only by every call."""
+        base: dict[str, Any] = {
             "model": self._model,
-            "messages": [{"role": "user", "content": request.prompt}],
             "temperature": self._config.temperature,
             "top_p": self._config.top_p,
         }
         if self._config.max_new_tokens is not None:
-            create_kwargs["max_tokens"] = self._config.max_new_tokens
-        
-        return self._generate_with_retry(create_kwargs, request)
+            base["max_tokens"] = self._config.max_new_tokens
+        if self._config.reasoning is not None:
+            # OpenRouter-style toggle; keeps thinking text out of JSON-bearing responses
+            base["extra_body"] = {"reasoning": {"enabled": self._config.reasoning}}
+        return MappingProxyType(base)
+
+    def _build_create_kwargs(self, request: LLMRequest) -> dict[str, Any]:
+        create_kwargs: dict[str, Any] = {
+            **self._base_create_kwargs,
+            "messages": [{"role": "user", "content": request.prompt}],
+        }
+        if request.estimated_output_tokens is not None:
+            max_tokens = create_kwargs.get("max_tokens")
+            create_kwargs["max_tokens"] = (
+                request.estimated_output_tokens
+                if max_tokens is None
+                else min(max_tokens, request.estimated_output_tokens)
+            )
+        if request.stop:
+            create_kwargs["stop"] = list(request.stop)
+        return create_kwargs
+
+    def _get_async_client(self) -> Any:
+        if self._async_client is not None:
+            return self._async_client
+        loop = asyncio.get_running_loop()
+        client = self._loop_async_clients.get(loop)
+        if client is not None:
+            return client
+
+        # Clients of finished loops cannot be reused (their pools are bound to those loops)
+        for stale_loop in [known for known in self._loop_async_clients if known.is_closed()]:
+            del self._loop_async_clients[stale_loop]
+        api_key = self._resolve_api_key(self._config)
+        if self._async_client_factory is not None:
+            client = self._async_client_factory(api_key, self._base_url)
+        else:
+            client = _default_async_client_factory(
+                api_key,
+                self._base_url,
+                max_connections=max(self._config.max_concurrency, 1),
+                transport=_TransportSettings.from_config(self._config),
+            )
+        self._loop_async_clients[loop] = client
+        return client
 
     def _generate_with_retry(
         self,
@@ -118,111 +570,199 @@ class OpenAILLMModel(LLMModel):
         - Timeout: exponential backoff retry
         - 4xx (client errors, except 429): fast fail with readable message
         """
-        import logging
-
-        logger = logging.getLogger(__name__)
-
-        # Try to import specific exception types from openai module
-        try:
-            import openai
-            RateLimitError = openai.RateLimitError
-            APIStatusError = openai.APIStatusError
-            APITimeoutError = openai.APITimeoutError
-        except Exception:
-            RateLimitError = None
-            APIStatusError = None
-            APITimeoutError = None
-
-        prompt = create_kwargs.get("messages", [{}])[0].get("content", "")
-        prompt_len = len(prompt)
-        logger.info(f"[LLM] [{request.task}] Request: prompt_len={prompt_len} chars")
+        self._log_request(create_kwargs, request)
 
         for attempt in range(max_retries):
             try:
                 start_time = time.time()
                 response = self._client.chat.completions.create(**create_kwargs)
-                elapsed = time.time() - start_time
+                return self._finish_response(response, request, time.time() - start_time)
+            except Exception as exc:
+                delay = self._retry_delay(exc, request, attempt, max_retries, base_delay, max_delay)
+                time.sleep(delay)
 
-                message = response.choices[0].message
-                content = _extract_message_content(message)
-                result = content.strip()
+        raise RuntimeError(f"[{request.task}] Max retries exceeded")
 
-                logger.info(f"[LLM] [{request.task}] Response: len={len(result)} chars, time={elapsed:.2f}s")
-                logger.debug(f"[LLM] [{request.task}] Raw output:\n{result[:500]}{'...' if len(result) > 500 else ''}")
+    def _generate_stream_with_retry(
+        self,
+        create_kwargs: dict[str, Any],
+        request: LLMRequest,
+        on_delta: Callable[[str], None] | None = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> str:
+        """Streaming counterpart of `_generate_with_retry`.
 
-                return result
+        Failures before the first delta reaches `on_delta` are retried from
+        scratch with the same policy. Once output has been forwarded the
+        error propagates, since a restart would duplicate text downstream.
+        """
+        self._log_request(create_kwargs, request)
+        stream_kwargs = {**create_kwargs, "stream": True}
 
-            except Exception as exc:
-                # Get status code if available (from APIStatusError or mock objects)
-                status = getattr(exc, 'status_code', None)
-                exc_str = str(exc)
-                
-                # Handle rate limit errors (429) - check by type first, then status code, then string
-                is_rate_limit = (
-                    (RateLimitError is not None and isinstance(exc, RateLimitError)) or
-                    (status == 429) or
-                    ("429" in exc_str or "rate limit" in exc_str.lower())
-                )
-                if is_rate_limit:
-                    if attempt < max_retries - 1:
-                        delay = min(base_delay * (2 ** attempt), max_delay)
-                        logger.warning(f"429 Rate limited (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
+        for attempt in range(max_retries):
+            delivered = False
+            try:
+                start_time = time.time()
+                first_delta_time: float | None = None
+                content_parts: list[str] = []
+                reasoning_parts: list[str] = []
+                for chunk in self._client.chat.completions.create(**stream_kwargs):
+                    content, reasoning = _extract_stream_delta(chunk)
+                    if reasoning:
+                        reasoning_parts.append(reasoning)
+                    if not content:
                         continue
+                    if first_delta_time is None:
+                        first_delta_time = time.time() - start_time
+                    content_parts.append(content)
+                    if on_delta is not None:
+                        delivered = True
+                        on_delta(content)
+
+                # Mirror _extract_message_content: fall back to reasoning text
+                result = ("".join(content_parts) or "".join(reasoning_parts)).strip()
+                elapsed = time.time() - start_time
+                if first_delta_time is not None:
+                    logger.info(
+                        f"[LLM] [{request.task}] Stream: first_delta={first_delta_time:.2f}s"
+                    )
+                self._log_response(result, request, elapsed)
+                return result
+            except Exception as exc:
+                if delivered:
                     raise
+                delay = self._retry_delay(exc, request, attempt, max_retries, base_delay, max_delay)
+                time.sleep(delay)
 
-                # Handle timeout errors
-                is_timeout = (
-                    (APITimeoutError is not None and isinstance(exc, APITimeoutError)) or
-                    ("timeout" in exc_str.lower())
-                )
-                if is_timeout:
-                    if attempt < max_retries - 1:
-                        delay = min(base_delay * (2 ** attempt), max_delay)
-                        logger.warning(f"Request timeout (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
-                        continue
-                    raise ValueError(f"[{request.task}] Request timeout after {max_retries} attempts") from exc
+        raise RuntimeError(f"[{request.task}] Max retries exceeded")
 
-                # Handle API status errors (includes 4xx and 5xx) - check by type or status code
-                is_api_status_error = (
-                    (APIStatusError is not None and isinstance(exc, APIStatusError)) or
-                    (status is not None)
-                )
-                if is_api_status_error and status is not None:
-                    # 5xx server errors: retry with exponential backoff
-                    if status >= 500:
-                        if attempt < max_retries - 1:
-                            delay = min(base_delay * (2 ** attempt), max_delay)
-                            logger.warning(f"{status} Server error (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
-                            time.sleep(delay)
-                            continue
-                        raise ValueError(self._format_client_error(status, exc, request.task)) from exc
-                    
-                    # 4xx client errors (except 429 which is handled above): fast fail
-                    if 400 <= status < 500:
-                        raise ValueError(self._format_client_error(status, exc, request.task)) from exc
-                
-                # Fallback: Check for 5xx in error message
-                if any(f"{code}" in exc_str for code in [500, 502, 503, 504]):
-                    if attempt < max_retries - 1:
-                        delay = min(base_delay * (2 ** attempt), max_delay)
-                        logger.warning(f"Server error (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
-                        continue
-                
-                # Check for invalid model ID (special case handling)
-                if "valid model ID" in exc_str:
-                    raise ValueError(
-                        f"Invalid model id for current provider. "
-                        f"Please set {DEFAULT_MODEL_ENV_VAR} to a valid model id (current: {self._model})."
-                    ) from exc
-                
-                # All other errors: raise immediately
-                raise
+    async def _agenerate_with_retry(
+        self,
+        create_kwargs: dict[str, Any],
+        request: LLMRequest,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> str:
+        """Async counterpart of `_generate_with_retry` with the same retry policy."""
+        self._log_request(create_kwargs, request)
+        client = self._get_async_client()
+
+        for attempt in range(max_retries):
+            try:
+                start_time = time.time()
+                response = await client.chat.completions.create(**create_kwargs)
+                return self._finish_response(response, request, time.time() - start_time)
+            except Exception as exc:
+                delay = self._retry_delay(exc, request, attempt, max_retries, base_delay, max_delay)
+                await asyncio.sleep(delay)
 
         raise RuntimeError(f"[{request.task}] Max retries exceeded")
 
+    @staticmethod
+    def _log_request(create_kwargs: dict[str, Any], request: LLMRequest) -> None:
+        prompt = create_kwargs.get("messages", [{}])[0].get("content", "")
+        prompt_len = len(prompt)
+        logger.info(f"[LLM] [{request.task}] Request: prompt_len={prompt_len} chars")
+
+    @classmethod
+    def _finish_response(cls, response: Any, request: LLMRequest, elapsed: float) -> str:
+        message = response.choices[0].message
+        content = _extract_message_content(message)
+        result = content.strip()
+        cls._log_response(result, request, elapsed)
+        return result
+
+    @staticmethod
+    def _log_response(result: str, request: LLMRequest, elapsed: float) -> None:
+        logger.info(f"[LLM] [{request.task}] Response: len={len(result)} chars, time={elapsed:.2f}s")
+        # Skip building the preview (and its slice copy) unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            tail = "..." if len(result) > 500 else ""
+            logger.debug(f"[LLM] [{request.task}] Raw output:\n{result[:500]}{tail}")
+
+    def _retry_delay(
+        self,
+        exc: Exception,
+        request: LLMRequest,
+        attempt: int,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+    ) -> float:
+        """Classify a failed attempt: return the backoff delay, or raise if not retryable."""
+        RateLimitError, APIStatusError, APITimeoutError = _load_openai_error_types()
+
+        # Get status code if available (from APIStatusError or mock objects)
+        status = getattr(exc, 'status_code', None)
+        exc_str = str(exc)
+        # One scan collects every marker; precedence is applied below
+        markers = {match.lower() for match in _ERROR_MARKER_PATTERN.findall(exc_str)}
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        delay = random.uniform(0, min(base_delay * (2 ** attempt), max_delay))
+        can_retry = attempt < max_retries - 1
+
+        # Handle rate limit errors (429) - check by type first, then status code, then string
+        is_rate_limit = (
+            (RateLimitError is not None and isinstance(exc, RateLimitError)) or
+            (status == 429) or
+            ("429" in markers or "rate limit" in markers)
+        )
+        if is_rate_limit:
+            retry_after = _retry_after_seconds(exc)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, max_delay))
+            if can_retry:
+                logger.warning(f"429 Rate limited (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
+                return delay
+            raise exc
+
+        # Handle timeout errors
+        is_timeout = (
+            (APITimeoutError is not None and isinstance(exc, APITimeoutError)) or
+            ("timeout" in markers)
+        )
+        if is_timeout:
+            if can_retry:
+                logger.warning(f"Request timeout (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
+                return delay
+            raise ValueError(f"[{request.task}] Request timeout after {max_retries} attempts") from exc
+
+        # Handle API status errors (includes 4xx and 5xx) - check by type or status code
+        is_api_status_error = (
+            (APIStatusError is not None and isinstance(exc, APIStatusError)) or
+            (status is not None)
+        )
+        if is_api_status_error and status is not None:
+            # 5xx server errors: retry with exponential backoff
+            if status >= 500:
+                if can_retry:
+                    logger.warning(f"{status} Server error (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
+                    return delay
+                raise ValueError(self._format_client_error(status, exc, request.task)) from exc
+            
+            # 4xx client errors (except 429 which is handled above): fast fail
+            if 400 <= status < 500:
+                raise ValueError(self._format_client_error(status, exc, request.task)) from exc
+        
+        # Fallback: Check for 5xx in error message
+        if markers & _SERVER_ERROR_MARKERS:
+            if can_retry:
+                logger.warning(f"Server error (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f}s...")
+                return delay
+        
+        # Check for invalid model ID (special case handling)
+        if "valid model ID" in exc_str:
+            raise ValueError(
+                f"Invalid model id for current provider. "
+                f"Please set {DEFAULT_MODEL_ENV_VAR} to a valid model id (current: {self._model})."
+            ) from exc
+        
+        # All other errors: raise immediately
+        raise exc
+
     def _format_client_error(self, status: int, exc: Exception, task: str) -> str:
         """Format client errors into human-readable messages."""
         error_map = {
@@ -252,29 +792,13 @@ class OpenAILLMModel(LLMModel):
 
     @staticmethod
     def _resolve_api_key(config: OpenAIBackendConfig) -> str:
-        if config.api_key:
-            return config.api_key
-        env_value = os.getenv(config.api_key_env_var, "").strip()
-        if env_value:
-            return env_value
+        api_key = _resolve_settings(config).api_key
+        if api_key:
+            return api_key
         raise ValueError(
             f"Missing API key. Set {config.api_key_env_var} or pass api_key in OpenAIBackendConfig."
         )
 
-    @staticmethod
-    def _resolve_base_url(config: OpenAIBackendConfig) -> str:
-        env_base_url = os.getenv(DEFAULT_BASE_URL_ENV_VAR, "").strip()
-        if env_base_url and config.base_url == DEFAULT_BASE_URL:
-            return env_base_url
-        return config.base_url
-
-    @staticmethod
-    def _resolve_model(config: OpenAIBackendConfig) -> str:
-        env_model = os.getenv(DEFAULT_MODEL_ENV_VAR, "").strip()
-        if env_model and config.model == DEFAULT_MODEL:
-            return env_model
-        return config.model
-
 
 class OpenAIRewriteModel(RewriteModel):
     """Backward-compatible wrapper around OpenAILLMModel."""
@@ -285,7 +809,9 @@ class OpenAIRewriteModel(RewriteModel):
         client: Any | None = None,
         client_factory: Callable[[str, str], Any] | None = None,
         llm_model: OpenAILLMModel | None = None,
+        stream_consumer: Callable[[str], None] | None = None,
     ) -> None:
+        self._stream_consumer = stream_consumer
         if llm_model is not None:
             self._llm_model = llm_model
             return
@@ -297,7 +823,22 @@ class OpenAIRewriteModel(RewriteModel):
 
     def rewrite(self, request: RewriteRequest) -> str:
         prompt = render_rewrite_prompt(request)
-        return self._llm_model.generate(
+        llm_request = LLMRequest(task="rewrite_chunk", prompt=prompt)
+        if self._stream_consumer is not None:
+            return self._llm_model.generate_stream(llm_request, on_delta=self._stream_consumer)
+        return self._llm_model.generate(llm_request)
+
+    def rewrite_batch(self, requests: Sequence[RewriteRequest]) -> list[str]:
+        return self._llm_model.generate_batch(
+            [
+                LLMRequest(task="rewrite_chunk", prompt=render_rewrite_prompt(request))
+                for request in requests
+            ]
+        )
+
+    async def arewrite(self, request: RewriteRequest) -> str:
+        prompt = render_rewrite_prompt(request)
+        return await self._llm_model.agenerate(
             LLMRequest(task="rewrite_chunk", prompt=prompt)
         )
 
@@ -309,6 +850,16 @@ __all__ = [
     "DEFAULT_TOP_P",
     "DEFAULT_BASE_URL_ENV_VAR",
     "DEFAULT_MODEL_ENV_VAR",
+    "DEFAULT_MAX_CONCURRENCY",
+    "DEFAULT_CONNECT_TIMEOUT",
+    "DEFAULT_READ_TIMEOUT",
+    "DEFAULT_HTTPX_MAX_CONNECTIONS",
+    "CLIENT_CACHE_TTL_SECONDS",
+    "clear_client_cache",
+    "RESPONSE_CACHE_MAX_ENTRIES",
+    "RESPONSE_CACHE_TTL_SECONDS",
+    "clear_response_cache",
+    "response_cache_stats",
     "OpenAIBackendConfig",
     "OpenAILLMModel",
     "OpenAIRewriteModel",
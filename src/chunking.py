@@ -1,9 +1,36 @@
 from __future__ import annotations
 
 import re
-from typing import List, Literal
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Literal, NamedTuple
 
-from tokenization import Tokenizer
+from tokenization import Tokenizer, encode_batch
+
+_PARAGRAPH_SPLIT_PATTERN = re.compile(r"\n\s*\n")
+
+# CJK Unicode 范围（平假名/片假名、扩展 A、基本汉字、韩文音节），闭区间
+_CJK_RANGES = ((0x3040, 0x30FF), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xAC00, 0xD7AF))
+_CJK_MARK = "\x01"
+_LATIN_MARK = "\x02"
+
+
+def _build_script_translation() -> dict[int, str | None]:
+    # 所有 Unicode 空白字符都不超过 U+3000，与正则 \s 的判定一致
+    table: dict[int, str | None] = {c: None for c in range(0x3001) if chr(c).isspace()}
+    # 原文中的标记字符本身归为“其他”，避免误计数
+    table[ord(_CJK_MARK)] = "\x03"
+    table[ord(_LATIN_MARK)] = "\x03"
+    for start, end in ((ord("A"), ord("Z")), (ord("a"), ord("z"))):
+        table.update(dict.fromkeys(range(start, end + 1), _LATIN_MARK))
+    for start, end in _CJK_RANGES:
+        table.update(dict.fromkeys(range(start, end + 1), _CJK_MARK))
+    return table
+
+
+_SCRIPT_TRANSLATION = _build_script_translation()
+# 长文本分窗口统计，结论确定后即可停止
+_SCRIPT_WINDOW_CHARS = 65536
 
 
 def detect_dominant_script(text: str) -> Literal["latin", "cjk", "mixed"]:
@@ -13,28 +40,24 @@ def detect_dominant_script(text: str) -> Literal["latin", "cjk", "mixed"]:
     - cjk: 中日韩文字
     - mixed: 混合
     """
-    # CJK Unicode 范围
-    cjk_pattern = re.compile(
-        r"[\u4e00-\u9fff\u3400-\u4dbf\u3040-\u309f\u30a0-\u30ff\uac00-\ud7af]"
-    )
-    latin_pattern = re.compile(r"[a-zA-Z]")
-    
-    cjk_count = len(cjk_pattern.findall(text))
-    latin_count = len(latin_pattern.findall(text))
-    total_chars = len(re.sub(r"\s", "", text))
-    
+    # 按窗口 translate：CJK/拉丁字母映射为标记字符，空白删除，其余保留
+    cjk_count = latin_count = total_chars = 0
+    for offset in range(0, len(text), _SCRIPT_WINDOW_CHARS):
+        marked = text[offset : offset + _SCRIPT_WINDOW_CHARS].translate(_SCRIPT_TRANSLATION)
+        total_chars += len(marked)
+        cjk_count += marked.count(_CJK_MARK)
+        latin_count += marked.count(_LATIN_MARK)
+        # 即使剩余字符全部计入分母也无法改变结论时提前结束
+        remaining = max(0, len(text) - offset - _SCRIPT_WINDOW_CHARS)
+        threshold = (total_chars + remaining) / 2
+        if cjk_count > threshold:
+            return "cjk"
+        if latin_count > threshold:
+            return "latin"
+
     if total_chars == 0:
         return "latin"
-    
-    cjk_ratio = cjk_count / total_chars
-    latin_ratio = latin_count / total_chars
-    
-    if cjk_ratio > 0.5:
-        return "cjk"
-    elif latin_ratio > 0.5:
-        return "latin"
-    else:
-        return "mixed"
+    return "mixed"
 
 
 def get_adaptive_length(
@@ -61,12 +84,80 @@ def get_adaptive_length(
         return len(text)
 
 
+class _MeasuredUnit(NamedTuple):
+    text: str
+    length: int
+    mode: Literal["token", "char"]
+    # token 模式下保留编码结果，供 token 级降级切分复用
+    tokens: List[str] | None
+
+
+def _measure_units(
+    texts: List[str],
+    tokenizer: Tokenizer,
+    mode: Literal["auto", "token", "char"],
+) -> List[_MeasuredUnit]:
+    """
+    与逐个调用 get_adaptive_length 等价，同时记录实际度量模式
+    需要 token 计数的文本一次批量编码；auto 模式下每个文本只检测一次文字类型
+    """
+    if mode == "char":
+        return [_MeasuredUnit(t, len(t), "char", None) for t in texts]
+    if mode == "token":
+        return [
+            _MeasuredUnit(t, len(tokens), "token", tokens)
+            for t, tokens in zip(texts, encode_batch(tokenizer, texts))
+        ]
+
+    # auto 模式：仅拉丁文本使用 token 数
+    is_latin = [detect_dominant_script(t) == "latin" for t in texts]
+    encoded = iter(encode_batch(tokenizer, [t for t, latin in zip(texts, is_latin) if latin]))
+    units: List[_MeasuredUnit] = []
+    for t, latin in zip(texts, is_latin):
+        if latin:
+            tokens = next(encoded)
+            units.append(_MeasuredUnit(t, len(tokens), "token", tokens))
+        else:
+            units.append(_MeasuredUnit(t, len(t), "char", None))
+    return units
+
+
+def _fits_in_single_chunk(
+    stripped: str,
+    tokenizer: Tokenizer,
+    chunk_size: int,
+    mode: Literal["auto", "token", "char"],
+) -> bool:
+    """整篇文本是否必然落在单个 chunk 内（保守判断）"""
+    if mode == "token":
+        return len(tokenizer.encode(stripped)) <= chunk_size
+    # char：各单元字符数之和不超过全文字符数
+    if len(stripped) > chunk_size:
+        return False
+    if mode == "char":
+        return True
+    # auto：拉丁单元按 token 计数，字节级/BPE 分词器下 token 数可能超过字符数，需再按 token 确认
+    return len(tokenizer.encode(stripped)) <= chunk_size
+
+
 def split_into_structural_units(text: str) -> List[str]:
     """按空行（段落）分割"""
-    stripped = text.strip()
-    if not stripped:
-        return []
-    units = [part.strip() for part in re.split(r"\n\s*\n", stripped) if part.strip()]
+    # 空行分隔至少需要两个换行符，否则整段即为一个单元
+    if text.count("\n") < 2:
+        stripped = text.strip()
+        return [stripped] if stripped else []
+
+    # 单次扫描分隔符，直接对原文切片并去除首尾空白，不生成中间的 split 列表
+    units: List[str] = []
+    prev = 0
+    for match in _PARAGRAPH_SPLIT_PATTERN.finditer(text):
+        unit = text[prev : match.start()].strip()
+        if unit:
+            units.append(unit)
+        prev = match.end()
+    tail = text[prev:].strip()
+    if tail:
+        units.append(tail)
     return units
 
 
@@ -83,32 +174,56 @@ def split_into_char_chunks(
     """按字符分割（无 overlap）"""
     if max_chars <= 0:
         raise ValueError("max_chars must be positive")
-    
-    chunks: List[str] = []
-    for i in range(0, len(text), max_chars):
-        chunk = text[i : i + max_chars]
-        if chunk:
-            chunks.append(chunk)
-    return chunks
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+    # range 步长保证每个切片非空，无需再逐个判断
+    return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
 
 
 def split_into_token_chunks_no_overlap(
     text: str,
     tokenizer: Tokenizer,
     chunk_tokens: int,
+    *,
+    tokens: List[str] | None = None,
 ) -> List[str]:
-    """按 token 分割（无 overlap）"""
+    """按 token 分割（无 overlap）；调用方已编码过 text 时可传入 tokens 避免重复编码"""
     if chunk_tokens <= 0:
         raise ValueError("chunk_tokens must be positive")
-    
-    tokens = tokenizer.encode(text)
+
+    if tokens is None:
+        tokens = tokenizer.encode(text)
+    if not tokens:
+        return []
+    if len(tokens) <= chunk_tokens:
+        return [tokenizer.decode(tokens)]
+
+    # 窗口等距且起点均小于 len(tokens)，每个切片必非空
+    return [
+        tokenizer.decode(tokens[start : start + chunk_tokens])
+        for start in range(0, len(tokens), chunk_tokens)
+    ]
+
+
+def _pack_units(units: List[_MeasuredUnit], chunk_size: int) -> List[str]:
+    """
+    贪心装箱：每个单元都不超过 chunk_size，按顺序尽量多地拼入当前 chunk。
+    单元以空格拼接：按字符度量时空格也占长度，token 度量时空格不产生 token，
+    因此字符单元的权重多计 1，作为 chunk 首个单元时再扣除。
+    前缀和 + bisect 直接定位每个 chunk 的结束位置。
+    """
+    separators = [1 if unit.mode == "char" else 0 for unit in units]
+    prefix = list(accumulate((unit.length + sep for unit, sep in zip(units, separators)), initial=0))
     chunks: List[str] = []
-    
-    for i in range(0, len(tokens), chunk_tokens):
-        window = tokens[i : i + chunk_tokens]
-        if window:
-            chunks.append(tokenizer.decode(window))
-    
+    start = 0
+    while start < len(units):
+        limit = prefix[start] + separators[start] + chunk_size
+        # 首个单元必然放得下，end 至少为 start + 1
+        end = bisect_right(prefix, limit, start + 1) - 1
+        chunks.append(" ".join(unit.text for unit in units[start:end]))
+        start = end
     return chunks
 
 
@@ -137,95 +252,78 @@ def split_document_into_chunks(
     if chunk_size <= 0:
         raise ValueError("chunk_size must be positive")
 
-    def get_length(t: str) -> int:
-        return get_adaptive_length(t, tokenizer, length_mode)
-    
-    # 判断实际使用的长度模式（处理 auto 的情况）
-    def effective_mode(t: str) -> Literal["token", "char"]:
-        if length_mode == "auto":
-            script = detect_dominant_script(t)
-            return "token" if script == "latin" else "char"
-        return length_mode  # type: ignore
+    # 快速路径：整篇放得下时跳过逐单元度量与累积循环，输出与常规路径一致
+    if _fits_in_single_chunk(text.strip(), tokenizer, chunk_size, length_mode):
+        units = split_into_structural_units(text)
+        return [" ".join(units)] if units else []
 
-    chunks: List[str] = []
-    current_buffer: List[str] = []
-    current_len = 0
-
-    def flush_buffer() -> None:
-        nonlocal current_buffer, current_len
-        if current_buffer:
-            chunks.append(" ".join(current_buffer))
-            current_buffer = []
-            current_len = 0
-
-    def add_to_buffer(item: str, item_len: int) -> None:
-        nonlocal current_buffer, current_len
-        current_buffer.append(item)
-        current_len += item_len
-    
-    def split_by_tokens(t: str) -> List[str]:
-        """使用 token 级分割"""
-        return split_into_token_chunks_no_overlap(t, tokenizer, chunk_size)
+    def split_oversize(unit: _MeasuredUnit) -> List[str]:
+        """Level 3: 按 token 或字符分割，token 模式复用已有编码"""
+        if unit.mode == "token" and unit.tokens is not None:
+            return split_into_token_chunks_no_overlap(
+                unit.text, tokenizer, chunk_size, tokens=unit.tokens
+            )
+        return split_into_char_chunks(unit.text, chunk_size)
 
     # Level 1: 按段落分割
     paragraphs = split_into_structural_units(text)
     if not paragraphs:
         return []
 
-    for para in paragraphs:
-        para_len = get_length(para)
+    # 两阶段度量：先一次批量度量所有段落，再一次批量度量所有超长段落的行，
+    # 主循环只做算术和列表追加
+    para_units = _measure_units(paragraphs, tokenizer, length_mode)
+    lines_by_para: dict[int, List[_MeasuredUnit]] = {}
+    if enable_line_fallback:
+        oversize = [i for i, unit in enumerate(para_units) if unit.length > chunk_size]
+        line_groups = [split_into_lines(para_units[i].text) for i in oversize]
+        line_units = _measure_units(
+            [line for group in line_groups for line in group], tokenizer, length_mode
+        )
+        offset = 0
+        for i, group in zip(oversize, line_groups):
+            lines_by_para[i] = line_units[offset : offset + len(group)]
+            offset += len(group)
 
+    # 连续的可累积单元先收集起来，遇到超长单元时整体装箱
+    chunks: List[str] = []
+    pending: List[_MeasuredUnit] = []
+
+    def flush_pending() -> None:
+        if pending:
+            chunks.extend(_pack_units(pending, chunk_size))
+            pending.clear()
+
+    for idx, para_unit in enumerate(para_units):
         # 情况A: 段落在限制内，尝试累积
-        if para_len <= chunk_size:
-            if current_len + para_len <= chunk_size:
-                add_to_buffer(para, para_len)
-            else:
-                flush_buffer()
-                add_to_buffer(para, para_len)
+        if para_unit.length <= chunk_size:
+            pending.append(para_unit)
             continue
 
         # 情况B: 段落超长，需要降级处理
-        flush_buffer()  # 先 flush 已累积的内容
+        flush_pending()  # 先 flush 已累积的内容
 
         if enable_line_fallback:
             # Level 2: 按单行分割
-            lines = split_into_lines(para)
-            for line in lines:
-                line_len = get_length(line)
-
-                if line_len <= chunk_size:
+            for line_unit in lines_by_para[idx]:
+                if line_unit.length <= chunk_size:
                     # 单行在限制内，尝试累积
-                    if current_len + line_len <= chunk_size:
-                        add_to_buffer(line, line_len)
-                    else:
-                        flush_buffer()
-                        add_to_buffer(line, line_len)
+                    pending.append(line_unit)
                 else:
                     # 单行还超长
-                    flush_buffer()
+                    flush_pending()
 
                     if enable_char_fallback:
-                        # Level 3: 按 token 或字符分割
-                        if effective_mode(line) == "token":
-                            token_chunks = split_by_tokens(line)
-                            chunks.extend(token_chunks)
-                        else:
-                            char_chunks = split_into_char_chunks(line, chunk_size)
-                            chunks.extend(char_chunks)
+                        chunks.extend(split_oversize(line_unit))
                     else:
                         # 不启用字符分割，直接截断或保留原样
-                        chunks.append(line)
+                        chunks.append(line_unit.text)
         else:
             # 不启用行分割，直接按 token 或字符分割
             if enable_char_fallback:
-                if effective_mode(para) == "token":
-                    token_chunks = split_by_tokens(para)
-                    chunks.extend(token_chunks)
-                else:
-                    char_chunks = split_into_char_chunks(para, chunk_size)
-                    chunks.extend(char_chunks)
+                chunks.extend(split_oversize(para_unit))
             else:
-                chunks.append(para)
+                chunks.append(para_unit.text)
 
-    flush_buffer()
+    flush_pending()
     return chunks
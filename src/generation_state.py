@@ -23,10 +23,16 @@ def _merge_unique(existing: Iterable[str], new_items: Iterable[str]) -> list[str
     return merged
 
 
-def _extract_entities(section_text: str, section_spec: SectionSpec) -> list[str]:
+def _extract_entities(
+    section_text: str,
+    section_spec: SectionSpec,
+    section_lower: str | None = None,
+) -> list[str]:
+    if section_lower is None:
+        section_lower = section_text.lower()
     inferred = [match.group(0) for match in _ENTITY_PATTERN.finditer(section_text)]
     for entity in section_spec.required_entities:
-        if entity.lower() in section_text.lower():
+        if entity.lower() in section_lower:
             inferred.append(entity)
     return _merge_unique([], inferred)
 
@@ -41,14 +47,20 @@ def update_state(
     section_spec: SectionSpec,
     section_text: str,
 ) -> GenerationState:
+    # Lowercase the section once for every substring check below
+    section_lower = section_text.lower()
     entities = _merge_unique(
         state.known_entities,
-        _extract_entities(section_text=section_text, section_spec=section_spec),
+        _extract_entities(
+            section_text=section_text,
+            section_spec=section_spec,
+            section_lower=section_lower,
+        ),
     )
 
     terminology_map = dict(state.terminology_map)
     for term, preferred in plan.terminology_preferences.items():
-        if preferred.lower() in section_text.lower() or term.lower() in section_text.lower():
+        if preferred.lower() in section_lower or term.lower() in section_lower:
             terminology_map[term] = preferred
 
     timeline = list(state.timeline)
@@ -60,7 +72,9 @@ def update_state(
     covered = list(state.covered_key_points)
     remaining = list(state.remaining_key_points)
     for key_point in section_spec.key_points:
-        if _is_key_point_covered(key_point=key_point, text=section_text):
+        if _is_key_point_covered(
+            key_point=key_point, text=section_text, text_lower=section_lower
+        ):
             if key_point not in covered:
                 covered.append(key_point)
             if key_point in remaining:
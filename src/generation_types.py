@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import json
+import re
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any, Literal
 
+# Thinking/reasoning blocks some models emit before the JSON payload, removed in order
+_REASONING_BLOCK_PATTERNS = tuple(
+    re.compile(rf"<{tag}>.*?</{tag}>", re.DOTALL) for tag in ("think", "thinking", "reasoning")
+)
+
 
 def _as_string_list(raw: Any) -> list[str]:
     if raw is None:
@@ -15,8 +22,6 @@ def _as_string_list(raw: Any) -> list[str]:
 
 def _extract_json_object(raw: str) -> str:
     """Extract JSON object from model output, handling markdown code blocks and reasoning content."""
-    import re
-    
     raw = raw.strip()
     
     # Handle markdown code blocks: ```json ... ``` or ``` ... ```
@@ -30,12 +35,8 @@ def _extract_json_object(raw: str) -> str:
             raw = raw[:-3].rstrip()
     
     # Remove common thinking/reasoning tags (for models that output thinking in content)
-    # Pattern 1: <think>...</think>
-    raw = re.sub(r'<think>.*?</think>', '', raw, flags=re.DOTALL)
-    # Pattern 2: <thinking>...</thinking>
-    raw = re.sub(r'<thinking>.*?</thinking>', '', raw, flags=re.DOTALL)
-    # Pattern 3: <reasoning>...</reasoning>
-    raw = re.sub(r'<reasoning>.*?</reasoning>', '', raw, flags=re.DOTALL)
+    for pattern in _REASONING_BLOCK_PATTERNS:
+        raw = pattern.sub("", raw)
     
     raw = raw.strip()
     
@@ -143,6 +144,14 @@ class SectionSpec:
             "target_length": self.target_length,
         }
 
+    def to_json(self) -> str:
+        return self._json_blob
+
+    @cached_property
+    def _json_blob(self) -> str:
+        # Section specs are frozen; every attempt and retry of a section reuses one blob
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
 
 @dataclass(frozen=True)
 class GenerationPlan:
@@ -215,6 +224,14 @@ class GenerationPlan:
             "sections": [section.to_dict() for section in self.sections],
         }
 
+    def to_json(self) -> str:
+        return self._json_blob
+
+    @cached_property
+    def _json_blob(self) -> str:
+        # The plan is frozen and shared by every section prompt of a run, so serialize it once
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
     def validate(self) -> None:
         if not self.topic:
             raise ValueError("plan topic must not be empty")
@@ -328,4 +345,37 @@ class GenerationConfig:
     max_entities_in_prompt: int = 20
     max_timeline_entries: int = 5
     upcoming_sections_preview: int = 2
+    # Approximate token budget (~4 chars per token) for the compressed prompt's
+    # plan context and state blocks; oldest timeline entries, then entities,
+    # then upcoming titles are dropped to fit (None keeps the fixed caps only)
+    compressed_context_budget_tokens: int | None = None
     prompt_language: Literal["en", "zh"] = "en"
+
+    # Output budget configuration: cap section requests at
+    # target_length * max_section_length_ratio * margin tokens (None disables)
+    section_output_token_margin: float | None = None
+
+    # Consecutive sections drafted by one LLM call that shares the plan and
+    # state context; drafts below the quality bar still go through per-section
+    # repair, and unparsable ones are regenerated alone (1 drafts separately)
+    section_batch_size: int = 1
+
+    # Threads used to run the independent post-draft quality checkers
+    # concurrently (1 runs them sequentially)
+    quality_check_workers: int = 1
+
+    # Plan requests sent at once when no manual plan is given; the first that
+    # parses wins, trading extra tokens for plan latency (1 retries sequentially)
+    plan_parallel_attempts: int = 1
+
+    # First-attempt drafts sampled concurrently per section; the best-scoring
+    # one is kept, which can save a repair round trip (1 samples once)
+    section_first_attempt_candidates: int = 1
+
+    # Directory for a persistent response cache keyed by request contents, so
+    # reruns of the same plan skip finished LLM calls (None disables)
+    response_cache_dir: str | None = None
+    # Part of every response cache key. Requests carry no model or sampling
+    # settings, so set it to identify the model setup; runs with different
+    # namespaces never replay each other's entries from a shared directory
+    response_cache_namespace: str = ""
@@ -18,6 +18,14 @@ LLMTask = Literal[
 class LLMRequest:
     task: LLMTask
     prompt: str
+    # Per-request output budget; backends cap max_tokens to it when set
+    estimated_output_tokens: int | None = None
+    # Sequences that end generation early (e.g. echoed prompt delimiters)
+    stop: tuple[str, ...] = ()
+    # Ask streaming-capable backends to consume the response incrementally
+    stream: bool = False
+    # Allow backends to reuse a prior response for an identical request
+    cacheable: bool = False
 
 
 class LLMModel(Protocol):
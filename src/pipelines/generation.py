@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Any
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable
 
 from generation_state import initialize_state, update_state
 from generation_types import (
@@ -13,13 +18,17 @@ from generation_types import (
     SectionSpec,
 )
 from model import LLMModel, LLMRequest
+from prompts.batch import parse_batch_response
 from prompts.generation import (
+    SECTION_STOP_SEQUENCES,
     render_consistency_prompt,
     render_plan_prompt,
     render_section_prompt,
+    render_section_prompt_batch,
     render_section_prompt_compressed,
     render_section_repair_prompt,
 )
+from quality.base import _bounded_token_jaccard
 from quality.generation import (
     EntityPresenceChecker,
     NumericFactChecker,
@@ -28,7 +37,6 @@ from quality.generation import (
     StrictConsistencyEditGuard,
     TerminologyConsistencyChecker,
     TransitionContractChecker,
-    _token_jaccard as token_jaccard_helper,
 )
 from tokenization import Tokenizer, take_last_tokens
 
@@ -81,13 +89,25 @@ class ChunkWiseGenerationPipeline:
         state = initialize_state(plan)
         quality_report = QualityReport()
         section_outputs: list[str] = []
+        batched_drafts: dict[int, str] = {}
+        next_batch_index = 0
 
         for index, section in enumerate(plan.sections):
             logger.info(
                 f"[Pipeline] Generating section {index + 1}/{len(plan.sections)}: '{section.title}'"
             )
 
+            if self._config.section_batch_size > 1 and index >= next_batch_index:
+                next_batch_index = index + self._config.section_batch_size
+                batched_drafts = self._draft_section_batch(
+                    plan=plan,
+                    state=state,
+                    start_index=index,
+                    previous_outputs=section_outputs,
+                )
+
             prev_section = section_outputs[-1] if section_outputs else None
+            batched_draft = batched_drafts.pop(index, "")
             section_text, section_issues = self._generate_section_with_retries(
                 section=section,
                 plan=plan,
@@ -95,6 +115,7 @@ class ChunkWiseGenerationPipeline:
                 section_index=index,
                 prev_section=prev_section,
                 previous_outputs=section_outputs,
+                first_draft=batched_draft,
             )
 
             for issue in section_issues:
@@ -113,7 +134,11 @@ class ChunkWiseGenerationPipeline:
                 logger.info(f"[Pipeline] Section {index + 1} final: {actual_len} chars")
 
             if section_outputs:
-                similarity = token_jaccard_helper(section_outputs[-1], section_text)
+                similarity = _bounded_token_jaccard(
+                    section_outputs[-1],
+                    section_text,
+                    self._config.repetition_similarity_threshold,
+                )
                 if similarity >= self._config.repetition_similarity_threshold:
                     quality_report.section_warnings.append(
                         (
@@ -125,6 +150,10 @@ class ChunkWiseGenerationPipeline:
                         f"[Pipeline] Section {index + 1} repetition warning: similarity={similarity:.2f}"
                     )
 
+            if batched_drafts and section_text != batched_draft:
+                # Later drafts were written after the batched text; redraft them from the real prefix
+                batched_drafts.clear()
+
             section_outputs.append(section_text)
             state = update_state(
                 state=state,
@@ -142,27 +171,20 @@ class ChunkWiseGenerationPipeline:
         )
 
         logger.info("[Pipeline] Running quality checks...")
-        quality_report.coverage_missing = self._coverage_checker.find_missing(
-            plan=plan,
-            text=draft_text,
-        )
-        quality_report.terminology_issues = self._terminology_checker.find_issues(
-            plan=plan,
-            text=draft_text,
-        )
-        quality_report.entity_missing = self._entity_checker.find_missing(
-            plan=plan,
-            section_outputs=section_outputs,
-        )
-        repetition_issues, drift_issues = self._repetition_drift_checker.find_issues(
+        (
+            quality_report.coverage_missing,
+            quality_report.terminology_issues,
+            quality_report.entity_missing,
+            (repetition_issues, drift_issues),
+            transition_warnings,
+        ) = self._run_quality_checks(
             plan=plan,
+            draft_text=draft_text,
             section_outputs=section_outputs,
         )
         quality_report.repetition_issues = repetition_issues
         quality_report.drift_issues = drift_issues
-        quality_report.section_warnings.extend(
-            self._transition_checker.find_missing(section_outputs=section_outputs)
-        )
+        quality_report.section_warnings.extend(transition_warnings)
         logger.info(
             f"[Pipeline] Quality check: missing={len(quality_report.coverage_missing)}, "
             f"terminology={len(quality_report.terminology_issues)}, "
@@ -184,7 +206,7 @@ class ChunkWiseGenerationPipeline:
                 quality_report=quality_report,
                 prompt_language=self._config.prompt_language,
             )
-            candidate = self._model.generate(
+            candidate = self._generate(
                 LLMRequest(task="consistency_pass", prompt=consistency_prompt)
             )
             if self._config.consistency_guard_enabled:
@@ -218,6 +240,93 @@ class ChunkWiseGenerationPipeline:
             qc_report=quality_report,
         )
 
+    def _generate(self, request: LLMRequest) -> str:
+        cached = self._read_cached_response(request)
+        if cached is not None:
+            return cached
+        response = self._model.generate(request)
+        self._store_cached_response(request, response)
+        return response
+
+    def _read_cached_response(self, request: LLMRequest) -> str | None:
+        cache_dir = self._config.response_cache_dir
+        if cache_dir is None:
+            return None
+        try:
+            with open(self._response_cache_path(cache_dir, request), encoding="utf-8") as handle:
+                logger.debug(f"[Pipeline] [{request.task}] Response cache hit")
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def _store_cached_response(self, request: LLMRequest, response: str) -> None:
+        cache_dir = self._config.response_cache_dir
+        if cache_dir is None or not response.strip():
+            return
+        # Write then rename so an interrupted run never leaves a partial entry; the
+        # temp file is unique per call because threads may write the same key at once
+        path = self._response_cache_path(cache_dir, request)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(response)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _discard_cached_response(self, request: LLMRequest) -> None:
+        cache_dir = self._config.response_cache_dir
+        if cache_dir is None:
+            return
+        try:
+            os.remove(self._response_cache_path(cache_dir, request))
+        except FileNotFoundError:
+            pass
+
+    def _response_cache_path(self, cache_dir: str, request: LLMRequest) -> str:
+        payload = repr(
+            (
+                self._config.response_cache_namespace,
+                request.task,
+                request.prompt,
+                request.estimated_output_tokens,
+                request.stop,
+            )
+        )
+        key = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(cache_dir, key[:2], f"{key}.txt")
+
+    def _run_quality_checks(
+        self,
+        plan: GenerationPlan,
+        draft_text: str,
+        section_outputs: list[str],
+    ) -> tuple[Any, ...]:
+        """Run the draft-level checkers; they share no state, so they may run concurrently."""
+        checks: list[Callable[[], Any]] = [
+            partial(self._coverage_checker.find_missing, plan=plan, text=draft_text),
+            partial(self._terminology_checker.find_issues, plan=plan, text=draft_text),
+            partial(self._entity_checker.find_missing, plan=plan, section_outputs=section_outputs),
+            partial(
+                self._repetition_drift_checker.find_issues,
+                plan=plan,
+                section_outputs=section_outputs,
+            ),
+            partial(self._transition_checker.find_missing, section_outputs=section_outputs),
+        ]
+        workers = min(self._config.quality_check_workers, len(checks))
+        if workers <= 1:
+            return tuple(check() for check in checks)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(check) for check in checks]
+            return tuple(future.result() for future in futures)
+
     def _resolve_plan(
         self,
         topic: str,
@@ -245,13 +354,20 @@ class ChunkWiseGenerationPipeline:
             prompt_language=self._config.prompt_language,
         )
 
+        request = LLMRequest(task="plan_generation", prompt=prompt)
+        racing_attempts = min(self._config.plan_parallel_attempts, max_retries)
+        if racing_attempts > 1:
+            return self._race_plan_attempts(request, racing_attempts)
+
         for attempt in range(max_retries):
-            raw_plan = self._model.generate(LLMRequest(task="plan_generation", prompt=prompt))
+            raw_plan = self._generate(request)
             logger.debug(f"Raw plan output from model (attempt {attempt + 1}):\n{raw_plan}")
 
             try:
                 return GenerationPlan.from_json(raw_plan)
             except ValueError as exc:
+                # A cached unparsable plan would otherwise be replayed on every retry
+                self._discard_cached_response(request)
                 is_truncated = "truncated" in str(exc).lower()
 
                 if attempt < max_retries - 1:
@@ -271,6 +387,40 @@ class ChunkWiseGenerationPipeline:
                 logger.error(f"Raw plan output:\n{raw_plan}")
                 raise
 
+    def _race_plan_attempts(self, request: LLMRequest, attempts: int) -> GenerationPlan:
+        """Send `attempts` plan requests at once and keep the first that parses.
+
+        The attempts bypass the response cache, which only ever holds the accepted plan.
+        """
+        cached = self._read_cached_response(request)
+        if cached is not None:
+            try:
+                return GenerationPlan.from_json(cached)
+            except ValueError:
+                self._discard_cached_response(request)
+
+        executor = ThreadPoolExecutor(max_workers=attempts)
+        try:
+            futures = [executor.submit(self._model.generate, request) for _ in range(attempts)]
+            errors: list[ValueError] = []
+            raw_plan = ""
+            for future in as_completed(futures):
+                raw_plan = future.result()
+                try:
+                    plan = GenerationPlan.from_json(raw_plan)
+                except ValueError as exc:
+                    logger.warning(f"Parallel plan attempt failed: {exc}")
+                    errors.append(exc)
+                    continue
+                self._store_cached_response(request, raw_plan)
+                return plan
+            logger.error(f"Failed to parse plan after {attempts} parallel attempts: {errors[-1]}")
+            logger.error(f"Raw plan output:\n{raw_plan}")
+            raise errors[-1]
+        finally:
+            # Do not wait for slower attempts once a plan has been accepted
+            executor.shutdown(wait=False, cancel_futures=True)
+
     @staticmethod
     def _coerce_plan(manual_plan: GenerationPlan | dict[str, Any] | str) -> GenerationPlan:
         if isinstance(manual_plan, GenerationPlan):
@@ -285,11 +435,21 @@ class ChunkWiseGenerationPipeline:
     def _build_recent_text(self, section_outputs: list[str]) -> str:
         if not section_outputs:
             return ""
-        combined = " ".join(section_outputs)
+        max_tokens = self._config.prefix_window_tokens
+        if max_tokens <= 0:
+            return ""
+        # Only the newest sections can reach the window: walk back until they hold
+        # more than max_tokens, so the suffix is cut exactly where the full join would be
+        start = len(section_outputs)
+        covered = 0
+        while start > 0 and covered <= max_tokens:
+            start -= 1
+            covered += len(self._tokenizer.encode(section_outputs[start]))
+        combined = " ".join(section_outputs[start:])
         return take_last_tokens(
             text=combined,
             tokenizer=self._tokenizer,
-            max_tokens=self._config.prefix_window_tokens,
+            max_tokens=max_tokens,
         )
 
     def _build_minimal_section(self, section: SectionSpec) -> str:
@@ -343,14 +503,30 @@ class ChunkWiseGenerationPipeline:
             "closing_anchor_terms": closing_anchor_terms[:3],
         }
 
-    def _check_length(self, section: SectionSpec, section_text: str) -> str:
-        token_count = len(self._tokenizer.encode(section_text))
+    def _section_output_budget(self, section: SectionSpec) -> int | None:
+        margin = self._config.section_output_token_margin
+        if margin is None:
+            return None
+        upper_bound = max(1, int(section.target_length * self._config.max_section_length_ratio))
+        return max(1, int(upper_bound * margin))
+
+    def _section_length_bounds(self, section: SectionSpec) -> tuple[int, int]:
         lower_bound = max(
             1, int(section.target_length * self._config.min_section_length_ratio)
         )
         upper_bound = max(
             lower_bound, int(section.target_length * self._config.max_section_length_ratio)
         )
+        return lower_bound, upper_bound
+
+    def _check_length(
+        self,
+        section: SectionSpec,
+        section_text: str,
+        length_bounds: tuple[int, int] | None = None,
+    ) -> str:
+        token_count = len(self._tokenizer.encode(section_text))
+        lower_bound, upper_bound = length_bounds or self._section_length_bounds(section)
         if token_count < lower_bound or token_count > upper_bound:
             return (
                 f"Section '{section.title}' length {token_count} tokens is outside "
@@ -363,7 +539,9 @@ class ChunkWiseGenerationPipeline:
         section: SectionSpec,
         section_text: str,
         prev_section: str | None,
-    ) -> tuple[float, list[str]]:
+        length_bounds: tuple[int, int] | None = None,
+    ) -> tuple[float, list[str], list[str]]:
+        """Return the score, the issues and the missing entities (reused by the retry decision)."""
         score = 1.0
         issues: list[str] = []
 
@@ -375,18 +553,100 @@ class ChunkWiseGenerationPipeline:
                 score -= self._config.entity_missing_penalty
                 issues.append(f"Missing required entity: '{entity}'")
 
-        length_issue = self._check_length(section, section_text)
-        if length_issue and self._config.retry_on_length_violation:
-            score -= self._config.length_violation_penalty
-            issues.append(length_issue)
+        # The length check encodes the whole section; skip it when it cannot count
+        if self._config.retry_on_length_violation:
+            length_issue = self._check_length(section, section_text, length_bounds)
+            if length_issue:
+                score -= self._config.length_violation_penalty
+                issues.append(length_issue)
 
         if prev_section:
-            similarity = token_jaccard_helper(prev_section, section_text)
+            similarity = _bounded_token_jaccard(
+                prev_section, section_text, self._config.repetition_similarity_threshold
+            )
             if similarity >= self._config.repetition_similarity_threshold:
                 score -= self._config.repetition_penalty
                 issues.append(f"Too similar to previous section (score={similarity:.2f})")
 
-        return max(0.0, score), issues
+        return max(0.0, score), issues, missing_entities
+
+    def _best_section_candidate(
+        self,
+        request: LLMRequest,
+        count: int,
+        section: SectionSpec,
+        prev_section: str | None,
+        length_bounds: tuple[int, int],
+    ) -> str:
+        """Sample `count` first drafts concurrently and keep the highest-scoring one.
+
+        The samples bypass the response cache, which only ever holds the chosen draft.
+        """
+        cached = self._read_cached_response(request)
+        if cached is not None:
+            return cached.strip()
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            candidates = [
+                text.strip() for text in executor.map(self._model.generate, [request] * count)
+            ]
+        best_text = ""
+        best_score = -1.0
+        for text in candidates:
+            if not text:
+                continue
+            score = self._calculate_section_quality(section, text, prev_section, length_bounds)[0]
+            if score > best_score:
+                best_score = score
+                best_text = text
+        self._store_cached_response(request, best_text)
+        return best_text
+
+    def _draft_section_batch(
+        self,
+        plan: GenerationPlan,
+        state: GenerationState,
+        start_index: int,
+        previous_outputs: list[str],
+    ) -> dict[int, str]:
+        """Draft the next batch of sections in one call, keyed by section index."""
+        sections = plan.sections[start_index:start_index + self._config.section_batch_size]
+        if len(sections) < 2:
+            return {}
+
+        prompt = render_section_prompt_batch(
+            plan=plan,
+            state=state,
+            recent_text=self._build_recent_text(previous_outputs),
+            section_specs=sections,
+            prompt_language=self._config.prompt_language,
+            boundary_contracts=[
+                self._build_boundary_contract(plan=plan, section_index=start_index + offset)
+                for offset in range(len(sections))
+            ],
+        )
+        budgets = [self._section_output_budget(section) for section in sections]
+        answers = parse_batch_response(
+            self._generate(
+                LLMRequest(
+                    task="section_generation",
+                    prompt=prompt,
+                    estimated_output_tokens=None if None in budgets else sum(budgets),
+                )
+            ),
+            len(sections),
+        )
+        drafts = {
+            start_index + offset: answer
+            for offset, answer in enumerate(answers)
+            if answer
+        }
+        if len(drafts) < len(sections):
+            logger.warning(
+                f"[Pipeline] Section batch at {start_index + 1}: "
+                f"{len(sections) - len(drafts)} of {len(sections)} drafts missing, generating them individually"
+            )
+        return drafts
 
     def _generate_section_with_retries(
         self,
@@ -396,6 +656,7 @@ class ChunkWiseGenerationPipeline:
         section_index: int,
         prev_section: str | None,
         previous_outputs: list[str],
+        first_draft: str = "",
     ) -> tuple[str, list[str]]:
         best_text = ""
         best_score = -1.0
@@ -406,50 +667,65 @@ class ChunkWiseGenerationPipeline:
         )
 
         retry_limit = max(self._config.max_section_retries, 1)
+        length_bounds = self._section_length_bounds(section)
+        # The prefix depends only on earlier sections, so it is shared by all attempts
+        generated_prefix = self._build_recent_text(previous_outputs)
 
         for retry in range(retry_limit):
             logger.info(
                 f"[Pipeline] Section {section_index + 1}: attempt {retry + 1}/{retry_limit}"
             )
 
-            generated_prefix = self._build_recent_text(previous_outputs)
-
-            if retry == 0:
-                if self._config.prompt_compression_enabled:
-                    prompt = render_section_prompt_compressed(
-                        plan=plan,
-                        state=state,
-                        section_spec=section,
-                        recent_text=generated_prefix,
-                        section_index=section_index,
-                        config=self._config,
-                        prompt_language=self._config.prompt_language,
-                        boundary_contract=boundary_contract,
-                    )
+            if retry == 0 and first_draft:
+                section_text = first_draft
+            else:
+                if retry == 0:
+                    if self._config.prompt_compression_enabled:
+                        prompt = render_section_prompt_compressed(
+                            plan=plan,
+                            state=state,
+                            section_spec=section,
+                            recent_text=generated_prefix,
+                            section_index=section_index,
+                            config=self._config,
+                            prompt_language=self._config.prompt_language,
+                            boundary_contract=boundary_contract,
+                        )
+                    else:
+                        prompt = render_section_prompt(
+                            plan=plan,
+                            state=state,
+                            recent_text=generated_prefix,
+                            section_spec=section,
+                            prompt_language=self._config.prompt_language,
+                            boundary_contract=boundary_contract,
+                        )
                 else:
-                    prompt = render_section_prompt(
+                    prompt = render_section_repair_prompt(
                         plan=plan,
                         state=state,
-                        recent_text=generated_prefix,
                         section_spec=section,
+                        current_text=best_text,
+                        quality_issues=all_issues,
+                        retry_index=retry,
                         prompt_language=self._config.prompt_language,
                         boundary_contract=boundary_contract,
                     )
-            else:
-                prompt = render_section_repair_prompt(
-                    plan=plan,
-                    state=state,
-                    section_spec=section,
-                    current_text=best_text,
-                    quality_issues=all_issues,
-                    retry_index=retry,
-                    prompt_language=self._config.prompt_language,
-                    boundary_contract=boundary_contract,
-                )
 
-            section_text = self._model.generate(
-                LLMRequest(task="section_generation", prompt=prompt)
-            ).strip()
+                request = LLMRequest(
+                    task="section_generation",
+                    prompt=prompt,
+                    estimated_output_tokens=self._section_output_budget(section),
+                    # Only repair prompts show the model the `=== ` scaffold it could echo
+                    stop=SECTION_STOP_SEQUENCES if retry > 0 else (),
+                )
+                candidate_count = self._config.section_first_attempt_candidates
+                if retry == 0 and candidate_count > 1:
+                    section_text = self._best_section_candidate(
+                        request, candidate_count, section, prev_section, length_bounds
+                    )
+                else:
+                    section_text = self._generate(request).strip()
 
             if not section_text:
                 logger.warning(
@@ -457,7 +733,9 @@ class ChunkWiseGenerationPipeline:
                 )
                 continue
 
-            score, issues = self._calculate_section_quality(section, section_text, prev_section)
+            score, issues, missing_entities = self._calculate_section_quality(
+                section, section_text, prev_section, length_bounds
+            )
 
             logger.info(
                 f"[Pipeline] Section {section_index + 1} attempt {retry + 1}: score={score:.2f}, issues={len(issues)}"
@@ -468,9 +746,6 @@ class ChunkWiseGenerationPipeline:
                 best_text = section_text
                 all_issues = issues
 
-            missing_entities = self._entity_checker.missing_entities(
-                section=section, text=section_text
-            )
             has_critical_issues = self._config.retry_on_missing_entities and missing_entities
 
             if score >= self._config.section_quality_threshold and not has_critical_issues:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Literal
 
@@ -28,6 +29,10 @@ class PipelineConfig:
     global_anchor_mode: Literal["none", "head"] = "head"
     default_style_instruction: str = "neutral factual rewrite"
     prompt_language: Literal["en", "zh"] = "en"
+    # >1 时将相互独立的分块打包为一次请求（需 prefix_window_tokens<=0 且模型支持 rewrite_batch）
+    batch_size: int = 1
+    # 批处理模式下并行做保真度校验/重试的线程数，与下一批请求的网络等待重叠（1 表示串行）
+    postprocess_workers: int = 1
 
     # 兼容旧参数名
     @property
@@ -72,6 +77,31 @@ class ChunkWiseRephrasePipeline:
         global_anchor = self._build_global_anchor(text)
         if global_anchor:
             logger.info(f"Global anchor built: {len(global_anchor)} chars")
+        if self._can_batch_chunks():
+            rewritten_chunks = self._rewrite_chunks_batched(
+                chunks=chunks,
+                global_anchor=global_anchor,
+                style_instruction=style_instruction,
+            )
+        else:
+            rewritten_chunks = self._rewrite_chunks_sequential(
+                chunks=chunks,
+                global_anchor=global_anchor,
+                style_instruction=style_instruction,
+            )
+
+        return stitch_rewritten_chunks(
+            chunks=rewritten_chunks,
+            tokenizer=self._tokenizer,
+            max_overlap_tokens=self._config.max_stitch_overlap_tokens,
+        )
+
+    def _rewrite_chunks_sequential(
+        self,
+        chunks: List[str],
+        global_anchor: str,
+        style_instruction: str,
+    ) -> List[str]:
         rewritten_chunks: List[str] = []
 
         for idx, chunk in enumerate(chunks):
@@ -94,11 +124,91 @@ class ChunkWiseRephrasePipeline:
             rewritten_chunks.append(rewritten)
             logger.info(f"  Chunk {chunk_num} done: {len(chunk)} -> {len(rewritten)} chars")
 
-        return stitch_rewritten_chunks(
-            chunks=rewritten_chunks,
-            tokenizer=self._tokenizer,
-            max_overlap_tokens=self._config.max_stitch_overlap_tokens,
+        return rewritten_chunks
+
+    def _can_batch_chunks(self) -> bool:
+        # With a generated-prefix window every chunk depends on the previous rewrite.
+        return (
+            self._config.batch_size > 1
+            and self._config.prefix_window_tokens <= 0
+            and hasattr(self._model, "rewrite_batch")
+        )
+
+    def _rewrite_chunks_batched(
+        self,
+        chunks: List[str],
+        global_anchor: str,
+        style_instruction: str,
+    ) -> List[str]:
+        instruction = style_instruction or self._config.default_style_instruction
+        batch_size = self._config.batch_size
+        workers = self._config.postprocess_workers
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        pending: List[Future[str]] = []
+        rewritten_chunks: List[str] = []
+
+        try:
+            for start in range(0, len(chunks), batch_size):
+                group = chunks[start : start + batch_size]
+                logger.info(
+                    f"Processing chunks {start + 1}-{start + len(group)}/{len(chunks)} as one batch..."
+                )
+                requests = [
+                    RewriteRequest(
+                        style_instruction=instruction,
+                        global_anchor=global_anchor,
+                        generated_prefix="",
+                        current_chunk=chunk,
+                        retry_index=0,
+                        strict_fidelity=False,
+                        prompt_language=self._config.prompt_language,
+                    )
+                    for chunk in group
+                ]
+                candidates = self._model.rewrite_batch(requests)  # type: ignore[attr-defined]
+                for offset, (chunk, candidate) in enumerate(zip(group, candidates)):
+                    finish_kwargs = dict(
+                        chunk=chunk,
+                        global_anchor=global_anchor,
+                        style_instruction=style_instruction,
+                        chunk_num=start + offset + 1,
+                        total_chunks=len(chunks),
+                        candidate=candidate,
+                    )
+                    # 分块间相互独立：校验与重试交给线程池，主线程继续发出下一批请求
+                    if executor is not None:
+                        pending.append(executor.submit(self._finish_batched_chunk, **finish_kwargs))
+                    else:
+                        rewritten_chunks.append(self._finish_batched_chunk(**finish_kwargs))
+
+            # 按提交顺序收集，保证与分块顺序一致
+            rewritten_chunks.extend(future.result() for future in pending)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        return rewritten_chunks
+
+    def _finish_batched_chunk(
+        self,
+        chunk: str,
+        global_anchor: str,
+        style_instruction: str,
+        chunk_num: int,
+        total_chunks: int,
+        candidate: str,
+    ) -> str:
+        rewritten = self._rewrite_chunk_with_retries(
+            chunk=chunk,
+            generated_prefix="",
+            global_anchor=global_anchor,
+            style_instruction=style_instruction,
+            chunk_num=chunk_num,
+            total_chunks=total_chunks,
+            first_candidate=candidate,
         )
+        logger.info(f"  Chunk {chunk_num} done: {len(chunk)} -> {len(rewritten)} chars")
+        return rewritten
 
     def _build_generated_prefix(self, rewritten_chunks: List[str]) -> str:
         if not rewritten_chunks:
@@ -124,6 +234,7 @@ class ChunkWiseRephrasePipeline:
         style_instruction: str,
         chunk_num: int = 0,
         total_chunks: int = 0,
+        first_candidate: str | None = None,
     ) -> str:
         best_candidate = ""
         best_score = -1.0
@@ -143,7 +254,10 @@ class ChunkWiseRephrasePipeline:
                 strict_fidelity=retry_index > 0,
                 prompt_language=self._config.prompt_language,
             )
-            candidate = self._model.rewrite(request).strip()
+            if retry_index == 0 and first_candidate is not None:
+                candidate = first_candidate.strip()
+            else:
+                candidate = self._model.rewrite(request).strip()
             if not candidate:
                 logger.warning(f"  Chunk {chunk_num}: model returned empty, using original")
                 candidate = chunk
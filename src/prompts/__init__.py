@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from prompts.base import PromptLanguage
+from prompts.batch import parse_batch_response, render_batch_prompt
 from prompts.generation import (
+    audit_section_prompt,
     render_consistency_prompt,
     render_plan_prompt,
     render_section_prompt,
+    render_section_prompt_batch,
     render_section_prompt_compressed,
     render_section_repair_prompt,
 )
@@ -18,5 +21,9 @@ __all__ = [
     "render_section_prompt",
     "render_consistency_prompt",
     "render_section_prompt_compressed",
+    "render_section_prompt_batch",
+    "audit_section_prompt",
     "render_section_repair_prompt",
+    "render_batch_prompt",
+    "parse_batch_response",
 ]
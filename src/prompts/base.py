@@ -10,5 +10,8 @@ def _resolve_prompt_language(prompt_language: str) -> PromptLanguage:
     return "zh" if prompt_language == "zh" else "en"
 
 
+_NONE_TEXT: dict[str, str] = {"en": "(none)", "zh": "(无)"}
+
+
 def _none_text(prompt_language: PromptLanguage) -> str:
-    return "(无)" if prompt_language == "zh" else "(none)"
+    return _NONE_TEXT["zh" if prompt_language == "zh" else "en"]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+_ANSWER_PATTERN = re.compile(r"<answer id=(\d+)>(.*?)</answer>", re.DOTALL)
+
+
+def render_batch_prompt(prompts: Sequence[str]) -> str:
+    """Pack independent task prompts into one prompt with id-tagged answer slots."""
+    parts = [
+        f"You will receive {len(prompts)} independent tasks. Complete each task separately.",
+        "Wrap each answer as <answer id=K>...</answer>, where K is the task id.",
+        "Output only the answers in id order. Do not write anything outside the answer tags.",
+    ]
+    for idx, prompt in enumerate(prompts):
+        parts.append(f"<task id={idx}>\n{prompt}\n</task>")
+    return "\n\n".join(parts)
+
+
+def parse_batch_response(raw: str, count: int) -> list[str | None]:
+    """Split a batched response back into per-task answers.
+
+    Slots the model did not answer (or tagged with an unknown id) are None.
+    """
+    answers: list[str | None] = [None] * count
+    for match in _ANSWER_PATTERN.finditer(raw):
+        idx = int(match.group(1))
+        if 0 <= idx < count and answers[idx] is None:
+            answers[idx] = match.group(2).strip()
+    return answers
+
+
+__all__ = [
+    "render_batch_prompt",
+    "parse_batch_response",
+]
@@ -1,29 +1,24 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from functools import lru_cache
+from typing import Any, Sequence
 
 from generation_types import GenerationConfig, GenerationPlan, GenerationState, QualityReport, SectionSpec
-from prompts.base import PromptLanguage, _none_text, _resolve_prompt_language
+from prompts.base import _NONE_TEXT, PromptLanguage, _resolve_prompt_language
 
+# Prompt blobs are serialized on every LLM call; reuse one configured encoder
+# instead of letting json.dumps build a new one per call.
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
 
-def render_plan_prompt(
-    topic: str,
-    objective: str,
-    target_tokens: int,
-    audience: str,
-    tone: str,
-    prompt_language: PromptLanguage = "en",
-) -> str:
-    language = _resolve_prompt_language(prompt_language)
-    audience_text = audience or ("通用技术受众" if language == "zh" else "general technical audience")
-    tone_text = tone or ("中性技术风格" if language == "zh" else "neutral technical")
-    schema_hint = {
-        "topic": topic,
-        "objective": objective,
-        "audience": audience_text,
-        "tone": tone_text,
-        "target_total_length": target_tokens,
+# Repair prompt scaffolding delimiters; a model echoing them has finished the body text.
+SECTION_STOP_SEQUENCES: tuple[str, ...] = ("\n=== ",)
+
+
+# Example fields of the plan schema hint; serialized once, since only the
+# request-specific fields before them change between calls.
+_PLAN_SCHEMA_STATIC_JSON = _dumps(
+    {
         "narrative_voice": "third-person",
         "do_not_include": ["unsupported claims"],
         "terminology_preferences": {"example_term": "preferred phrasing"},
@@ -36,48 +31,160 @@ def render_plan_prompt(
                 "target_length": 300,
             }
         ],
-    }
+    },
+)
+
+
+def _render_plan_schema(
+    topic: str,
+    objective: str,
+    audience: str,
+    tone: str,
+    target_tokens: int,
+) -> str:
+    dynamic_json = _dumps(
+        {
+            "topic": topic,
+            "objective": objective,
+            "audience": audience,
+            "tone": tone,
+            "target_total_length": target_tokens,
+        },
+    )
+    # Splice both objects; matches json.dumps of the merged dict byte for byte
+    return f"{dynamic_json[:-1]}, {_PLAN_SCHEMA_STATIC_JSON[1:]}"
 
-    if language == "zh":
-        return "\n\n".join(
-            [
-                "你正在规划一个长文分节生成任务。",
-                "关键要求：只输出下方 JSON 对象，不要输出思考、规划或解释文本。",
-                "你的回复必须以 '{' 开始、以 '}' 结束，JSON 前后不能有任何额外文本。",
-                "不要使用 markdown 代码块，不要添加注释，只返回原始 JSON。",
-                "",
-                "请构建完整的生成计划，保证章节衔接合理且覆盖点明确。",
-                f"主题：{topic}",
-                f"目标：{objective}",
-                f"受众：{audience_text}",
-                f"语气：{tone_text}",
-                f"目标总长度（tokens）：{target_tokens}",
-                "",
-                "输出结构（只返回符合该结构的 JSON 对象）：",
-                json.dumps(schema_hint, ensure_ascii=False),
-            ]
-        )
 
-    return "\n\n".join(
+_PLAN_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n\n".join(
+        [
+            "你正在规划一个长文分节生成任务。",
+            "关键要求：只输出下方 JSON 对象，不要输出思考、规划或解释文本。",
+            "你的回复必须以 '{{' 开始、以 '}}' 结束，JSON 前后不能有任何额外文本。",
+            "不要使用 markdown 代码块，不要添加注释，只返回原始 JSON。",
+            "",
+            "请构建完整的生成计划，保证章节衔接合理且覆盖点明确。",
+            "主题：{topic}",
+            "目标：{objective}",
+            "受众：{audience}",
+            "语气：{tone}",
+            "目标总长度（tokens）：{target_tokens}",
+            "",
+            "输出结构（只返回符合该结构的 JSON 对象）：",
+            "{schema}",
+        ]
+    ),
+    "en": "\n\n".join(
         [
             "You are planning a long-form, section-wise generation task.",
             "CRITICAL: Output ONLY the JSON object below. Do not output any thinking, planning, or explanation text.",
-            "Your response must START with '{' and END with '}'. No text before or after the JSON.",
+            "Your response must START with '{{' and END with '}}'. No text before or after the JSON.",
             "Do not wrap in markdown code blocks. Do not include comments. Just the raw JSON.",
             "",
             "Build a complete generation plan with coherent sections and explicit coverage points.",
-            f"Topic: {topic}",
-            f"Objective: {objective}",
-            f"Audience: {audience_text}",
-            f"Tone: {tone_text}",
-            f"Target total length (tokens): {target_tokens}",
+            "Topic: {topic}",
+            "Objective: {objective}",
+            "Audience: {audience}",
+            "Tone: {tone}",
+            "Target total length (tokens): {target_tokens}",
             "",
             "Output schema (return ONLY a JSON object matching this structure):",
-            json.dumps(schema_hint, ensure_ascii=False),
+            "{schema}",
         ]
+    ),
+}
+
+
+def render_plan_prompt(
+    topic: str,
+    objective: str,
+    target_tokens: int,
+    audience: str,
+    tone: str,
+    prompt_language: PromptLanguage = "en",
+) -> str:
+    language = _resolve_prompt_language(prompt_language)
+    audience_text = audience or ("通用技术受众" if language == "zh" else "general technical audience")
+    tone_text = tone or ("中性技术风格" if language == "zh" else "neutral technical")
+    schema_blob = _render_plan_schema(
+        topic=topic,
+        objective=objective,
+        audience=audience_text,
+        tone=tone_text,
+        target_tokens=target_tokens,
+    )
+
+    return _PLAN_PROMPT_TEMPLATES[language].format(
+        topic=topic,
+        objective=objective,
+        audience=audience_text,
+        tone=tone_text,
+        target_tokens=target_tokens,
+        schema=schema_blob,
     )
 
 
+# Opening lines shared by the full and compressed section prompts
+_SECTION_PREAMBLES: dict[str, tuple[str, ...]] = {
+    "zh": (
+        "你正在生成一篇长文中的一个章节。",
+        "关键要求：只输出章节正文，不要输出思考、规划或前言。",
+    ),
+    "en": (
+        "You are generating one section of a long article.",
+        "CRITICAL: Output ONLY the section body text. No thinking, no planning, no preamble.",
+    ),
+}
+
+
+_SECTION_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n\n".join(
+        [
+            *_SECTION_PREAMBLES["zh"],
+            "规则：",
+            "1) 严格遵循全局计划和当前章节规格。",
+            "2) 术语、实体与时间线需与当前状态保持一致。",
+            "3) 避免重复最近文本中已覆盖的要点。",
+            "4) 必须执行章节边界契约字段：opening_bridge 与 closing_handoff。",
+            "5) opening_bridge 应体现在开头 1-2 句；closing_handoff 应体现在结尾 1-2 句。",
+            "6) 只输出当前章节正文，不要输出 JSON、markdown 或解释。",
+            "全局计划：",
+            "{plan}",
+            "当前状态：",
+            "{state}",
+            "最近已生成文本：\n{recent}",
+            "当前章节规格：",
+            "{section}",
+            "章节边界契约：",
+            "{contract}",
+            "目标长度为近似值（允许 ±20%）。",
+        ]
+    ),
+    "en": "\n\n".join(
+        [
+            *_SECTION_PREAMBLES["en"],
+            "Rules:",
+            "1) Follow plan and current section spec strictly.",
+            "2) Keep terminology, entities, and timeline consistent with state.",
+            "3) Avoid repeating points already covered in recent text.",
+            "4) Enforce boundary contract fields: opening_bridge and closing_handoff.",
+            "5) opening_bridge must appear in the first 1-2 sentences; closing_handoff in the final 1-2 sentences.",
+            "6) Output only the current section body text - no JSON, no markdown, no explanations.",
+            "Global plan:",
+            "{plan}",
+            "Current state:",
+            "{state}",
+            "Recent generated text:\n{recent}",
+            "Current section spec:",
+            "{section}",
+            "Boundary contract:",
+            "{contract}",
+            "Target length is approximate (allow +/-20%).",
+        ]
+    ),
+}
+
+
 def render_section_prompt(
     plan: GenerationPlan,
     state: GenerationState,
@@ -87,8 +194,21 @@ def render_section_prompt(
     boundary_contract: dict[str, Any] | None = None,
 ) -> str:
     language = _resolve_prompt_language(prompt_language)
-    plan_blob = json.dumps(plan.to_dict(), ensure_ascii=False)
-    state_blob = json.dumps(
+    return _SECTION_PROMPT_TEMPLATES[language].format(
+        **_section_prompt_parts(plan, state, recent_text, section_spec, language, boundary_contract)
+    )
+
+
+def _section_prompt_parts(
+    plan: GenerationPlan,
+    state: GenerationState,
+    recent_text: str,
+    section_spec: SectionSpec,
+    language: PromptLanguage,
+    boundary_contract: dict[str, Any] | None,
+) -> dict[str, str]:
+    plan_blob = plan.to_json()
+    state_blob = _dumps(
         {
             "known_entities": state.known_entities,
             "terminology_map": state.terminology_map,
@@ -96,111 +216,125 @@ def render_section_prompt(
             "covered_key_points": state.covered_key_points,
             "remaining_key_points": state.remaining_key_points,
         },
-        ensure_ascii=False,
     )
-    section_blob = json.dumps(section_spec.to_dict(), ensure_ascii=False)
+    section_blob = section_spec.to_json()
     normalized_contract = _normalize_boundary_contract(boundary_contract)
-    contract_blob = json.dumps(normalized_contract, ensure_ascii=False)
+    contract_blob = _dumps(normalized_contract)
+
+    return {
+        "plan": plan_blob,
+        "state": state_blob,
+        "recent": recent_text or _NONE_TEXT[language],
+        "section": section_blob,
+        "contract": contract_blob,
+    }
 
-    if language == "zh":
-        return "\n\n".join(
-            [
-                "你正在生成一篇长文中的一个章节。",
-                "关键要求：只输出章节正文，不要输出思考、规划或前言。",
-                "规则：",
-                "1) 严格遵循全局计划和当前章节规格。",
-                "2) 术语、实体与时间线需与当前状态保持一致。",
-                "3) 避免重复最近文本中已覆盖的要点。",
-                "4) 必须执行章节边界契约字段：opening_bridge 与 closing_handoff。",
-                "5) opening_bridge 应体现在开头 1-2 句；closing_handoff 应体现在结尾 1-2 句。",
-                "6) 只输出当前章节正文，不要输出 JSON、markdown 或解释。",
-                "全局计划：",
-                plan_blob,
-                "当前状态：",
-                state_blob,
-                f"最近已生成文本：\n{recent_text or _none_text(language)}",
-                "当前章节规格：",
-                section_blob,
-                "章节边界契约：",
-                contract_blob,
-                "目标长度为近似值（允许 ±20%）。",
-            ]
-        )
 
-    return "\n\n".join(
+_SECTION_BATCH_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n\n".join(
+        [
+            "你正在连续生成一篇长文中的 {count} 个相邻章节。",
+            "关键要求：只输出章节正文，不要输出思考、规划或前言。",
+            "规则：",
+            "1) 严格遵循全局计划和每个章节规格。",
+            "2) 术语、实体与时间线需与当前状态保持一致。",
+            "3) 按 id 顺序写作，每个章节都承接上一章节，避免重复已覆盖要点。",
+            "4) 每个章节都必须执行其边界契约：opening_bridge 体现在开头 1-2 句，closing_handoff 体现在结尾 1-2 句。",
+            "5) 将每个章节正文包裹为 <answer id=K>...</answer>，K 为章节 id；标签之外不要输出任何内容。",
+            "全局计划：",
+            "{plan}",
+            "当前状态：",
+            "{state}",
+            "最近已生成文本：\n{recent}",
+            "待生成章节：",
+            "{tasks}",
+            "各章节目标长度为近似值（允许 ±20%）。",
+        ]
+    ),
+    "en": "\n\n".join(
         [
-            "You are generating one section of a long article.",
-            "CRITICAL: Output ONLY the section body text. No thinking, no planning, no preamble.",
+            "You are generating {count} consecutive sections of a long article.",
+            "CRITICAL: Output ONLY the section body texts. No thinking, no planning, no preamble.",
             "Rules:",
-            "1) Follow plan and current section spec strictly.",
+            "1) Follow the plan and each section spec strictly.",
             "2) Keep terminology, entities, and timeline consistent with state.",
-            "3) Avoid repeating points already covered in recent text.",
-            "4) Enforce boundary contract fields: opening_bridge and closing_handoff.",
-            "5) opening_bridge must appear in the first 1-2 sentences; closing_handoff in the final 1-2 sentences.",
-            "6) Output only the current section body text - no JSON, no markdown, no explanations.",
+            "3) Write the sections in id order; each continues from the one before it without repeating covered points.",
+            "4) Enforce each section's boundary contract: opening_bridge in its first 1-2 sentences, closing_handoff in its final 1-2 sentences.",
+            "5) Wrap each section body as <answer id=K>...</answer>, where K is the section id. Write nothing outside the answer tags.",
             "Global plan:",
-            plan_blob,
+            "{plan}",
             "Current state:",
-            state_blob,
-            f"Recent generated text:\n{recent_text or _none_text(language)}",
-            "Current section spec:",
-            section_blob,
-            "Boundary contract:",
-            contract_blob,
-            "Target length is approximate (allow +/-20%).",
+            "{state}",
+            "Recent generated text:\n{recent}",
+            "Sections to write:",
+            "{tasks}",
+            "Each target length is approximate (allow +/-20%).",
         ]
-    )
+    ),
+}
 
 
-def render_consistency_prompt(
+def render_section_prompt_batch(
     plan: GenerationPlan,
     state: GenerationState,
-    draft_text: str,
-    quality_report: QualityReport,
+    recent_text: str,
+    section_specs: Sequence[SectionSpec],
     prompt_language: PromptLanguage = "en",
+    boundary_contracts: Sequence[dict[str, Any] | None] | None = None,
 ) -> str:
+    """Render one prompt drafting several consecutive sections.
+
+    The plan and state blobs are emitted once for the whole batch; answers use the
+    id-tagged format read back by `parse_batch_response`.
+    """
     language = _resolve_prompt_language(prompt_language)
-    issues_blob = json.dumps(
+    contracts = list(boundary_contracts or [])
+    contracts.extend([None] * (len(section_specs) - len(contracts)))
+    tasks = "\n\n".join(
+        f"<task id={idx}>\n{spec.to_json()}\n{_dumps(_normalize_boundary_contract(contract))}\n</task>"
+        for idx, (spec, contract) in enumerate(zip(section_specs, contracts))
+    )
+    state_blob = _dumps(
         {
-            "coverage_missing": quality_report.coverage_missing,
-            "terminology_issues": quality_report.terminology_issues,
-            "repetition_issues": quality_report.repetition_issues,
-            "drift_issues": quality_report.drift_issues,
+            "known_entities": state.known_entities,
+            "terminology_map": state.terminology_map,
+            "timeline": state.timeline,
+            "covered_key_points": state.covered_key_points,
+            "remaining_key_points": state.remaining_key_points,
         },
-        ensure_ascii=False,
     )
 
-    if language == "zh":
-        return "\n\n".join(
-            [
-                "你正在对已生成长文执行轻量一致性修订。",
-                "关键要求：只输出修订后的完整文本，不要输出思考、规划或前言。",
-                "仅允许以下修改：",
-                "1) 修正术语一致性",
-                "2) 优化章节间衔接",
-                "3) 为缺失关键点补充 1-2 句短句",
-                "不要进行大幅重写，也不要改变整体结构。",
-                "计划：",
-                json.dumps(plan.to_dict(), ensure_ascii=False),
-                "状态：",
-                json.dumps(
-                    {
-                        "known_entities": state.known_entities,
-                        "terminology_map": state.terminology_map,
-                        "timeline": state.timeline,
-                        "remaining_key_points": state.remaining_key_points,
-                    },
-                    ensure_ascii=False,
-                ),
-                "质量发现：",
-                issues_blob,
-                "草稿文本：",
-                draft_text,
-                "只输出修订后的完整文本。",
-            ]
-        )
+    return _SECTION_BATCH_PROMPT_TEMPLATES[language].format(
+        count=len(section_specs),
+        plan=plan.to_json(),
+        state=state_blob,
+        recent=recent_text or _NONE_TEXT[language],
+        tasks=tasks,
+    )
 
-    return "\n\n".join(
+
+_CONSISTENCY_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n\n".join(
+        [
+            "你正在对已生成长文执行轻量一致性修订。",
+            "关键要求：只输出修订后的完整文本，不要输出思考、规划或前言。",
+            "仅允许以下修改：",
+            "1) 修正术语一致性",
+            "2) 优化章节间衔接",
+            "3) 为缺失关键点补充 1-2 句短句",
+            "不要进行大幅重写，也不要改变整体结构。",
+            "计划：",
+            "{plan}",
+            "状态：",
+            "{state}",
+            "质量发现：",
+            "{issues}",
+            "草稿文本：",
+            "{draft}",
+            "只输出修订后的完整文本。",
+        ]
+    ),
+    "en": "\n\n".join(
         [
             "You are running a light consistency pass on a generated long-form draft.",
             "CRITICAL: Output ONLY the revised full text. No thinking, no planning, no preamble.",
@@ -210,45 +344,159 @@ def render_consistency_prompt(
             "3) add 1-2 short sentences for missing key points",
             "Do not perform major rewrites or change the structure.",
             "Plan:",
-            json.dumps(plan.to_dict(), ensure_ascii=False),
+            "{plan}",
             "State:",
-            json.dumps(
-                {
-                    "known_entities": state.known_entities,
-                    "terminology_map": state.terminology_map,
-                    "timeline": state.timeline,
-                    "remaining_key_points": state.remaining_key_points,
-                },
-                ensure_ascii=False,
-            ),
+            "{state}",
             "Quality findings:",
-            issues_blob,
+            "{issues}",
             "Draft text:",
-            draft_text,
+            "{draft}",
             "Output only the revised full text.",
         ]
+    ),
+}
+
+
+def render_consistency_prompt(
+    plan: GenerationPlan,
+    state: GenerationState,
+    draft_text: str,
+    quality_report: QualityReport,
+    prompt_language: PromptLanguage = "en",
+) -> str:
+    language = _resolve_prompt_language(prompt_language)
+    issues_blob = _dumps(
+        {
+            "coverage_missing": quality_report.coverage_missing,
+            "terminology_issues": quality_report.terminology_issues,
+            "repetition_issues": quality_report.repetition_issues,
+            "drift_issues": quality_report.drift_issues,
+        },
+    )
+    state_blob = _dumps(
+        {
+            "known_entities": state.known_entities,
+            "terminology_map": state.terminology_map,
+            "timeline": state.timeline,
+            "remaining_key_points": state.remaining_key_points,
+        },
+    )
+
+    return _CONSISTENCY_PROMPT_TEMPLATES[language].format(
+        plan=plan.to_json(),
+        state=state_blob,
+        issues=issues_blob,
+        draft=draft_text,
     )
 
 
 # Prompt compression helpers
 
+# Empty placeholder and truncated-summary template for covered key points
+_COVERED_SUMMARY_TEXT: dict[str, tuple[str, str]] = {
+    "zh": ("暂无", "共 {total} 个要点，最近：{recent}"),
+    "en": ("None yet", "{total} points total, recent: {recent}"),
+}
+
+
 def _summarize_covered_points(
     covered: list[str],
     max_items: int = 3,
     prompt_language: PromptLanguage = "en",
 ) -> str:
     """Summarize covered key points into a short string."""
-    language = _resolve_prompt_language(prompt_language)
-    if not covered:
-        return "暂无" if language == "zh" else "None yet"
-
-    if len(covered) <= max_items:
+    empty_text, truncated_template = _COVERED_SUMMARY_TEXT[_resolve_prompt_language(prompt_language)]
+    total = len(covered)
+    if not total:
+        return empty_text
+    if total <= max_items:
         return "; ".join(covered)
+    return truncated_template.format(total=total, recent="; ".join(covered[-max_items:]))
 
-    recent = covered[-max_items:]
-    if language == "zh":
-        return f"共 {len(covered)} 个要点，最近：{'; '.join(recent)}"
-    return f"{len(covered)} points total, recent: " + "; ".join(recent)
+
+# Rough chars-per-token ratio used to budget prompt context without a tokenizer
+_CHARS_PER_TOKEN_ESTIMATE = 4
+
+
+def _estimate_prompt_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN_ESTIMATE
+
+
+def _fit_context_to_budget(
+    plan_context: dict[str, Any],
+    incremental_state: dict[str, Any],
+    budget_tokens: int,
+) -> None:
+    """Drop low-priority context items in place until both blocks fit the budget.
+
+    Timeline entries go first (oldest first), then known entities (oldest first),
+    then upcoming section titles (farthest first). The current section spec and
+    its remaining points are never dropped.
+    """
+    excess_chars = (
+        len(_dumps(plan_context))
+        + len(_dumps(incremental_state))
+        - budget_tokens * _CHARS_PER_TOKEN_ESTIMATE
+    )
+    for items, drop_index in (
+        (incremental_state["timeline"], 0),
+        (incremental_state["known_entities"], 0),
+        (plan_context["upcoming_sections"], -1),
+    ):
+        while excess_chars > 0 and items:
+            dropped = _dumps(items.pop(drop_index))
+            # Every item but the last one left also costs a ", " separator
+            excess_chars -= len(dropped) + (2 if items else 0)
+
+
+_COMPRESSED_SECTION_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n\n".join(
+        [
+            *_SECTION_PREAMBLES["zh"],
+            "规则：",
+            "1) 严格遵循当前章节规格。",
+            "2) 术语需与已知实体保持一致。",
+            "3) 覆盖下方列出的当前章节剩余要点。",
+            "4) 不要重复 covered summary 中已覆盖内容。",
+            "5) 严格执行边界契约字段 opening_bridge 与 closing_handoff。",
+            "6) opening_bridge 体现在开头 1-2 句，closing_handoff 体现在结尾 1-2 句。",
+            "7) 保持与后续章节衔接。",
+            "",
+            "计划上下文：\n{plan_context}",
+            "",
+            "增量状态（进度: {progress}）：\n{state}",
+            "",
+            "章节边界契约：\n{contract}",
+            "",
+            "最近已生成文本：\n{recent}",
+            "",
+            "只输出当前章节正文。",
+        ]
+    ),
+    "en": "\n\n".join(
+        [
+            *_SECTION_PREAMBLES["en"],
+            "Rules:",
+            "1) Follow the current section spec strictly.",
+            "2) Keep terminology consistent with known entities.",
+            "3) Cover this section's remaining points listed below.",
+            "4) Do not repeat content summarized in covered summary.",
+            "5) Enforce boundary contract fields: opening_bridge and closing_handoff.",
+            "6) opening_bridge belongs in the first 1-2 sentences; closing_handoff in the final 1-2 sentences.",
+            "7) Maintain coherence with upcoming sections.",
+            "",
+            "Plan context:\n{plan_context}",
+            "",
+            "Incremental state (progress: {progress}):\n{state}",
+            "",
+            "Boundary contract:\n{contract}",
+            "",
+            "Recent generated text:\n{recent}",
+            "",
+            "Output only the current section body text.",
+        ]
+    ),
+}
 
 
 def render_section_prompt_compressed(
@@ -263,6 +511,23 @@ def render_section_prompt_compressed(
 ) -> str:
     """Render a compressed section prompt with minimal context injection."""
     language = _resolve_prompt_language(prompt_language)
+    return _COMPRESSED_SECTION_PROMPT_TEMPLATES[language].format(
+        **_compressed_section_prompt_parts(
+            plan, state, section_spec, recent_text, section_index, config, language, boundary_contract
+        )
+    )
+
+
+def _compressed_section_prompt_parts(
+    plan: GenerationPlan,
+    state: GenerationState,
+    section_spec: SectionSpec,
+    recent_text: str,
+    section_index: int,
+    config: GenerationConfig | None,
+    language: PromptLanguage,
+    boundary_contract: dict[str, Any] | None,
+) -> dict[str, str]:
     if config is None:
         config = GenerationConfig()
 
@@ -304,313 +569,196 @@ def render_section_prompt_compressed(
         "covered_summary": covered_summary,
         "remaining_points": section_remaining_points,
     }
+    if config.compressed_context_budget_tokens is not None:
+        _fit_context_to_budget(plan_context, incremental_state, config.compressed_context_budget_tokens)
     normalized_contract = _normalize_boundary_contract(boundary_contract)
 
-    if language == "zh":
-        return "\n\n".join(
-            [
-                "你正在生成一篇长文中的一个章节。",
-                "关键要求：只输出章节正文，不要输出思考、规划或前言。",
-                "规则：",
-                "1) 严格遵循当前章节规格。",
-                "2) 术语需与已知实体保持一致。",
-                "3) 覆盖下方列出的当前章节剩余要点。",
-                "4) 不要重复 covered summary 中已覆盖内容。",
-                "5) 严格执行边界契约字段 opening_bridge 与 closing_handoff。",
-                "6) opening_bridge 体现在开头 1-2 句，closing_handoff 体现在结尾 1-2 句。",
-                "7) 保持与后续章节衔接。",
-                "",
-                f"计划上下文：\n{json.dumps(plan_context, ensure_ascii=False, indent=2)}",
-                "",
-                f"增量状态（进度: {progress}）：\n{json.dumps(incremental_state, ensure_ascii=False, indent=2)}",
-                "",
-                f"章节边界契约：\n{json.dumps(normalized_contract, ensure_ascii=False, indent=2)}",
-                "",
-                f"最近已生成文本：\n{recent_text or _none_text(language)}",
-                "",
-                "只输出当前章节正文。",
-            ]
-        )
-
-    return "\n\n".join(
-        [
-            "You are generating one section of a long article.",
-            "CRITICAL: Output ONLY the section body text. No thinking, no planning, no preamble.",
-            "Rules:",
-            "1) Follow the current section spec strictly.",
-            "2) Keep terminology consistent with known entities.",
-            "3) Cover this section's remaining points listed below.",
-            "4) Do not repeat content summarized in covered summary.",
-            "5) Enforce boundary contract fields: opening_bridge and closing_handoff.",
-            "6) opening_bridge belongs in the first 1-2 sentences; closing_handoff in the final 1-2 sentences.",
-            "7) Maintain coherence with upcoming sections.",
-            "",
-            f"Plan context:\n{json.dumps(plan_context, ensure_ascii=False, indent=2)}",
-            "",
-            f"Incremental state (progress: {progress}):\n{json.dumps(incremental_state, ensure_ascii=False, indent=2)}",
-            "",
-            f"Boundary contract:\n{json.dumps(normalized_contract, ensure_ascii=False, indent=2)}",
-            "",
-            f"Recent generated text:\n{recent_text or _none_text(language)}",
-            "",
-            "Output only the current section body text.",
-        ]
-    )
-
+    return {
+        "plan_context": _dumps(plan_context),
+        "progress": progress,
+        "state": _dumps(incremental_state),
+        "contract": _dumps(normalized_contract),
+        "recent": recent_text or _NONE_TEXT[language],
+    }
 
-# P1: Repair prompts for different issue types
 
-def render_section_repair_prompt(
+def audit_section_prompt(
     plan: GenerationPlan,
     state: GenerationState,
     section_spec: SectionSpec,
-    current_text: str,
-    quality_issues: list[str],
-    retry_index: int,
-    original_prompt: str = "",
+    recent_text: str,
+    section_index: int,
+    config: GenerationConfig | None = None,
     prompt_language: PromptLanguage = "en",
     boundary_contract: dict[str, Any] | None = None,
-) -> str:
-    """Generate a repair prompt targeting specific quality issues."""
-    del plan
-    del original_prompt
+) -> dict[str, int]:
+    """Estimate the tokens each part of a first-attempt section prompt takes, largest first.
 
+    The prompt variant follows `config.prompt_compression_enabled`, as in the pipeline.
+    Fixed wording and small fields are reported together as "instructions".
+    """
     language = _resolve_prompt_language(prompt_language)
-    entity_issues = [
-        i for i in quality_issues if "entity" in i.lower() or "missing" in i.lower() or "实体" in i
-    ]
-    length_issues = [i for i in quality_issues if "length" in i.lower() or "长度" in i]
-    repetition_issues = [
-        i for i in quality_issues if "repetitive" in i.lower() or "similar" in i.lower() or "重复" in i
-    ]
-    other_issues = [i for i in quality_issues if i not in entity_issues + length_issues + repetition_issues]
-    specific_guidance: list[str] = []
-    normalized_contract = _normalize_boundary_contract(boundary_contract)
+    if config is None:
+        config = GenerationConfig()
+    if config.prompt_compression_enabled:
+        template = _COMPRESSED_SECTION_PROMPT_TEMPLATES[language]
+        parts = _compressed_section_prompt_parts(
+            plan, state, section_spec, recent_text, section_index, config, language, boundary_contract
+        )
+    else:
+        template = _SECTION_PROMPT_TEMPLATES[language]
+        parts = _section_prompt_parts(plan, state, recent_text, section_spec, language, boundary_contract)
 
-    if language == "zh":
-        if entity_issues:
-            specific_guidance.extend(
-                [
-                    "",
-                    "实体覆盖要求：",
-                    "以下必需实体缺失：",
-                    *[f"  - {issue}" for issue in entity_issues],
-                    "",
-                    "你必须显式提及每个缺失实体。建议：",
-                    "  - 使用专门句子引入该实体",
-                    "  - 自然融入现有内容",
-                    "  - 确保实体名称匹配（大小写不敏感）",
-                ]
-            )
+    prompt = template.format(**parts)
+    parts.pop("progress", None)
+    breakdown = {name: _estimate_prompt_tokens(text) for name, text in parts.items()}
+    breakdown["instructions"] = _estimate_prompt_tokens(prompt) - sum(breakdown.values())
+    return dict(sorted(breakdown.items(), key=lambda item: item[1], reverse=True))
 
-        if length_issues:
-            specific_guidance.extend(
-                [
-                    "",
-                    "长度要求：",
-                    *[f"  - {issue}" for issue in length_issues],
-                    "",
-                    "满足长度目标的策略：",
-                ]
-            )
-            if any("too short" in i.lower() or "below" in i.lower() or "偏短" in i for i in length_issues):
-                specific_guidance.extend(
-                    [
-                        "  - 展开关键点并补充细节",
-                        "  - 添加具体示例或解释",
-                        "  - 补充背景或影响",
-                    ]
-                )
-            else:
-                specific_guidance.extend(
-                    [
-                        "  - 删除冗余句子",
-                        "  - 压缩冗长解释",
-                        "  - 聚焦核心观点",
-                    ]
-                )
-
-        if repetition_issues:
-            specific_guidance.extend(
-                [
-                    "",
-                    "重复性修复：",
-                    *[f"  - {issue}" for issue in repetition_issues],
-                    "",
-                    "策略：",
-                    "  - 更换表达与词汇",
-                    "  - 聚焦本节独特内容",
-                    "  - 避免复述前文概念",
-                ]
-            )
 
-        if other_issues:
-            specific_guidance.extend(
-                [
-                    "",
-                    "其他待修复问题：",
-                    *[f"  - {issue}" for issue in other_issues],
-                ]
-            )
+# P1: Repair prompts for different issue types
 
-        sections = [
-            "你正在修订一个已生成章节以修复质量问题。",
-            f"修订轮次：{retry_index + 1}",
-            "",
-            "=== 当前问题文本 ===",
-            current_text,
-            "",
-            "=== 章节要求 ===",
-            f"标题：{section_spec.title}",
-            f"目标长度：约 {section_spec.target_length} tokens（允许 ±20%）",
-            "",
-            "需覆盖的关键要点：",
-            *[f"  - {point}" for point in section_spec.key_points],
-            "",
-            "必需实体（必须包含）：",
-            *[f"  - {entity}" for entity in section_spec.required_entities],
-            "",
-            "章节边界契约（必须保持）：",
-            json.dumps(normalized_contract, ensure_ascii=False),
-        ]
-        if section_spec.constraints:
-            sections.extend(
-                [
-                    "",
-                    "约束条件：",
-                    *[f"  - {c}" for c in section_spec.constraints],
-                ]
-            )
-        sections.extend(
-            [
-                "",
-                "=== 已识别问题 ===",
-                *specific_guidance,
+# Issue guidance per language and category: lines before and after the listed issues
+_REPAIR_GUIDANCE: dict[str, dict[str, tuple[tuple[str, ...], tuple[str, ...]]]] = {
+    "zh": {
+        "entity": (
+            ("", "实体覆盖要求：", "以下必需实体缺失："),
+            (
                 "",
-                "=== 修订要求 ===",
-                "1) 修复上方列出的全部问题",
-                "2) 与已覆盖内容保持一致：",
-                f"   已覆盖要点：{state.covered_key_points}",
-                f"   已知实体：{state.known_entities}",
-                "3) opening_bridge 必须体现在开头 1-2 句，closing_handoff 必须体现在结尾 1-2 句",
-                "4) 尽量保留原始含义和结构",
-                "5) 只输出修订后的章节正文，不要解释，不要 markdown",
+                "你必须显式提及每个缺失实体。建议：",
+                "  - 使用专门句子引入该实体",
+                "  - 自然融入现有内容",
+                "  - 确保实体名称匹配（大小写不敏感）",
+            ),
+        ),
+        "length_short": (
+            ("", "长度要求："),
+            (
                 "",
-                "关键要求：输出会被直接使用，请不要包含：",
-                "- 思考或规划文本",
-                "- 问题总结",
-                "- 例如“修订如下：”这类标签",
-                "- JSON 或代码块",
+                "满足长度目标的策略：",
+                "  - 展开关键点并补充细节",
+                "  - 添加具体示例或解释",
+                "  - 补充背景或影响",
+            ),
+        ),
+        "length_long": (
+            ("", "长度要求："),
+            (
                 "",
-                "只输出修正后的章节正文。",
-            ]
-        )
-        return "\n".join(sections)
-
-    if entity_issues:
-        specific_guidance.extend(
-            [
+                "满足长度目标的策略：",
+                "  - 删除冗余句子",
+                "  - 压缩冗长解释",
+                "  - 聚焦核心观点",
+            ),
+        ),
+        "repetition": (
+            ("", "重复性修复："),
+            (
                 "",
-                "ENTITY COVERAGE REQUIREMENTS:",
-                "The following REQUIRED entities are missing:",
-                *[f"  - {issue}" for issue in entity_issues],
+                "策略：",
+                "  - 更换表达与词汇",
+                "  - 聚焦本节独特内容",
+                "  - 避免复述前文概念",
+            ),
+        ),
+        "other": (("", "其他待修复问题："), ()),
+    },
+    "en": {
+        "entity": (
+            ("", "ENTITY COVERAGE REQUIREMENTS:", "The following REQUIRED entities are missing:"),
+            (
                 "",
                 "You MUST explicitly mention each missing entity. Strategies:",
                 "  - Add a dedicated sentence introducing the entity",
                 "  - Integrate naturally into existing content",
                 "  - Ensure the entity name matches exactly (case-insensitive)",
-            ]
-        )
-
-    if length_issues:
-        specific_guidance.extend(
-            [
-                "",
-                "LENGTH REQUIREMENTS:",
-                *[f"  - {issue}" for issue in length_issues],
+            ),
+        ),
+        "length_short": (
+            ("", "LENGTH REQUIREMENTS:"),
+            (
                 "",
                 "Strategies to meet length target:",
-            ]
-        )
-        if any("too short" in i.lower() or "below" in i.lower() for i in length_issues):
-            specific_guidance.extend(
-                [
-                    "  - Expand on key points with more detail",
-                    "  - Add concrete examples or explanations",
-                    "  - Elaborate on implications or context",
-                ]
-            )
-        else:
-            specific_guidance.extend(
-                [
-                    "  - Remove redundant sentences",
-                    "  - Condense verbose explanations",
-                    "  - Focus on core points only",
-                ]
-            )
-
-    if repetition_issues:
-        specific_guidance.extend(
-            [
+                "  - Expand on key points with more detail",
+                "  - Add concrete examples or explanations",
+                "  - Elaborate on implications or context",
+            ),
+        ),
+        "length_long": (
+            ("", "LENGTH REQUIREMENTS:"),
+            (
                 "",
-                "REPETITION FIXES:",
-                *[f"  - {issue}" for issue in repetition_issues],
+                "Strategies to meet length target:",
+                "  - Remove redundant sentences",
+                "  - Condense verbose explanations",
+                "  - Focus on core points only",
+            ),
+        ),
+        "repetition": (
+            ("", "REPETITION FIXES:"),
+            (
                 "",
                 "Strategies:",
                 "  - Use different phrasing and vocabulary",
                 "  - Focus on unique aspects for this section",
                 "  - Avoid restating concepts from previous sections",
-            ]
-        )
+            ),
+        ),
+        "other": (("", "OTHER ISSUES TO FIX:"), ()),
+    },
+}
 
-    if other_issues:
-        specific_guidance.extend(
-            [
-                "",
-                "OTHER ISSUES TO FIX:",
-                *[f"  - {issue}" for issue in other_issues],
-            ]
-        )
 
-    sections = [
-        "You are REVISING a previously generated section to fix quality issues.",
-        f"Revision attempt: {retry_index + 1}",
-        "",
-        "=== CURRENT PROBLEMATIC TEXT ===",
-        current_text,
-        "",
-        "=== SECTION REQUIREMENTS ===",
-        f"Title: {section_spec.title}",
-        f"Target length: ~{section_spec.target_length} tokens (±20% acceptable)",
-        "",
-        "Key points to cover:",
-        *[f"  - {point}" for point in section_spec.key_points],
-        "",
-        "Required entities (MUST include):",
-        *[f"  - {entity}" for entity in section_spec.required_entities],
-        "",
-        "Boundary contract (MUST preserve):",
-        json.dumps(normalized_contract, ensure_ascii=False),
-    ]
-    if section_spec.constraints:
-        sections.extend(
-            [
-                "",
-                "Constraints:",
-                *[f"  - {c}" for c in section_spec.constraints],
-            ]
-        )
-    sections.extend(
+_REPAIR_PROMPT_TEMPLATES: dict[str, str] = {
+    "zh": "\n".join(
         [
+            "你正在修订一个已生成章节以修复质量问题。",
+            "修订轮次：{retry}",
+            "",
+            "=== 当前问题文本 ===",
+            "{current_text}",
+            "",
+            "=== 章节要求 ===",
+            "{requirements}",
+            "",
+            "=== 已识别问题 ==={guidance}",
+            "",
+            "=== 修订要求 ===",
+            "1) 修复上方列出的全部问题",
+            "2) 与已覆盖内容保持一致：",
+            "   已覆盖要点：{covered}",
+            "   已知实体：{entities}",
+            "3) opening_bridge 必须体现在开头 1-2 句，closing_handoff 必须体现在结尾 1-2 句",
+            "4) 尽量保留原始含义和结构",
+            "5) 只输出修订后的章节正文，不要解释，不要 markdown",
+            "",
+            "关键要求：输出会被直接使用，请不要包含：",
+            "- 思考或规划文本",
+            "- 问题总结",
+            "- 例如“修订如下：”这类标签",
+            "- JSON 或代码块",
+            "",
+            "只输出修正后的章节正文。",
+        ]
+    ),
+    "en": "\n".join(
+        [
+            "You are REVISING a previously generated section to fix quality issues.",
+            "Revision attempt: {retry}",
+            "",
+            "=== CURRENT PROBLEMATIC TEXT ===",
+            "{current_text}",
             "",
-            "=== ISSUES IDENTIFIED ===",
-            *specific_guidance,
+            "=== SECTION REQUIREMENTS ===",
+            "{requirements}",
+            "",
+            "=== ISSUES IDENTIFIED ==={guidance}",
             "",
             "=== REVISION REQUIREMENTS ===",
             "1) Fix ALL listed issues above",
             "2) Maintain consistency with already-covered content:",
-            f"   Covered key points: {state.covered_key_points}",
-            f"   Known entities: {state.known_entities}",
+            "   Covered key points: {covered}",
+            "   Known entities: {entities}",
             "3) opening_bridge must be reflected in the first 1-2 sentences; closing_handoff in the final 1-2 sentences",
             "4) Preserve the original meaning and structure where possible",
             "5) Output ONLY the revised section text - no explanations, no markdown",
@@ -623,8 +771,128 @@ def render_section_repair_prompt(
             "",
             "Output ONLY the corrected section body text.",
         ]
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _section_requirements_block(
+    language: PromptLanguage,
+    title: str,
+    target_length: int,
+    key_points: tuple[str, ...],
+    required_entities: tuple[str, ...],
+    constraints: tuple[str, ...],
+    contract_blob: str,
+) -> str:
+    """Render the section requirements block, which is shared by every repair retry."""
+    if language == "zh":
+        lines = [
+            f"标题：{title}",
+            f"目标长度：约 {target_length} tokens（允许 ±20%）",
+            "",
+            "需覆盖的关键要点：",
+            *[f"  - {point}" for point in key_points],
+            "",
+            "必需实体（必须包含）：",
+            *[f"  - {entity}" for entity in required_entities],
+            "",
+            "章节边界契约（必须保持）：",
+            contract_blob,
+        ]
+        if constraints:
+            lines.extend(["", "约束条件：", *[f"  - {c}" for c in constraints]])
+        return "\n".join(lines)
+
+    lines = [
+        f"Title: {title}",
+        f"Target length: ~{target_length} tokens (±20% acceptable)",
+        "",
+        "Key points to cover:",
+        *[f"  - {point}" for point in key_points],
+        "",
+        "Required entities (MUST include):",
+        *[f"  - {entity}" for entity in required_entities],
+        "",
+        "Boundary contract (MUST preserve):",
+        contract_blob,
+    ]
+    if constraints:
+        lines.extend(["", "Constraints:", *[f"  - {c}" for c in constraints]])
+    return "\n".join(lines)
+
+
+def render_section_repair_prompt(
+    plan: GenerationPlan,
+    state: GenerationState,
+    section_spec: SectionSpec,
+    current_text: str,
+    quality_issues: list[str],
+    retry_index: int,
+    original_prompt: str = "",
+    prompt_language: PromptLanguage = "en",
+    boundary_contract: dict[str, Any] | None = None,
+) -> str:
+    """Generate a repair prompt targeting specific quality issues."""
+    del plan
+    del original_prompt
+
+    language = _resolve_prompt_language(prompt_language)
+    entity_issues: list[str] = []
+    length_issues: list[str] = []
+    repetition_issues: list[str] = []
+    other_issues: list[str] = []
+    too_short = False
+    # One pass over the issues; an issue may land in several categories
+    for issue in quality_issues:
+        lowered = issue.lower()
+        categorized = False
+        if "entity" in lowered or "missing" in lowered or "实体" in issue:
+            entity_issues.append(issue)
+            categorized = True
+        if "length" in lowered or "长度" in issue:
+            length_issues.append(issue)
+            categorized = True
+            too_short = too_short or (
+                "too short" in lowered or "below" in lowered or (language == "zh" and "偏短" in issue)
+            )
+        if "repetitive" in lowered or "similar" in lowered or "重复" in issue:
+            repetition_issues.append(issue)
+            categorized = True
+        if not categorized:
+            other_issues.append(issue)
+    specific_guidance: list[str] = []
+    requirements_block = _section_requirements_block(
+        language,
+        section_spec.title,
+        section_spec.target_length,
+        tuple(section_spec.key_points),
+        tuple(section_spec.required_entities),
+        tuple(section_spec.constraints),
+        _dumps(_normalize_boundary_contract(boundary_contract)),
+    )
+
+    guidance_text = _REPAIR_GUIDANCE[language]
+    for category, issues in (
+        ("entity", entity_issues),
+        ("length_short" if too_short else "length_long", length_issues),
+        ("repetition", repetition_issues),
+        ("other", other_issues),
+    ):
+        if issues:
+            intro, tips = guidance_text[category]
+            specific_guidance.extend(intro)
+            specific_guidance.extend(f"  - {issue}" for issue in issues)
+            specific_guidance.extend(tips)
+
+    return _REPAIR_PROMPT_TEMPLATES[language].format(
+        retry=retry_index + 1,
+        current_text=current_text,
+        requirements=requirements_block,
+        guidance="".join(f"\n{line}" for line in specific_guidance),
+        covered=state.covered_key_points,
+        entities=state.known_entities,
     )
-    return "\n".join(sections)
 
 
 def _normalize_boundary_contract(boundary_contract: dict[str, Any] | None) -> dict[str, Any]:
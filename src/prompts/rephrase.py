@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from prompts.base import PromptLanguage, _resolve_prompt_language
 
@@ -16,6 +17,8 @@ class RewriteRequest:
     prompt_language: PromptLanguage = "en"
 
 
+# RewriteRequest is frozen and hashable; a batch slot regenerated individually re-renders an identical request
+@lru_cache(maxsize=256)
 def render_rewrite_prompt(request: RewriteRequest) -> str:
     prompt_language = _resolve_prompt_language(request.prompt_language)
     style = request.style_instruction or "neutral rewrite"
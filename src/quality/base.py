@@ -1,42 +1,75 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from typing import Sequence
 
 _WORD_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]*")
 
 
+@lru_cache(maxsize=512)
+def _token_set(text: str) -> frozenset[str]:
+    # Section texts are compared repeatedly (retries, repetition and drift checks)
+    return frozenset(token.lower() for token in _WORD_PATTERN.findall(text))
+
+
 def _tokenize(text: str) -> set[str]:
-    return {token.lower() for token in _WORD_PATTERN.findall(text)}
+    return set(_token_set(text))
 
 
 def _token_jaccard(left: str, right: str) -> float:
-    left_tokens = _tokenize(left)
-    right_tokens = _tokenize(right)
+    left_tokens = _token_set(left)
+    right_tokens = _token_set(right)
     if not left_tokens and not right_tokens:
         return 1.0
     if not left_tokens or not right_tokens:
         return 0.0
-    return len(left_tokens & right_tokens) / len(left_tokens | right_tokens)
+    # Union size from the intersection; avoids materializing a third set
+    intersection = len(left_tokens & right_tokens)
+    return intersection / (len(left_tokens) + len(right_tokens) - intersection)
+
+
+def _bounded_token_jaccard(left: str, right: str, threshold: float) -> float:
+    """Exact Jaccard when it can reach `threshold`, else an upper bound below it.
+
+    For callers that only compare against `threshold`: |A & B| / |A | B| never
+    exceeds min(|A|, |B|) / max(|A|, |B|), so size-mismatched sets skip the
+    intersection entirely.
+    """
+    left_size = len(_token_set(left))
+    right_size = len(_token_set(right))
+    if left_size and right_size:
+        upper_bound = min(left_size, right_size) / max(left_size, right_size)
+        if upper_bound < threshold:
+            return upper_bound
+    return _token_jaccard(left, right)
+
+
+_WORD_STRIP_CHARS = ".,;:!?()[]{}\"'"
+
+
+def _clean_words(text: str) -> list[str]:
+    return [word.strip(_WORD_STRIP_CHARS) for word in text.split()]
+
+
+def _contains_in_order(words: Sequence[str], text_words: Sequence[str]) -> bool:
+    # `in` consumes the shared iterator, so each word must follow the previous match
+    remaining = iter(text_words)
+    return all(word in remaining for word in words)
 
 
 def _words_in_order(words: list[str], text: str) -> bool:
     if not words:
         return True
-    text_words = text.split()
-    word_idx = 0
-
-    for text_word in text_words:
-        text_word_clean = text_word.strip(".,;:!?()[]{}\"'")
-        if text_word_clean == words[word_idx]:
-            word_idx += 1
-            if word_idx >= len(words):
-                return True
-
-    return False
+    return _contains_in_order(words, _clean_words(text))
 
 
 __all__ = [
+    "_clean_words",
+    "_contains_in_order",
+    "_token_set",
     "_tokenize",
     "_token_jaccard",
+    "_bounded_token_jaccard",
     "_words_in_order",
 ]
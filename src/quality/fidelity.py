@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from typing import NamedTuple, Protocol
 
 from tokenization import Tokenizer, WhitespaceTokenizer
@@ -42,9 +44,8 @@ class TokenJaccardVerifier:
         if not source_tokens or not rewritten_tokens:
             return 0.0
         intersection = len(source_tokens & rewritten_tokens)
-        union = len(source_tokens | rewritten_tokens)
-        if union == 0:
-            return 0.0
+        # |A ∪ B| = |A| + |B| - |A ∩ B|, without materializing the union set
+        union = len(source_tokens) + len(rewritten_tokens) - intersection
         return intersection / union
 
     def get_issues(self, source_text: str, rewritten_text: str) -> list[str]:
@@ -59,6 +60,14 @@ class NumericFact(NamedTuple):
     fact_type: str
 
 
+class _ScannedFact(NamedTuple):
+    """A fact with its comparison keys, computed once when the text is scanned."""
+
+    fact: NumericFact
+    normalized: str
+    number: float | None
+
+
 class NumericFactChecker:
     """Detects missing or altered numeric facts between source and target text."""
 
@@ -78,6 +87,31 @@ class NumericFactChecker:
     )
     _RATIO_PATTERN = re.compile(r"\b\d+\s*:\s*\d+\b")
     _VERSION_PATTERN = re.compile(r"\bv\d+(?:\.\d+){1,2}\b|\b\d+\.\d+\.\d+\b")
+    # Longest suffixes first so "thousand" is not read as "t"
+    _NUMBER_PATTERN = re.compile(
+        r"[$€£¥]?\s*(?P<number>[-+]?\d+(?:\.\d+)?)\s*(?P<suffix>million|billion|trillion|thousand|[mbtk])?",
+        re.IGNORECASE,
+    )
+    _MULTIPLIERS = {
+        "million": 1e6,
+        "billion": 1e9,
+        "trillion": 1e12,
+        "thousand": 1e3,
+        "m": 1e6,
+        "b": 1e9,
+        "t": 1e12,
+        "k": 1e3,
+    }
+    # Every extracted fact starts at a word boundary before a digit or "v<digit>",
+    # so one scan for those positions replaces a full scan per fact kind.
+    _FACT_START_PATTERN = re.compile(r"\b(?=v\d|\d)")
+    _FACT_KINDS = (
+        ("year", _YEAR_PATTERN),
+        ("percent", _PERCENT_PATTERN),
+        ("word_percent", _DECIMAL_PERCENT_PATTERN),
+        ("quantity", _QUANTITY_PATTERN),
+        ("version", _VERSION_PATTERN),
+    )
 
     def __init__(
         self,
@@ -86,152 +120,177 @@ class NumericFactChecker:
     ) -> None:
         self._context_window = context_window
         self._numeric_penalty = numeric_penalty
+        self._last_missing: tuple[str, str, list[NumericFact]] | None = None
 
     def find_missing(self, source_text: str, target_text: str) -> list[NumericFact]:
         missing: list[NumericFact] = []
         source_facts = self._extract_facts(source_text)
         target_facts = self._extract_facts(target_text)
 
-        source_years = {fact for fact in source_facts if fact.fact_type == "year"}
-        target_years = {fact for fact in target_facts if fact.fact_type == "year"}
-        for year_fact in source_years:
-            if not self._has_matching_fact(year_fact, target_years, exact=True):
-                missing.append(year_fact)
-
-        source_percents = {fact for fact in source_facts if fact.fact_type == "percentage"}
-        target_percents = {fact for fact in target_facts if fact.fact_type == "percentage"}
-        for percent_fact in source_percents:
-            if not self._has_matching_fact(percent_fact, target_percents, exact=True):
-                missing.append(percent_fact)
-
-        source_quantities = {fact for fact in source_facts if fact.fact_type == "quantity"}
-        target_quantities = {fact for fact in target_facts if fact.fact_type == "quantity"}
-        for quantity_fact in source_quantities:
-            if not self._has_matching_fact(quantity_fact, target_quantities, exact=False):
-                missing.append(quantity_fact)
-
-        source_versions = {fact for fact in source_facts if fact.fact_type == "version"}
-        target_versions = {fact for fact in target_facts if fact.fact_type == "version"}
-        for version_fact in source_versions:
-            if not self._has_matching_fact(version_fact, target_versions, exact=True):
-                missing.append(version_fact)
-
-        return missing
+        source_groups: dict[str, list[_ScannedFact]] = {}
+        for scanned in source_facts:
+            source_groups.setdefault(scanned.fact.fact_type, []).append(scanned)
+        target_groups: dict[str, list[_ScannedFact]] = {}
+        for scanned in target_facts:
+            target_groups.setdefault(scanned.fact.fact_type, []).append(scanned)
+
+        for fact_type in ("year", "percentage", "quantity", "version"):
+            source_bucket = source_groups.get(fact_type, [])
+            target_bucket = target_groups.get(fact_type, [])
+            if fact_type == "quantity":
+                missing.extend(self._missing_quantities(source_bucket, target_bucket))
+                continue
+            # Exact kinds: one hash lookup per source fact
+            target_values = {scanned.normalized for scanned in target_bucket}
+            missing.extend(
+                scanned.fact for scanned in source_bucket if scanned.normalized not in target_values
+            )
 
-    def _extract_facts(self, text: str) -> set[NumericFact]:
-        facts: set[NumericFact] = set()
+        # Identical facts (same value and context) are reported once
+        return list(dict.fromkeys(missing))
 
-        for match in self._YEAR_PATTERN.finditer(text):
-            context = self._extract_context(text, match.start(), match.end())
-            facts.add(NumericFact(match.group(), context, "year"))
+    def _missing_quantities(
+        self,
+        source_bucket: list[_ScannedFact],
+        target_bucket: list[_ScannedFact],
+    ) -> list[NumericFact]:
+        """Quantities match within 5% of the target value, or by normalized text when unparsable."""
+        all_values: set[str] = set()
+        unparsed_values: set[str] = set()
+        positive_numbers: list[float] = []
+        non_positive_numbers: set[float] = set()
+        for scanned in target_bucket:
+            all_values.add(scanned.normalized)
+            number = scanned.number
+            if number is None:
+                unparsed_values.add(scanned.normalized)
+            elif number > 0:
+                positive_numbers.append(number)
+            else:
+                non_positive_numbers.add(number)
+        positive_numbers.sort()
 
-        for match in self._PERCENT_PATTERN.finditer(text):
-            context = self._extract_context(text, match.start(), match.end())
-            facts.add(NumericFact(match.group().lower().replace(" ", ""), context, "percentage"))
+        missing: list[NumericFact] = []
+        for scanned in source_bucket:
+            number = scanned.number
+            if number is None:
+                matched = scanned.normalized in all_values
+            else:
+                matched = (
+                    scanned.normalized in unparsed_values
+                    or number in non_positive_numbers
+                    or self._has_close_number(number, positive_numbers)
+                )
+            if not matched:
+                missing.append(scanned.fact)
+        return missing
 
-        for match in self._DECIMAL_PERCENT_PATTERN.finditer(text):
+    def _has_close_number(self, number: float, sorted_targets: list[float]) -> bool:
+        # |number - t| / t < 0.05 implies number / 1.05 < t < number / 0.95; the
+        # widened bisect window only narrows candidates, the exact test decides.
+        lo = bisect_left(sorted_targets, number / 1.06)
+        hi = bisect_right(sorted_targets, number / 0.94)
+        return any(
+            abs(number - target) / target < 0.05 for target in sorted_targets[lo:hi]
+        )
+
+    def _extract_facts(self, text: str) -> tuple[_ScannedFact, ...]:
+        # Cached: a source chunk is re-checked against every retry candidate
+        return _extract_facts_cached(text, self._context_window)
+
+    @classmethod
+    def _scan_facts(cls, text: str, context_window: int) -> tuple[_ScannedFact, ...]:
+        facts: list[_ScannedFact] = []
+        # Per kind, the end of its last match: kinds may overlap each other
+        # (e.g. "2020.01.15" is a year and a version) but not themselves,
+        # exactly as separate finditer() passes would behave.
+        next_start = [0] * len(cls._FACT_KINDS)
+
+        for start_match in cls._FACT_START_PATTERN.finditer(text):
+            start = start_match.start()
+            for index, (kind, pattern) in enumerate(cls._FACT_KINDS):
+                if start < next_start[index]:
+                    continue
+                match = pattern.match(text, start)
+                if match is None:
+                    continue
+                next_start[index] = match.end()
+                context = cls._extract_context(text, start, match.end(), context_window)
+                fact = cls._build_fact(kind, match.group(), context)
+                number = cls._extract_number(fact.value) if fact.fact_type == "quantity" else None
+                facts.append(_ScannedFact(fact, cls._normalize_value(fact.value), number))
+
+        return tuple(facts)
+
+    @staticmethod
+    def _build_fact(kind: str, raw: str, context: str) -> NumericFact:
+        if kind == "percent":
+            return NumericFact(raw.lower().replace(" ", ""), context, "percentage")
+        if kind == "word_percent":
             value = (
-                match.group()
-                .lower()
+                raw.lower()
                 .replace("percent", "%")
                 .replace("percentage", "%")
                 .replace("pct", "%")
                 .replace(" ", "")
             )
-            context = self._extract_context(text, match.start(), match.end())
-            facts.add(NumericFact(value, context, "percentage"))
-
-        for match in self._QUANTITY_PATTERN.finditer(text):
-            context = self._extract_context(text, match.start(), match.end())
-            facts.add(NumericFact(match.group().lower(), context, "quantity"))
-
-        for match in self._VERSION_PATTERN.finditer(text):
-            context = self._extract_context(text, match.start(), match.end())
-            facts.add(NumericFact(match.group(), context, "version"))
-
-        return facts
-
-    def _extract_context(self, text: str, start: int, end: int) -> str:
-        context_start = max(0, start - self._context_window)
-        context_end = min(len(text), end + self._context_window)
+            return NumericFact(value, context, "percentage")
+        if kind == "quantity":
+            return NumericFact(raw.lower(), context, "quantity")
+        return NumericFact(raw, context, kind)
+
+    @staticmethod
+    def _extract_context(text: str, start: int, end: int, context_window: int) -> str:
+        context_start = max(0, start - context_window)
+        context_end = min(len(text), end + context_window)
         return text[context_start:context_end].strip()
 
-    def _has_matching_fact(
-        self,
-        fact: NumericFact,
-        candidates: set[NumericFact],
-        exact: bool = True,
-    ) -> bool:
-        for candidate in candidates:
-            if exact:
-                if self._normalize_value(fact.value) == self._normalize_value(candidate.value):
-                    return True
-            else:
-                if self._values_similar(fact.value, candidate.value):
-                    return True
-        return False
-
-    def _normalize_value(self, value: str) -> str:
+    @staticmethod
+    def _normalize_value(value: str) -> str:
         normalized = value.lower().replace(",", "").replace(" ", "")
         if normalized.startswith("v") and normalized[1:].replace(".", "").isdigit():
             normalized = normalized[1:]
         return normalized
 
-    def _values_similar(self, left: str, right: str) -> bool:
-        left_number = self._extract_number(left)
-        right_number = self._extract_number(right)
-
-        if left_number is not None and right_number is not None:
-            if right_number > 0:
-                return abs(left_number - right_number) / right_number < 0.05
-            return left_number == right_number
-
-        return self._normalize_value(left) == self._normalize_value(right)
-
-    def _extract_number(self, value: str) -> float | None:
-        try:
-            normalized = (
-                value.lower()
-                .replace(",", "")
-                .replace("$", "")
-                .replace("€", "")
-                .replace("£", "")
-                .replace("¥", "")
-            )
-            multipliers = {
-                "million": 1e6,
-                "billion": 1e9,
-                "trillion": 1e12,
-                "m": 1e6,
-                "b": 1e9,
-                "t": 1e12,
-                "k": 1e3,
-                "thousand": 1e3,
-            }
-
-            for suffix, multiplier in multipliers.items():
-                if suffix in normalized:
-                    number_part = normalized.replace(suffix, "").strip()
-                    return float(number_part) * multiplier
-
-            return float(normalized)
-        except (ValueError, TypeError):
+    @classmethod
+    def _extract_number(cls, value: str) -> float | None:
+        match = cls._NUMBER_PATTERN.fullmatch(value.replace(",", "").strip())
+        if match is None:
             return None
+        number = float(match["number"])
+        suffix = match["suffix"]
+        if suffix is None:
+            return number
+        return number * cls._MULTIPLIERS[suffix.lower()]
 
     def score(self, source_text: str, rewritten_text: str) -> float:
         if self._numeric_penalty <= 0:
             return 1.0
 
-        missing_count = len(self.find_missing(source_text, rewritten_text))
+        missing_count = len(self._find_missing_memo(source_text, rewritten_text))
         if missing_count == 0:
             return 1.0
 
         return max(0.0, 1.0 - (missing_count * self._numeric_penalty))
 
     def get_issues(self, source_text: str, rewritten_text: str) -> list[str]:
-        missing_facts = self.find_missing(source_text, rewritten_text)
+        missing_facts = self._find_missing_memo(source_text, rewritten_text)
         return [f"{fact.fact_type.capitalize()} {fact.value} missing" for fact in missing_facts]
 
+    def _find_missing_memo(self, source_text: str, rewritten_text: str) -> list[NumericFact]:
+        """`find_missing` reusing the previous pair, since verifiers get score() then get_issues()."""
+        last = self._last_missing
+        if last is not None and last[0] == source_text and last[1] == rewritten_text:
+            return last[2]
+        missing = self.find_missing(source_text, rewritten_text)
+        self._last_missing = (source_text, rewritten_text, missing)
+        return missing
+
+
+@lru_cache(maxsize=256)
+def _extract_facts_cached(text: str, context_window: int) -> tuple[_ScannedFact, ...]:
+    return NumericFactChecker._scan_facts(text, context_window)
+
 
 class CompositeFidelityVerifier:
     """Combines multiple verifiers with configurable weights."""
@@ -241,26 +300,35 @@ class CompositeFidelityVerifier:
         verifiers: list[tuple[FidelityVerifier, float]],
     ) -> None:
         self._verifiers = verifiers
-        self._issues: list[str] = []
+        # (source_text, rewritten_text, score, issues) of the last evaluation, so the
+        # pipeline's score() + get_issues() pair runs each component only once
+        self._last: tuple[str, str, float, list[str]] | None = None
 
     def score(self, source_text: str, rewritten_text: str) -> float:
+        return self._evaluate(source_text, rewritten_text)[0]
+
+    def get_issues(self, source_text: str, rewritten_text: str) -> list[str]:
+        return list(self._evaluate(source_text, rewritten_text)[1])
+
+    def _evaluate(self, source_text: str, rewritten_text: str) -> tuple[float, list[str]]:
+        last = self._last
+        if last is not None and last[0] == source_text and last[1] == rewritten_text:
+            return last[2], last[3]
+
         total_score = 0.0
         total_weight = 0.0
-        self._issues = []
+        issues: list[str] = []
 
         for verifier, weight in self._verifiers:
             score = verifier.score(source_text, rewritten_text)
             total_score += score * weight
             total_weight += weight
-            self._issues.extend(verifier.get_issues(source_text, rewritten_text))
-
-        if total_weight == 0:
-            return 1.0
-        return total_score / total_weight
+            issues.extend(verifier.get_issues(source_text, rewritten_text))
 
-    def get_issues(self, source_text: str, rewritten_text: str) -> list[str]:
-        _ = self.score(source_text, rewritten_text)
-        return self._issues
+        result = 1.0 if total_weight == 0 else total_score / total_weight
+        # Single attribute assignment keeps concurrent readers consistent
+        self._last = (source_text, rewritten_text, result, issues)
+        return result, issues
 
 
 __all__ = [
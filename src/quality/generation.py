@@ -2,21 +2,35 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
 
 from generation_types import GenerationPlan, SectionSpec
-from quality.base import _token_jaccard, _tokenize, _words_in_order
+from quality.base import (
+    _bounded_token_jaccard,
+    _clean_words,
+    _contains_in_order,
+    _token_jaccard,
+    _token_set,
+    _tokenize,
+    _words_in_order,
+)
 from quality.fidelity import NumericFactChecker as _FidelityNumericFactChecker
 
+_SENTENCE_SPLIT_PATTERN = re.compile(r"[.!?]+")
 
-def _is_key_point_covered(key_point: str, text: str) -> bool:
+
+def _is_key_point_covered(key_point: str, text: str, text_lower: str | None = None) -> bool:
+    """`text_lower` lets callers checking many key points lowercase the text once."""
     key_point_lower = key_point.strip().lower()
-    text_lower = text.lower()
+    if text_lower is None:
+        text_lower = text.lower()
     if not key_point_lower:
         return True
     if key_point_lower in text_lower:
         return True
-    point_tokens = _tokenize(key_point)
-    text_tokens = _tokenize(text)
+    point_tokens = _token_set(key_point)
+    text_tokens = _token_set(text)
     if not point_tokens:
         return True
     overlap = len(point_tokens & text_tokens)
@@ -24,6 +38,24 @@ def _is_key_point_covered(key_point: str, text: str) -> bool:
     return overlap >= required
 
 
+class _EntityPattern(NamedTuple):
+    """Lowercased forms of a required entity, normalized once per entity string."""
+
+    variants: tuple[str, ...]
+    words: tuple[str, ...]
+
+
+@lru_cache(maxsize=1024)
+def _entity_pattern(entity: str) -> _EntityPattern:
+    entity_lower = entity.lower()
+    variants = tuple(
+        dict.fromkeys(
+            (entity_lower, entity_lower.replace(" ", "-"), entity_lower.replace(" ", "_"))
+        )
+    )
+    return _EntityPattern(variants=variants, words=tuple(entity_lower.split()))
+
+
 class EntityPresenceChecker:
     """Ensures required entities appear in section outputs."""
 
@@ -44,24 +76,21 @@ class EntityPresenceChecker:
 
     def missing_entities(self, section: SectionSpec, text: str) -> list[str]:
         text_lower = text.lower()
+        # Split and strip the text once, only if some entity needs the word-order check
+        text_words: list[str] | None = None
         missing: list[str] = []
         for entity in section.required_entities:
-            if not self._entity_present(entity.lower(), text_lower):
-                missing.append(entity)
+            pattern = _entity_pattern(entity)
+            if any(variant in text_lower for variant in pattern.variants):
+                continue
+            if len(pattern.words) > 1:
+                if text_words is None:
+                    text_words = _clean_words(text_lower)
+                if _contains_in_order(pattern.words, text_words):
+                    continue
+            missing.append(entity)
         return missing
 
-    def _entity_present(self, entity: str, text: str) -> bool:
-        if entity in text:
-            return True
-        if entity.replace(" ", "-") in text:
-            return True
-        if entity.replace(" ", "_") in text:
-            return True
-        words = entity.split()
-        if len(words) > 1:
-            return _words_in_order(words, text)
-        return False
-
 
 class NumericFactChecker:
     """Generation-specific wrapper around fidelity numeric fact checks."""
@@ -83,9 +112,12 @@ class NumericFactChecker:
 class OutlineCoverageChecker:
     def find_missing(self, plan: GenerationPlan, text: str) -> list[str]:
         missing: list[str] = []
+        text_lower = text.lower()
         for section in plan.sections:
             for key_point in section.key_points:
-                if not _is_key_point_covered(key_point=key_point, text=text):
+                if not _is_key_point_covered(
+                    key_point=key_point, text=text, text_lower=text_lower
+                ):
                     missing.append(key_point)
         return missing
 
@@ -124,7 +156,9 @@ class RepetitionAndDriftChecker:
         drift_issues: list[str] = []
 
         for idx in range(1, len(section_outputs)):
-            score = _token_jaccard(section_outputs[idx - 1], section_outputs[idx])
+            score = _bounded_token_jaccard(
+                section_outputs[idx - 1], section_outputs[idx], self._repetition_threshold
+            )
             if score >= self._repetition_threshold:
                 repetition_issues.append(
                     f"Section {idx} and section {idx + 1} are highly repetitive (score={score:.2f})."
@@ -144,7 +178,7 @@ class RepetitionAndDriftChecker:
             allowed_tokens.update(_tokenize(preferred))
 
         for idx, section_text in enumerate(section_outputs):
-            section_tokens = _tokenize(section_text)
+            section_tokens = _token_set(section_text)
             if len(section_tokens) < self._min_tokens_for_drift:
                 continue
             overlap = len(section_tokens & allowed_tokens) / len(section_tokens)
@@ -256,19 +290,17 @@ class StrictConsistencyEditGuard:
         if not candidate:
             return original, True
 
-        similarity = _token_jaccard(original, candidate)
+        similarity = _bounded_token_jaccard(original, candidate, self.min_token_jaccard)
         if similarity < self.min_token_jaccard:
             return original, True
 
-        original_tokens = list(_tokenize(original))
-        candidate_tokens = list(_tokenize(candidate))
-        token_count = max(len(original_tokens), 1)
-        length_ratio = len(candidate_tokens) / token_count
+        token_count = max(len(_token_set(original)), 1)
+        length_ratio = len(_token_set(candidate)) / token_count
         if length_ratio < self.min_length_ratio or length_ratio > self.max_length_ratio:
             return original, True
 
-        original_sentences = [part.strip() for part in re.split(r"[.!?]+", original) if part.strip()]
-        candidate_sentences = [part.strip() for part in re.split(r"[.!?]+", candidate) if part.strip()]
+        original_sentences = [part.strip() for part in _SENTENCE_SPLIT_PATTERN.split(original) if part.strip()]
+        candidate_sentences = [part.strip() for part in _SENTENCE_SPLIT_PATTERN.split(candidate) if part.strip()]
         if len(candidate_sentences) - len(original_sentences) > self.max_added_sentences:
             return original, True
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import List, Protocol
+from typing import List, Protocol, Sequence
 
 
 class Tokenizer(Protocol):
@@ -12,16 +12,37 @@ class Tokenizer(Protocol):
         ...
 
 
+class BatchTokenizer(Tokenizer, Protocol):
+    """Tokenizer that can encode many texts in one call (e.g. tiktoken, HF fast)."""
+
+    def encode_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        ...
+
+
 class WhitespaceTokenizer:
     _token_pattern = re.compile(r"\S+")
 
     def encode(self, text: str) -> List[str]:
         return self._token_pattern.findall(text)
 
+    def encode_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        # str.split() splits on the same whitespace runs as \S+ without regex dispatch
+        return [text.split() for text in texts]
+
     def decode(self, tokens: List[str]) -> str:
         return " ".join(tokens)
 
 
+def encode_batch(tokenizer: Tokenizer, texts: Sequence[str]) -> List[List[str]]:
+    """Encode texts with one batched call when supported, else one call per text."""
+    if not texts:
+        return []
+    batch_encode = getattr(tokenizer, "encode_batch", None)
+    if batch_encode is not None:
+        return batch_encode(list(texts))
+    return [tokenizer.encode(text) for text in texts]
+
+
 def take_last_tokens(text: str, tokenizer: Tokenizer, max_tokens: int) -> str:
     if max_tokens <= 0:
         return ""
@@ -33,6 +54,8 @@ def take_last_tokens(text: str, tokenizer: Tokenizer, max_tokens: int) -> str:
 
 __all__ = [
     "Tokenizer",
+    "BatchTokenizer",
     "WhitespaceTokenizer",
+    "encode_batch",
     "take_last_tokens",
 ]
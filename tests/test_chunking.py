@@ -1,9 +1,11 @@
 import unittest
+from unittest.mock import patch
 
 from path_setup import ensure_src_path
 
 ensure_src_path()
 
+import chunking
 from chunking import (
     detect_dominant_script,
     get_adaptive_length,
@@ -11,6 +13,7 @@ from chunking import (
     split_into_lines,
     split_into_char_chunks,
     split_document_into_chunks,
+    split_into_token_chunks_no_overlap,
 )
 from pipelines import stitch_rewritten_chunks
 from tokenization import WhitespaceTokenizer
@@ -32,6 +35,22 @@ class ScriptDetectionTests(unittest.TestCase):
         # 纯数字和标点
         self.assertEqual(detect_dominant_script("123 456 !!!"), "mixed")
 
+    def test_whitespace_is_ignored_in_ratio(self) -> None:
+        # 全角空格与制表符不计入总字符数
+        self.assertEqual(detect_dominant_script("中文\u3000\u3000\t\t 1"), "cjk")
+        self.assertEqual(detect_dominant_script(" \n\t"), "latin")
+
+    def test_marker_like_control_chars_are_not_counted_as_letters(self) -> None:
+        self.assertEqual(detect_dominant_script("\x01\x02\x01a"), "mixed")
+
+    def test_windowed_detection_matches_whole_text_ratio(self) -> None:
+        with patch.object(chunking, "_SCRIPT_WINDOW_CHARS", 4):
+            # 前几个窗口全是拉丁字母，但尾部足以翻盘，不能提前下结论
+            self.assertEqual(detect_dominant_script("abcd" + "中文汉字" * 3), "cjk")
+            self.assertEqual(detect_dominant_script("abcdefgh" + "中文汉字"), "latin")
+            self.assertEqual(detect_dominant_script("abcd" + "中文汉字"), "mixed")
+            self.assertEqual(detect_dominant_script("    " * 3 + "中"), "cjk")
+
 
 class AdaptiveLengthTests(unittest.TestCase):
     def setUp(self) -> None:
@@ -55,6 +74,23 @@ class AdaptiveLengthTests(unittest.TestCase):
         self.assertEqual(get_adaptive_length(text, self.tokenizer, "char"), 9)
 
 
+class SplitIntoStructuralUnitsTests(unittest.TestCase):
+    def test_blank_lines_separate_units(self) -> None:
+        text = "  Para one\nstill one\n \t\nPara two\n\n\nPara three  "
+        self.assertEqual(
+            split_into_structural_units(text),
+            ["Para one\nstill one", "Para two", "Para three"],
+        )
+
+    def test_single_paragraph_fast_path(self) -> None:
+        self.assertEqual(split_into_structural_units(" line1\nline2 "), ["line1\nline2"])
+        self.assertEqual(split_into_structural_units(" \n "), [])
+
+    def test_leading_blank_lines_and_crlf(self) -> None:
+        text = "\n\n  \nPara one\r\n\r\nPara two\n\n"
+        self.assertEqual(split_into_structural_units(text), ["Para one", "Para two"])
+
+
 class SplitIntoLinesTests(unittest.TestCase):
     def test_basic_lines(self) -> None:
         text = "line1\nline2\nline3"
@@ -82,6 +118,34 @@ class SplitIntoCharChunksTests(unittest.TestCase):
     def test_empty_string(self) -> None:
         self.assertEqual(split_into_char_chunks("", 5), [])
 
+    def test_short_text_returned_whole(self) -> None:
+        self.assertEqual(split_into_char_chunks("abc", 5), ["abc"])
+
+
+class SplitIntoTokenChunksTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tokenizer = WhitespaceTokenizer()
+
+    def test_regular_windows_with_tail(self) -> None:
+        chunks = split_into_token_chunks_no_overlap("a b c d e", self.tokenizer, 2)
+        self.assertEqual(chunks, ["a b", "c d", "e"])
+
+    def test_short_text_is_single_chunk(self) -> None:
+        self.assertEqual(split_into_token_chunks_no_overlap("a b", self.tokenizer, 5), ["a b"])
+
+    def test_empty_text(self) -> None:
+        self.assertEqual(split_into_token_chunks_no_overlap("   ", self.tokenizer, 3), [])
+
+    def test_pre_encoded_tokens_skip_encoding(self) -> None:
+        class NoEncodeTokenizer(WhitespaceTokenizer):
+            def encode(self, text):
+                raise AssertionError("encode should not be called")
+
+        chunks = split_into_token_chunks_no_overlap(
+            "ignored", NoEncodeTokenizer(), 2, tokens=["a", "b", "c"]
+        )
+        self.assertEqual(chunks, ["a b", "c"])
+
 
 class DocumentChunkingTests(unittest.TestCase):
     def setUp(self) -> None:
@@ -108,13 +172,30 @@ class DocumentChunkingTests(unittest.TestCase):
     
     def test_line_fallback_for_long_paragraph(self) -> None:
         """测试超长段落触发单行分割 - 行在限制内时直接保留"""
+        text = "Line1\nLine2\nLine3"
+        chunks = split_document_into_chunks(
+            text, self.tokenizer, chunk_size=11, length_mode="char"
+        )
+        # 整段超长（17字符），触发按行分割；前两行拼接后恰为 11 字符，可以合并到同一个chunk
+        self.assertEqual(chunks, ["Line1 Line2", "Line3"])
+
+    def test_char_mode_counts_join_separators(self) -> None:
+        """测试字符模式下拼接用的空格计入长度，chunk 不超过限制"""
         text = "Line1\nLine2"
         chunks = split_document_into_chunks(
             text, self.tokenizer, chunk_size=10, length_mode="char"
         )
-        # 整段超长（11字符），触发按行分割；行分割后两行可以合并到同一个chunk
-        self.assertEqual(len(chunks), 1)
-        self.assertEqual(chunks[0], "Line1 Line2")
+        # 5 + 1（空格）+ 5 = 11 > 10，不能合并
+        self.assertEqual(chunks, ["Line1", "Line2"])
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+
+    def test_packing_resumes_after_oversize_paragraph(self) -> None:
+        """测试超长段落前后的短段落各自装箱，行降级后的短行继续与后续段落累积"""
+        text = "aa\n\nbb\n\nlong line one\nlong line two\n\ncc\n\ndd"
+        chunks = split_document_into_chunks(
+            text, self.tokenizer, chunk_size=16, length_mode="char"
+        )
+        self.assertEqual(chunks, ["aa bb", "long line one", "long line two cc", "dd"])
     
     def test_char_fallback_for_long_line(self) -> None:
         """测试超长单行触发字符分割"""
@@ -156,6 +237,119 @@ class DocumentChunkingTests(unittest.TestCase):
         # 不分割，直接返回
         self.assertEqual(len(chunks), 1)
 
+    def test_small_document_takes_single_chunk_fast_path(self) -> None:
+        """测试整篇放得下时只编码一次，输出与逐段累积一致"""
+
+        class CountingTokenizer(WhitespaceTokenizer):
+            def __init__(self) -> None:
+                self.encode_calls = 0
+
+            def encode(self, text):
+                self.encode_calls += 1
+                return super().encode(text)
+
+        tokenizer = CountingTokenizer()
+        text = "alpha beta\n\n gamma  \n\n\ndelta"
+        chunks = split_document_into_chunks(text, tokenizer, chunk_size=4, length_mode="token")
+
+        self.assertEqual(chunks, ["alpha beta gamma delta"])
+        self.assertEqual(tokenizer.encode_calls, 1)
+        self.assertEqual(
+            split_document_into_chunks(text, tokenizer, chunk_size=100, length_mode="auto"),
+            ["alpha beta gamma delta"],
+        )
+
+    def test_oversize_lines_are_measured_in_one_batch_and_reused(self) -> None:
+        """测试所有超长段落的行一次批量编码，token 级降级复用编码结果"""
+
+        class CountingTokenizer(WhitespaceTokenizer):
+            def __init__(self) -> None:
+                self.encode_calls = 0
+                self.batch_sizes: list[int] = []
+
+            def encode(self, text):
+                self.encode_calls += 1
+                return super().encode(text)
+
+            def encode_batch(self, texts):
+                self.batch_sizes.append(len(texts))
+                return super().encode_batch(texts)
+
+        tokenizer = CountingTokenizer()
+        text = "a b\nc d e f g\n\nh\n\ni j k\nl m"
+        chunks = split_document_into_chunks(text, tokenizer, chunk_size=3, length_mode="token")
+
+        self.assertEqual(chunks, ["a b", "c d e", "f g", "h", "i j k", "l m"])
+        # 一次段落批次 + 一次行批次；encode 仅用于快速路径判定
+        self.assertEqual(tokenizer.batch_sizes, [3, 4])
+        self.assertEqual(tokenizer.encode_calls, 1)
+
+    def test_auto_mode_detects_each_unit_script_once(self) -> None:
+        """测试 auto 模式下每个段落/行只判定一次文字类型（含字符级降级）"""
+        text = "Short intro here\n\n第一行内容\n这一行非常非常非常非常长需要按字符切分"
+        with patch.object(
+            chunking, "detect_dominant_script", wraps=chunking.detect_dominant_script
+        ) as detect:
+            chunks = split_document_into_chunks(
+                text, self.tokenizer, chunk_size=8, length_mode="auto"
+            )
+
+        # 2 个段落 + 超长段落中的 2 行
+        self.assertEqual(detect.call_count, 4)
+        self.assertEqual(chunks[0], "Short intro here")
+        self.assertEqual("".join(chunks[2:]), "这一行非常非常非常非常长需要按字符切分")
+
+    def test_auto_fast_path_respects_multi_token_characters(self) -> None:
+        """测试 auto 模式下 token 数超过字符数的拉丁文本不会走单 chunk 快速路径"""
+
+        class ByteTokenizer:
+            def encode(self, text):
+                return [chr(byte) for byte in text.encode("utf-8")]
+
+            def decode(self, tokens):
+                return bytes(ord(token) for token in tokens).decode("utf-8", errors="ignore")
+
+        text = "café naïve résumé déjà vu"
+        chunks = split_document_into_chunks(text, ByteTokenizer(), chunk_size=25, length_mode="auto")
+
+        self.assertEqual(chunks, ["café naïve résumé dé", "jà vu"])
+
+    def test_units_are_tokenized_in_one_batch(self) -> None:
+        """测试段落长度通过一次 encode_batch 计算，结果与逐个编码一致"""
+
+        class CountingTokenizer(WhitespaceTokenizer):
+            def __init__(self) -> None:
+                self.encode_calls = 0
+                self.batch_calls = 0
+
+            def encode(self, text):
+                self.encode_calls += 1
+                return super().encode(text)
+
+            def encode_batch(self, texts):
+                self.batch_calls += 1
+                return super().encode_batch(texts)
+
+        class EncodeOnlyTokenizer:
+            def encode(self, text):
+                return text.split()
+
+            def decode(self, tokens):
+                return " ".join(tokens)
+
+        text = "one two\n\nthree four five\n\nsix\n\nseven eight nine ten"
+        counting = CountingTokenizer()
+        batched = split_document_into_chunks(text, counting, chunk_size=5, length_mode="token")
+        fallback = split_document_into_chunks(
+            text, EncodeOnlyTokenizer(), chunk_size=5, length_mode="token"
+        )
+
+        self.assertEqual(batched, fallback)
+        self.assertEqual(batched, ["one two three four five", "six seven eight nine ten"])
+        self.assertEqual(counting.batch_calls, 1)
+        # 仅快速路径对全文做一次整体编码
+        self.assertEqual(counting.encode_calls, 1)
+
 
 class StitchRewrittenChunksTests(unittest.TestCase):
     def test_stitch_deduplicates_boundary_overlap(self) -> None:
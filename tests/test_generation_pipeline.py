@@ -1,7 +1,12 @@
 import json
+import os
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List
+from unittest.mock import patch
 
 from path_setup import ensure_src_path
 
@@ -10,7 +15,7 @@ ensure_src_path()
 from pipelines import ChunkWiseGenerationPipeline
 from generation_types import GenerationConfig, GenerationPlan, SectionSpec
 from model import LLMRequest
-from tokenization import WhitespaceTokenizer
+from tokenization import WhitespaceTokenizer, take_last_tokens
 
 
 @dataclass
@@ -234,6 +239,33 @@ class GenerationPipelineTests(unittest.TestCase):
         first_section_prompt = model.calls[0].request.prompt
         self.assertIn("你正在生成一篇长文中的一个章节。", first_section_prompt)
 
+    def test_section_requests_carry_output_budget_and_stop_sequences(self) -> None:
+        plan = _build_manual_plan()
+        model = ScriptedLLMModel(
+            scripted_outputs=[
+                "Scope is set and constraints stay explicit.",
+                "The global anchor sets scope and keeps constraints explicit.",
+                "The state table tracks entities and marks covered points.",
+                "The global anchor sets scope and keeps constraints explicit. The state table tracks entities and marks covered points.",
+            ]
+        )
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(prefix_window_tokens=20, section_output_token_margin=2.0),
+        )
+
+        _ = pipeline.run(manual_plan=plan)
+
+        section_request = model.calls[0].request
+        # target_length 120 * max ratio 1.2 * margin 2.0
+        self.assertEqual(section_request.estimated_output_tokens, 288)
+        # First-attempt prompts have no `=== ` scaffold, so only the repair request stops on it
+        self.assertEqual(section_request.stop, ())
+        self.assertIn("\n=== ", model.calls[1].request.stop)
+        self.assertEqual(model.calls[2].request.stop, ())
+        self.assertIsNone(model.calls[-1].request.estimated_output_tokens)
+
     def test_quality_report_adds_transition_contract_warnings(self) -> None:
         plan = GenerationPlan(
             topic="Boundary coherence",
@@ -284,5 +316,396 @@ class GenerationPipelineTests(unittest.TestCase):
         )
 
 
+    def test_concurrent_quality_checks_match_sequential_report(self) -> None:
+        outputs = [
+            "Global anchor sets scope for every chunk.",
+            "Global anchor sets scope for every chunk.",
+            "Consistent draft.",
+        ]
+        reports = []
+        for workers in (1, 4):
+            pipeline = ChunkWiseGenerationPipeline(
+                model=ScriptedLLMModel(scripted_outputs=list(outputs)),
+                tokenizer=WhitespaceTokenizer(),
+                config=GenerationConfig(
+                    max_section_retries=1,
+                    consistency_pass_enabled=False,
+                    quality_check_workers=workers,
+                ),
+            )
+            reports.append(pipeline.run(manual_plan=_build_manual_plan()).qc_report)
+
+        self.assertEqual(reports[0], reports[1])
+        self.assertIn("state table tracks entities", reports[1].coverage_missing)
+
+    def test_recent_text_is_built_once_per_section_across_retries(self) -> None:
+        model = ScriptedLLMModel(
+            scripted_outputs=[
+                "Scope is set up front.",
+                "The global anchor sets scope.",
+                "The state table tracks entities.",
+            ]
+        )
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(max_section_retries=2, consistency_pass_enabled=False),
+        )
+
+        with patch.object(
+            pipeline, "_build_recent_text", wraps=pipeline._build_recent_text
+        ) as build_recent_text:
+            result = pipeline.run(manual_plan=_build_manual_plan())
+
+        # Section 1 needed a retry for the missing entity; the prefix was still built once
+        self.assertEqual(len(model.calls), 3)
+        self.assertEqual(build_recent_text.call_count, 2)
+        self.assertEqual(result.section_outputs[0], "The global anchor sets scope.")
+
+    def test_response_cache_dir_replays_previous_run(self) -> None:
+        outputs = [
+            "The global anchor sets scope.",
+            "The state table tracks entities.",
+            "The global anchor sets scope. The state table tracks entities.",
+        ]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = GenerationConfig(max_section_retries=1, response_cache_dir=cache_dir)
+            first_model = ScriptedLLMModel(scripted_outputs=list(outputs))
+            first = ChunkWiseGenerationPipeline(
+                model=first_model, tokenizer=WhitespaceTokenizer(), config=config
+            ).run(manual_plan=_build_manual_plan())
+
+            second_model = ScriptedLLMModel(scripted_outputs=[])
+            second = ChunkWiseGenerationPipeline(
+                model=second_model, tokenizer=WhitespaceTokenizer(), config=config
+            ).run(manual_plan=_build_manual_plan())
+
+        self.assertEqual(len(first_model.calls), 3)
+        self.assertEqual(second_model.calls, [])
+        self.assertEqual(second.final_text, first.final_text)
+
+    def test_response_cache_namespace_separates_model_setups(self) -> None:
+        outputs = [
+            "The global anchor sets scope.",
+            "The state table tracks entities.",
+            "The global anchor sets scope. The state table tracks entities.",
+        ]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            models = []
+            for namespace in ("model-a", "model-b", "model-a"):
+                model = ScriptedLLMModel(scripted_outputs=list(outputs))
+                ChunkWiseGenerationPipeline(
+                    model=model,
+                    tokenizer=WhitespaceTokenizer(),
+                    config=GenerationConfig(
+                        max_section_retries=1,
+                        response_cache_dir=cache_dir,
+                        response_cache_namespace=namespace,
+                    ),
+                ).run(manual_plan=_build_manual_plan())
+                models.append(model)
+
+        self.assertEqual([len(model.calls) for model in models], [3, 3, 0])
+
+    def test_response_cache_tolerates_concurrent_writes_of_one_key(self) -> None:
+        class SlowModel:
+            def __init__(self) -> None:
+                self._barrier = threading.Barrier(8)
+
+            def generate(self, request: LLMRequest) -> str:
+                # Every thread misses the cache before any of them writes
+                self._barrier.wait()
+                return "The global anchor sets scope."
+
+        request = LLMRequest(task="section_generation", prompt="same prompt")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            pipeline = ChunkWiseGenerationPipeline(
+                model=SlowModel(),
+                tokenizer=WhitespaceTokenizer(),
+                config=GenerationConfig(response_cache_dir=cache_dir),
+            )
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                outputs = list(executor.map(pipeline._generate, [request] * 8))
+            entry_dir = os.path.dirname(pipeline._response_cache_path(cache_dir, request))
+            leftovers = os.listdir(entry_dir)
+
+        self.assertEqual(outputs, ["The global anchor sets scope."] * 8)
+        self.assertEqual(len(leftovers), 1)
+
+    def test_response_cache_drops_unparsable_plan(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model = ScriptedLLMModel(scripted_outputs=["not json", "still not json"])
+            pipeline = ChunkWiseGenerationPipeline(
+                model=model,
+                tokenizer=WhitespaceTokenizer(),
+                config=GenerationConfig(response_cache_dir=cache_dir),
+            )
+
+            with self.assertRaises(ValueError), self.assertLogs("pipelines.generation", "ERROR"):
+                pipeline.run(topic="Chunking", objective="teach")
+
+        # The bad plan was not replayed from the cache on retry
+        self.assertEqual(len(model.calls), 2)
+
+    def test_recent_text_only_encodes_sections_inside_the_window(self) -> None:
+        class RecordingTokenizer(WhitespaceTokenizer):
+            def __init__(self) -> None:
+                self.encoded: List[str] = []
+
+            def encode(self, text: str) -> List[str]:
+                self.encoded.append(text)
+                return super().encode(text)
+
+        tokenizer = RecordingTokenizer()
+        pipeline = ChunkWiseGenerationPipeline(
+            model=ScriptedLLMModel(scripted_outputs=[]),
+            tokenizer=tokenizer,
+            config=GenerationConfig(prefix_window_tokens=5),
+        )
+        outputs = ["zero one two three", "four five six", "seven\neight nine", "ten eleven"]
+
+        recent = pipeline._build_recent_text(outputs)
+
+        self.assertEqual(recent, take_last_tokens(" ".join(outputs), WhitespaceTokenizer(), 5))
+        self.assertEqual(recent, "seven eight nine ten eleven")
+        self.assertNotIn(outputs[0], tokenizer.encoded)
+        self.assertEqual(
+            pipeline._build_recent_text(outputs[:1]),
+            take_last_tokens(outputs[0], WhitespaceTokenizer(), 5),
+        )
+
+    def test_length_check_runs_only_when_it_affects_retries(self) -> None:
+        for retry_on_length in (False, True):
+            pipeline = ChunkWiseGenerationPipeline(
+                model=ScriptedLLMModel(
+                    scripted_outputs=[
+                        "The global anchor sets scope.",
+                        "The state table tracks entities.",
+                    ]
+                ),
+                tokenizer=WhitespaceTokenizer(),
+                config=GenerationConfig(
+                    max_section_retries=1,
+                    consistency_pass_enabled=False,
+                    retry_on_length_violation=retry_on_length,
+                ),
+            )
+            with patch.object(pipeline, "_check_length", return_value="") as check_length:
+                pipeline.run(manual_plan=_build_manual_plan())
+
+            self.assertEqual(check_length.call_count, 2 if retry_on_length else 0)
+
+    def test_parallel_plan_attempts_keep_first_parsable_plan(self) -> None:
+        plan_json = json.dumps(_build_manual_plan().to_dict())
+
+        class PlanModel:
+            def __init__(self) -> None:
+                self._lock = threading.Lock()
+                self.plan_calls = 0
+
+            def generate(self, request: LLMRequest) -> str:
+                if request.task != "plan_generation":
+                    return "The global anchor sets scope. The state table tracks entities."
+                with self._lock:
+                    self.plan_calls += 1
+                    first = self.plan_calls == 1
+                return "not a plan" if first else plan_json
+
+        model = PlanModel()
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(
+                max_section_retries=1,
+                consistency_pass_enabled=False,
+                plan_parallel_attempts=2,
+            ),
+        )
+
+        # Either attempt may finish first; silence the failed attempt's warning
+        with patch("pipelines.generation.logger"):
+            result = pipeline.run(topic="Chunk-wise generation", objective="teach")
+
+        self.assertEqual(model.plan_calls, 2)
+        self.assertEqual(result.plan.to_dict(), _build_manual_plan().to_dict())
+
+    def test_parallel_plan_attempts_cache_only_the_accepted_plan(self) -> None:
+        plan_json = json.dumps(_build_manual_plan().to_dict())
+
+        class PlanModel:
+            def __init__(self) -> None:
+                self._lock = threading.Lock()
+                self.plan_calls = 0
+
+            def generate(self, request: LLMRequest) -> str:
+                if request.task != "plan_generation":
+                    return "The global anchor sets scope. The state table tracks entities."
+                with self._lock:
+                    self.plan_calls += 1
+                    first = self.plan_calls == 1
+                return "not a plan" if first else plan_json
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = GenerationConfig(
+                max_section_retries=1,
+                consistency_pass_enabled=False,
+                plan_parallel_attempts=2,
+                response_cache_dir=cache_dir,
+            )
+            first_model = PlanModel()
+            with patch("pipelines.generation.logger"):
+                ChunkWiseGenerationPipeline(
+                    model=first_model, tokenizer=WhitespaceTokenizer(), config=config
+                ).run(topic="Chunk-wise generation", objective="teach")
+
+            # The rerun replays the accepted plan (and the sections conditioned on it)
+            second_model = ScriptedLLMModel(scripted_outputs=[])
+            second = ChunkWiseGenerationPipeline(
+                model=second_model, tokenizer=WhitespaceTokenizer(), config=config
+            ).run(topic="Chunk-wise generation", objective="teach")
+
+        self.assertEqual(first_model.plan_calls, 2)
+        self.assertEqual(second_model.calls, [])
+        self.assertEqual(second.plan.to_dict(), _build_manual_plan().to_dict())
+
+    def test_first_attempt_candidates_keep_best_scoring_draft(self) -> None:
+        class CandidateModel:
+            def __init__(self) -> None:
+                self._lock = threading.Lock()
+                self.section_calls = 0
+
+            def generate(self, request: LLMRequest) -> str:
+                with self._lock:
+                    self.section_calls += 1
+                    call = self.section_calls
+                # Every other draft misses the required entities
+                if call % 2 == 0:
+                    return "The global anchor and the state table are both covered."
+                return "Scope is discussed here."
+
+        model = CandidateModel()
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(
+                max_section_retries=1,
+                consistency_pass_enabled=False,
+                section_first_attempt_candidates=2,
+            ),
+        )
+
+        result = pipeline.run(manual_plan=_build_manual_plan())
+
+        self.assertEqual(model.section_calls, 4)
+        self.assertEqual(
+            result.section_outputs,
+            ["The global anchor and the state table are both covered."] * 2,
+        )
+
+    def test_first_attempt_candidates_cache_only_the_chosen_draft(self) -> None:
+        class CandidateModel:
+            def __init__(self) -> None:
+                self._lock = threading.Lock()
+                self.section_calls = 0
+
+            def generate(self, request: LLMRequest) -> str:
+                with self._lock:
+                    self.section_calls += 1
+                    call = self.section_calls
+                if call % 2 == 0:
+                    return "The global anchor and the state table are both covered."
+                return "Scope is discussed here."
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = GenerationConfig(
+                max_section_retries=1,
+                consistency_pass_enabled=False,
+                section_first_attempt_candidates=2,
+                response_cache_dir=cache_dir,
+            )
+            first_model = CandidateModel()
+            first = ChunkWiseGenerationPipeline(
+                model=first_model, tokenizer=WhitespaceTokenizer(), config=config
+            ).run(manual_plan=_build_manual_plan())
+
+            second_model = ScriptedLLMModel(scripted_outputs=[])
+            second = ChunkWiseGenerationPipeline(
+                model=second_model, tokenizer=WhitespaceTokenizer(), config=config
+            ).run(manual_plan=_build_manual_plan())
+
+        # Every sample reached the model; the rerun replays the chosen drafts
+        self.assertEqual(first_model.section_calls, 4)
+        self.assertEqual(second_model.calls, [])
+        self.assertEqual(second.section_outputs, first.section_outputs)
+        self.assertEqual(
+            first.section_outputs,
+            ["The global anchor and the state table are both covered."] * 2,
+        )
+
+    def test_section_batch_drafts_sections_in_one_call(self) -> None:
+        plan = _build_manual_plan()
+        model = ScriptedLLMModel(
+            scripted_outputs=[
+                "<answer id=0>The global anchor sets scope.</answer>",
+                "The state table tracks entities.",
+            ]
+        )
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(
+                max_section_retries=1,
+                consistency_pass_enabled=False,
+                section_batch_size=2,
+            ),
+        )
+
+        with self.assertLogs("pipelines.generation", level="WARNING"):
+            result = pipeline.run(manual_plan=plan)
+
+        # The batch answered only the first section; the second is drafted alone
+        self.assertEqual(len(model.calls), 2)
+        batch_prompt = model.calls[0].request.prompt
+        self.assertEqual(batch_prompt.count(plan.to_json()), 1)
+        self.assertIn("<task id=1>", batch_prompt)
+        self.assertEqual(
+            result.section_outputs,
+            ["The global anchor sets scope.", "The state table tracks entities."],
+        )
+
+    def test_section_batch_drops_later_drafts_after_a_repair(self) -> None:
+        model = ScriptedLLMModel(
+            scripted_outputs=[
+                (
+                    "<answer id=0>Scope is discussed here.</answer>"
+                    "<answer id=1>As shown above, the state table tracks entities.</answer>"
+                ),
+                "The global anchor sets scope.",
+                "The state table tracks entities.",
+            ]
+        )
+        pipeline = ChunkWiseGenerationPipeline(
+            model=model,
+            tokenizer=WhitespaceTokenizer(),
+            config=GenerationConfig(
+                max_section_retries=2,
+                consistency_pass_enabled=False,
+                section_batch_size=2,
+            ),
+        )
+
+        with self.assertLogs("pipelines.generation", level="WARNING"):
+            result = pipeline.run(manual_plan=_build_manual_plan())
+
+        # The first draft missed its entity and was repaired, so the second section's
+        # batched draft (written after the discarded text) is regenerated individually
+        self.assertEqual(len(model.calls), 3)
+        self.assertIn("The global anchor sets scope.", model.calls[2].request.prompt)
+        self.assertEqual(
+            result.section_outputs,
+            ["The global anchor sets scope.", "The state table tracks entities."],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -12,6 +12,7 @@ if str(src_path) not in sys.path:
 
 from generation_types import GenerationConfig, GenerationPlan, GenerationState, SectionSpec
 from prompts.generation import (
+    audit_section_prompt,
     render_section_prompt,
     render_section_prompt_compressed,
     _summarize_covered_points,
@@ -326,6 +327,37 @@ class CompressedPromptTests(unittest.TestCase):
         # Required entities should be present
         for entity in current_section.required_entities:
             self.assertIn(entity, prompt)
+        # Context blocks are compact JSON, without pretty-print indentation
+        self.assertIn('"topic": "AI Technology", "objective"', prompt)
+        self.assertNotIn('\n  "', prompt)
+
+    def test_audit_attributes_prompt_tokens_largest_first(self) -> None:
+        """The audit splits the estimated prompt size across its parts."""
+        plan = self._create_test_plan()
+        state = self._create_test_state([], plan.sections[0].key_points)
+        recent_text = "Earlier sections discussed attention in depth. " * 40
+
+        breakdown = audit_section_prompt(
+            plan=plan,
+            state=state,
+            section_spec=plan.sections[0],
+            recent_text=recent_text,
+            section_index=0,
+        )
+        prompt = render_section_prompt_compressed(
+            plan=plan,
+            state=state,
+            section_spec=plan.sections[0],
+            recent_text=recent_text,
+            section_index=0,
+        )
+
+        self.assertEqual(next(iter(breakdown)), "recent")
+        self.assertEqual(list(breakdown.values()), sorted(breakdown.values(), reverse=True))
+        self.assertEqual(sum(breakdown.values()), len(prompt) // 4)
+        self.assertEqual(
+            set(breakdown), {"recent", "plan_context", "state", "contract", "instructions"}
+        )
 
     def test_last_section_has_no_upcoming_sections(self) -> None:
         """When generating the last section, upcoming sections should be empty."""
@@ -344,6 +376,41 @@ class CompressedPromptTests(unittest.TestCase):
         # Should not crash and should contain the section
         self.assertIn(last_section.title, prompt)
 
+    def test_context_budget_drops_timeline_before_entities(self) -> None:
+        """A context budget trims the oldest low-priority items first."""
+        plan = self._create_test_plan()
+        state = GenerationState(
+            known_entities=[f"Entity{i}" for i in range(20)],
+            terminology_map={},
+            timeline=[f"Event in year {2000 + i}" for i in range(5)],
+            covered_key_points=[],
+            remaining_key_points=["Background", "Problem statement"],
+        )
+        unbounded = render_section_prompt_compressed(
+            plan=plan,
+            state=state,
+            section_spec=plan.sections[0],
+            recent_text="",
+            section_index=0,
+        )
+
+        prompt = render_section_prompt_compressed(
+            plan=plan,
+            state=state,
+            section_spec=plan.sections[0],
+            recent_text="",
+            section_index=0,
+            config=GenerationConfig(compressed_context_budget_tokens=200),
+        )
+
+        self.assertLess(len(prompt), len(unbounded))
+        self.assertNotIn("Event in year 2000", prompt)
+        self.assertNotIn("Entity0", prompt)
+        self.assertIn("Entity19", prompt)
+        # The current section and its remaining points are never dropped
+        self.assertIn("Problem statement", prompt)
+        self.assertIn("Keep it simple", prompt)
+
 
 class GenerationConfigCompressionTests(unittest.TestCase):
     """Test GenerationConfig compression settings."""
@@ -358,6 +425,7 @@ class GenerationConfigCompressionTests(unittest.TestCase):
         self.assertEqual(config.max_entities_in_prompt, 20)
         self.assertEqual(config.max_timeline_entries, 5)
         self.assertEqual(config.upcoming_sections_preview, 2)
+        self.assertIsNone(config.compressed_context_budget_tokens)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
+import json
 import unittest
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 repo_root = Path(__file__).resolve().parents[1]
 src_path = repo_root / "src"
@@ -11,9 +13,11 @@ from prompts.generation import (
     render_consistency_prompt,
     render_plan_prompt,
     render_section_prompt,
+    render_section_prompt_batch,
     render_section_prompt_compressed,
     render_section_repair_prompt,
 )
+from prompts.generation import _section_requirements_block
 from generation_types import (
     GenerationConfig,
     GenerationPlan,
@@ -129,6 +133,23 @@ class GenerationPromptLanguageTests(unittest.TestCase):
         self.assertIn("首句承接上一节中的实体A。", prompt)
         self.assertIn("末句引出下一节的问题空间。", prompt)
 
+    def test_section_batch_prompt_supports_chinese(self) -> None:
+        plan = _build_plan()
+        prompt = render_section_prompt_batch(
+            plan=plan,
+            state=_build_state(),
+            recent_text="",
+            section_specs=[plan.sections[0], plan.sections[0]],
+            prompt_language="zh",
+            boundary_contracts=[{"opening_bridge": "首句承接主题。"}],
+        )
+
+        self.assertIn("你正在连续生成一篇长文中的 2 个相邻章节。", prompt)
+        self.assertEqual(prompt.count(plan.to_json()), 1)
+        self.assertIn("<task id=0>", prompt)
+        self.assertIn("<task id=1>", prompt)
+        self.assertIn("首句承接主题。", prompt)
+
     def test_repair_prompt_includes_boundary_contract_fields(self) -> None:
         prompt = render_section_repair_prompt(
             plan=_build_plan(),
@@ -149,6 +170,67 @@ class GenerationPromptLanguageTests(unittest.TestCase):
         self.assertIn("首句需要承接上一节结论。", prompt)
         self.assertIn("末句需要引出下一节方法。", prompt)
 
+    def test_plan_json_is_serialized_once_per_plan(self) -> None:
+        plan = _build_plan()
+        with patch.object(GenerationPlan, "to_dict", wraps=plan.to_dict) as to_dict:
+            for _ in range(3):
+                prompt = render_section_prompt(
+                    plan=plan,
+                    state=_build_state(),
+                    recent_text="",
+                    section_spec=plan.sections[0],
+                )
+            render_consistency_prompt(
+                plan=plan,
+                state=_build_state(),
+                draft_text="草稿",
+                quality_report=QualityReport(),
+            )
+
+        self.assertEqual(to_dict.call_count, 1)
+        self.assertIn(json.dumps(plan.to_dict(), ensure_ascii=False), prompt)
+
+    def test_section_spec_json_is_serialized_once_per_section(self) -> None:
+        plan = _build_plan()
+        section = plan.sections[0]
+        plan.to_json()  # the plan blob serializes its sections too
+        with patch.object(SectionSpec, "to_dict", wraps=section.to_dict) as to_dict:
+            prompts = [
+                render_section_prompt(
+                    plan=plan,
+                    state=_build_state(),
+                    recent_text=recent_text,
+                    section_spec=section,
+                )
+                for recent_text in ("", "上一节")
+            ]
+
+        self.assertEqual(to_dict.call_count, 1)
+        for prompt in prompts:
+            self.assertIn(json.dumps(section.to_dict(), ensure_ascii=False), prompt)
+
+    def test_repair_prompt_reuses_section_requirements_across_retries(self) -> None:
+        section = _build_plan().sections[0]
+        prompts = []
+        before = _section_requirements_block.cache_info()
+        for retry_index in range(3):
+            prompts.append(
+                render_section_repair_prompt(
+                    plan=_build_plan(),
+                    state=_build_state(),
+                    section_spec=section,
+                    current_text=f"第{retry_index}版",
+                    quality_issues=["Section too short: 10 tokens below target."],
+                    retry_index=retry_index,
+                    prompt_language="zh",
+                )
+            )
+        after = _section_requirements_block.cache_info()
+
+        self.assertGreaterEqual(after.hits - before.hits, 2)
+        self.assertTrue(all("标题：第一节" in prompt for prompt in prompts))
+        self.assertIn("修订轮次：3", prompts[-1])
+
 
 if __name__ == "__main__":
     unittest.main()
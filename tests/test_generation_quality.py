@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 
 from path_setup import ensure_src_path
 
@@ -13,6 +14,7 @@ from quality.generation import (
     TerminologyConsistencyChecker,
     TransitionContractChecker,
 )
+from quality.fidelity import NumericFactChecker as FidelityNumericFactChecker
 from generation_types import GenerationPlan, SectionSpec
 
 
@@ -217,6 +219,23 @@ class EntityPresenceCheckerTests(unittest.TestCase):
         self.assertIn("TypeScript", missing[0])
 
 
+    def test_multi_word_entity_matches_words_in_order(self) -> None:
+        section = SectionSpec(
+            title="State",
+            key_points=[],
+            required_entities=["state table", "global anchor", "table state"],
+            constraints=[],
+            target_length=100,
+        )
+
+        missing = EntityPresenceChecker().missing_entities(
+            section=section,
+            text="The (State) of each table, and a Global anchor.",
+        )
+
+        # Words may be separated or punctuated, but order still matters
+        self.assertEqual(missing, ["table state"])
+
 class NumericFactCheckerTests(unittest.TestCase):
     def test_detects_missing_year(self) -> None:
         checker = NumericFactChecker()
@@ -277,6 +296,45 @@ class NumericFactCheckerTests(unittest.TestCase):
 
         self.assertEqual(len(issues), 1)
 
+    def test_quantities_match_within_tolerance(self) -> None:
+        checker = NumericFactChecker()
+        source = "The dataset contains 1.5 million examples."
+
+        self.assertEqual(checker.find_missing(source, "It holds 1.52 million examples."), [])
+        self.assertEqual(len(checker.find_missing(source, "It holds 1.7 million examples.")), 1)
+
+    def test_thousand_suffix_is_parsed_as_a_quantity(self) -> None:
+        checker = NumericFactChecker()
+        source = "About 5 thousand users joined."
+
+        self.assertEqual(checker.find_missing(source, "About 5.1 thousand users joined."), [])
+        self.assertEqual(len(checker.find_missing(source, "About 6 thousand users joined.")), 1)
+
+    def test_overlapping_year_and_version_are_checked_independently(self) -> None:
+        checker = NumericFactChecker()
+        source = "Build 2020.01.15 shipped."
+
+        issues = checker.find_missing(source, "Build from 2020 shipped.")
+
+        # The year survives; only the dotted version is reported
+        self.assertEqual(len(issues), 1)
+        self.assertIn("2020.01.15", issues[0])
+        self.assertIn("version", issues[0].lower())
+
+    def test_source_facts_are_scanned_once_across_candidates(self) -> None:
+        checker = NumericFactChecker()
+        source = "In 2021 the model reached 91% accuracy on 3.2 million samples."
+
+        with patch.object(
+            FidelityNumericFactChecker, "_scan_facts", wraps=FidelityNumericFactChecker._scan_facts
+        ) as scan:
+            checker.find_missing(source + " ", "Accuracy was 91% in 2021.")
+            checker.find_missing(source + " ", "Accuracy was 90% in 2021.")
+            checker.find_missing(source + " ", "Accuracy was 91% in 2021.")
+
+        scanned = [call.args[0] for call in scan.call_args_list]
+        self.assertEqual(scanned.count(source + " "), 1)
+
 
 class TransitionContractCheckerTests(unittest.TestCase):
     def test_reports_missing_opening_bridge_and_closing_handoff(self) -> None:
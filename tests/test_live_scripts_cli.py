@@ -6,7 +6,7 @@ from path_setup import ensure_src_path
 
 ensure_src_path()
 
-from generation_types import GenerationConfig
+from generation_types import GenerationConfig, GenerationPlan, GenerationState, SectionSpec
 
 
 def _load_module(name: str, path: Path):
@@ -26,6 +26,10 @@ class LiveScriptsCLITests(unittest.TestCase):
             "run_live_openai_pipeline",
             repo_root / "scripts" / "run_live_openai_pipeline.py",
         )
+        cls._audit_script = _load_module(
+            "audit_prompt_context",
+            repo_root / "scripts" / "audit_prompt_context.py",
+        )
         cls._generation_script = _load_module(
             "run_live_openai_generation_pipeline",
             repo_root / "scripts" / "run_live_openai_generation_pipeline.py",
@@ -36,6 +40,12 @@ class LiveScriptsCLITests(unittest.TestCase):
         args = parser.parse_args(["--prompt-language", "zh"])
         self.assertEqual(args.prompt_language, "zh")
 
+    def test_rephrase_script_accepts_batch_size(self) -> None:
+        parser = self._rephrase_script.build_parser()
+        self.assertEqual(parser.parse_args([]).batch_size, 1)
+        args = parser.parse_args(["--prefix-window-tokens", "0", "--batch-size", "4"])
+        self.assertEqual(args.batch_size, 4)
+
     def test_generation_script_accepts_prompt_language(self) -> None:
         parser = self._generation_script.build_parser()
         args = parser.parse_args(["--prompt-language", "zh"])
@@ -75,6 +85,30 @@ class LiveScriptsCLITests(unittest.TestCase):
         self.assertEqual(config.consistency_pass_enabled, True)
         self.assertEqual(config.consistency_guard_enabled, True)
 
+    def test_generation_script_passes_response_cache_dir(self) -> None:
+        parser = self._generation_script.build_parser()
+        config, _ = self._generation_script.resolve_generation_config(parser.parse_args([]))
+        self.assertIsNone(config.response_cache_dir)
+        args = parser.parse_args(["--response-cache-dir", "/tmp/llm-cache"])
+        config, _ = self._generation_script.resolve_generation_config(args)
+        self.assertEqual(config.response_cache_dir, "/tmp/llm-cache")
+
+    def test_generation_script_scopes_response_cache_to_model_setup(self) -> None:
+        parser = self._generation_script.build_parser()
+        base = ["--response-cache-dir", "/tmp/llm-cache"]
+
+        def namespace(extra: list[str]) -> str:
+            config, _ = self._generation_script.resolve_generation_config(
+                parser.parse_args(base + extra)
+            )
+            return config.response_cache_namespace
+
+        self.assertTrue(namespace([]))
+        self.assertEqual(namespace([]), namespace([]))
+        self.assertNotEqual(namespace([]), namespace(["--model", "other/model"]))
+        self.assertNotEqual(namespace([]), namespace(["--temperature", "0.9"]))
+        self.assertNotEqual(namespace([]), namespace(["--enable-reasoning"]))
+
     def test_generation_script_cost_first_profile_prefers_low_cost(self) -> None:
         parser = self._generation_script.build_parser()
         args = parser.parse_args(["--profile", "cost_first"])
@@ -108,6 +142,44 @@ class LiveScriptsCLITests(unittest.TestCase):
         self.assertEqual(config.max_section_retries, 2)
         self.assertEqual(config.retry_on_missing_entities, True)
 
+    def test_audit_script_reports_every_section(self) -> None:
+        args = self._audit_script.build_parser().parse_args(
+            ["--plan-path", "plan.json", "--prompt-compression", "off"]
+        )
+        self.assertEqual(args.prompt_compression, "off")
+
+        plan = GenerationPlan(
+            topic="Audit",
+            objective="measure prompts",
+            audience="engineers",
+            tone="neutral",
+            target_total_length=200,
+            sections=[
+                SectionSpec(
+                    title=title,
+                    key_points=[f"{title} point"],
+                    required_entities=[],
+                    constraints=[],
+                    target_length=100,
+                )
+                for title in ("First", "Second")
+            ],
+            terminology_preferences={},
+            narrative_voice="third-person",
+            do_not_include=[],
+        )
+        report = self._audit_script.audit_plan(
+            plan=plan,
+            state=GenerationState.from_plan(plan),
+            recent_text="",
+            config=GenerationConfig(prompt_compression_enabled=False),
+        )
+
+        self.assertEqual([entry["title"] for entry in report], ["First", "Second"])
+        for entry in report:
+            self.assertEqual(entry["total_tokens"], sum(entry["breakdown"].values()))
+            self.assertIn("plan", entry["breakdown"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import unittest
@@ -15,6 +16,7 @@ from backends.openai import (
     OpenAIRewriteModel,
     OpenAILLMModel,
 )
+from backends import openai as openai_backend
 from model import LLMRequest
 from prompts import RewriteRequest
 
@@ -111,6 +113,41 @@ class OpenAIBackendTests(unittest.TestCase):
         logger.info(f"[Test] 验证的 prompt 内容包含: {fake_completions.last_kwargs['messages'][0]['content'][:100]}...")
         logger.info("=== 测试通过 ===\n")
 
+    def test_request_budget_caps_max_tokens_and_forwards_stop(self) -> None:
+        fake_completions = _FakeCompletions()
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=fake_completions))
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="k", max_new_tokens=16384),
+            client=fake_client,
+        )
+
+        _ = model.generate(
+            LLMRequest(
+                task="section_generation",
+                prompt="p",
+                estimated_output_tokens=400,
+                stop=("\n=== ",),
+            )
+        )
+        self.assertEqual(fake_completions.last_kwargs["max_tokens"], 400)
+        self.assertEqual(fake_completions.last_kwargs["stop"], ["\n=== "])
+
+        _ = model.generate(LLMRequest(task="section_generation", prompt="p"))
+        self.assertEqual(fake_completions.last_kwargs["max_tokens"], 16384)
+        self.assertNotIn("stop", fake_completions.last_kwargs)
+
+    def test_reasoning_flag_is_forwarded_as_extra_body(self) -> None:
+        fake_completions = _FakeCompletions()
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=fake_completions))
+
+        disabled = OpenAILLMModel(config=OpenAIBackendConfig(api_key="k", reasoning=False), client=fake_client)
+        _ = disabled.generate(LLMRequest(task="plan_generation", prompt="p"))
+        self.assertEqual(fake_completions.last_kwargs["extra_body"], {"reasoning": {"enabled": False}})
+
+        default = OpenAILLMModel(config=OpenAIBackendConfig(api_key="k"), client=fake_client)
+        _ = default.generate(LLMRequest(task="plan_generation", prompt="p"))
+        self.assertNotIn("extra_body", fake_completions.last_kwargs)
+
     def test_missing_env_key_raises_clear_error(self) -> None:
         logger.info("=== 测试: 缺失环境变量时报错 ===")
 
@@ -150,6 +187,18 @@ class OpenAIBackendTests(unittest.TestCase):
         self.assertEqual(fake_completions.last_kwargs["model"], "openai/gpt-4o-mini")
         logger.info("=== 测试通过 ===\n")
 
+    def test_resolved_settings_follow_env_changes_for_same_config(self) -> None:
+        config = OpenAIBackendConfig(api_key="k")
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions()))
+
+        with patch.dict(os.environ, {}, clear=True):
+            default_model = OpenAILLMModel(config=config, client=fake_client)
+        with patch.dict(os.environ, {"LLM_MODEL": "env/model"}, clear=True):
+            env_model = OpenAILLMModel(config=config, client=fake_client)
+
+        self.assertEqual(default_model._model, DEFAULT_MODEL)
+        self.assertEqual(env_model._model, "env/model")
+
     def test_invalid_model_error_contains_override_hint(self) -> None:
         logger.info("=== 测试: 无效模型报错包含 LLM_MODEL 提示 ===")
         fake_client = SimpleNamespace(chat=SimpleNamespace(completions=_ErrorCompletions()))
@@ -170,6 +219,22 @@ class OpenAIBackendTests(unittest.TestCase):
             _ = model.rewrite(request)
         logger.info("=== 测试通过 ===\n")
 
+    def test_list_content_joins_text_parts(self) -> None:
+        content = [
+            {"type": "text", "text": "Hello"},
+            {"type": "image_url", "image_url": {"url": "x"}},
+            SimpleNamespace(text=", world"),
+            SimpleNamespace(text=None),
+            {"type": "text", "text": 42},
+        ]
+        completions = _ScriptedCompletions([content])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        self.assertEqual(model.generate(LLMRequest(task="rewrite_chunk", prompt="p")), "Hello, world")
+
 
 class _FakeCompletionsWithErrors:
     """Mock completions that raises specific errors on each call."""
@@ -382,6 +447,494 @@ class OpenAIBackendRetryTests(unittest.TestCase):
         logger.info(f"捕获到预期错误: {error_msg[:100]}...")
         logger.info("=== 测试通过: 5xx 耗尽重试后失败 ===\n")
 
+    def test_backoff_delay_is_jittered_within_exponential_cap(self) -> None:
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=MagicMock())),
+        )
+        error = _make_fake_status_error("Service unavailable", 503)
+        request = LLMRequest(task="test", prompt="hello")
+
+        delays = [model._retry_delay(error, request, 3, 5, 1.0, 60.0) for _ in range(50)]
+
+        self.assertTrue(all(0.0 <= delay <= 8.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_rate_limit_honors_retry_after_header(self) -> None:
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=MagicMock())),
+        )
+        error = _make_fake_status_error("Rate limit exceeded", 429)
+        error.response = SimpleNamespace(headers={"retry-after": "7"})
+        request = LLMRequest(task="test", prompt="hello")
+
+        self.assertGreaterEqual(model._retry_delay(error, request, 0, 5, 0.01, 60.0), 7.0)
+        # Retry-After is still bounded by max_delay
+        self.assertEqual(model._retry_delay(error, request, 0, 5, 0.01, 2.0), 2.0)
+
+    def test_message_markers_classify_errors_without_status(self) -> None:
+        """Errors without status_code are classified from their message, case-insensitively."""
+        fake_completions = _FakeCompletionsWithErrors([
+            Exception("Upstream READ TIMEOUT"),
+            Exception("Bad gateway (502) from upstream"),
+            Exception("Rate Limit reached"),
+        ])
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=fake_completions))
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=fake_client,
+        )
+
+        result = model._generate_with_retry(
+            {"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+            LLMRequest(task="test", prompt="hello"),
+            max_retries=5,
+            base_delay=0.001,
+        )
+
+        self.assertEqual(result, "success")
+        self.assertEqual(fake_completions._call_count, 3)
+
+    def test_rate_limit_marker_takes_precedence_over_timeout(self) -> None:
+        """A message mentioning both 429 and timeout is handled as a rate limit."""
+        error = Exception("timeout while waiting: 429 too many requests")
+        fake_completions = MagicMock()
+        fake_completions.create.side_effect = error
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=fake_completions)),
+        )
+
+        with self.assertRaises(Exception) as cm:
+            model._generate_with_retry(
+                {"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+                LLMRequest(task="test", prompt="hello"),
+                max_retries=1,
+                base_delay=0.001,
+            )
+
+        # Exhausted rate limits re-raise the original error; timeouts would wrap it
+        self.assertIs(cm.exception, error)
+
+
+class _FakeAsyncCompletions:
+    """Async completions that record peak concurrency and echo the prompt."""
+
+    def __init__(self, errors: list[Exception] | None = None) -> None:
+        self._errors = list(errors or [])
+        self.call_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.call_count += 1
+        if self._errors:
+            raise self._errors.pop(0)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        prompt = kwargs["messages"][0]["content"]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f" echo:{prompt} "))]
+        )
+
+
+def _make_async_model(
+    completions: _FakeAsyncCompletions,
+    max_concurrency: int = 8,
+) -> OpenAILLMModel:
+    return OpenAILLMModel(
+        config=OpenAIBackendConfig(api_key="test-key", max_concurrency=max_concurrency),
+        client=SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions())),
+        async_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+    )
+
+
+class _ScriptedCompletions:
+    def __init__(self, contents: list[str]) -> None:
+        self._contents = list(contents)
+        self.prompts: list[str] = []
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        content = self._contents.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class DefaultClientCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        openai_backend.clear_client_cache()
+        self.addCleanup(openai_backend.clear_client_cache)
+
+    def test_default_factory_reuses_client_per_key(self) -> None:
+        with patch.object(openai_backend, "_build_client", side_effect=lambda *args: object()) as build:
+            first = openai_backend._default_client_factory("key", "https://a/v1")
+            second = openai_backend._default_client_factory("key", "https://a/v1")
+            other = openai_backend._default_client_factory("key", "https://b/v1")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(build.call_count, 2)
+
+    def test_default_factory_rebuilds_after_ttl(self) -> None:
+        with patch.object(openai_backend, "_build_client", side_effect=lambda *args: object()):
+            with patch.object(openai_backend, "CLIENT_CACHE_TTL_SECONDS", 0.0):
+                first = openai_backend._default_client_factory("key", "https://a/v1")
+                second = openai_backend._default_client_factory("key", "https://a/v1")
+
+        self.assertIsNot(first, second)
+
+    def test_model_passes_transport_settings_to_default_factory(self) -> None:
+        config = OpenAIBackendConfig(api_key="key", connect_timeout=3.0, read_timeout=90.0, httpx_max_connections=16)
+        with patch.object(openai_backend, "_build_client", side_effect=lambda *args: object()) as build:
+            OpenAILLMModel(config=config)
+            OpenAILLMModel(config=config)
+            OpenAILLMModel(config=OpenAIBackendConfig(api_key="key"))
+
+        self.assertEqual(build.call_count, 2)
+        transport = build.call_args_list[0].args[2]
+        self.assertEqual(
+            (transport.connect_timeout, transport.read_timeout, transport.max_connections),
+            (3.0, 90.0, 16),
+        )
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        openai_backend.clear_response_cache()
+        self.addCleanup(openai_backend.clear_response_cache)
+
+    def _make_model(self, completions: _ScriptedCompletions, temperature: float = 0.4) -> OpenAILLMModel:
+        return OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key", temperature=temperature),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+    def test_cacheable_request_reuses_response(self) -> None:
+        completions = _ScriptedCompletions(["first", "second"])
+        model = self._make_model(completions)
+        request = LLMRequest(task="consistency_pass", prompt="same prompt", cacheable=True)
+
+        self.assertEqual(model.generate(request), "first")
+        self.assertEqual(model.generate(request), "first")
+        self.assertEqual(len(completions.prompts), 1)
+        self.assertEqual(openai_backend.response_cache_stats(), {"hits": 1, "misses": 1, "size": 1})
+
+    def test_sampled_request_is_not_cached_by_default(self) -> None:
+        completions = _ScriptedCompletions(["first", "second"])
+        model = self._make_model(completions)
+        request = LLMRequest(task="consistency_pass", prompt="same prompt")
+
+        self.assertEqual(model.generate(request), "first")
+        self.assertEqual(model.generate(request), "second")
+
+    def test_zero_temperature_caches_and_keys_on_prompt(self) -> None:
+        completions = _ScriptedCompletions(["a", "b"])
+        model = self._make_model(completions, temperature=0.0)
+
+        self.assertEqual(model.generate(LLMRequest(task="consistency_pass", prompt="p1")), "a")
+        self.assertEqual(model.generate(LLMRequest(task="consistency_pass", prompt="p2")), "b")
+        self.assertEqual(model.generate(LLMRequest(task="consistency_pass", prompt="p1")), "a")
+        self.assertEqual(completions.prompts, ["p1", "p2"])
+
+    def test_expired_entries_are_refetched(self) -> None:
+        completions = _ScriptedCompletions(["first", "second"])
+        model = self._make_model(completions)
+        request = LLMRequest(task="consistency_pass", prompt="same prompt", cacheable=True)
+
+        with patch.object(openai_backend, "RESPONSE_CACHE_TTL_SECONDS", 0.0):
+            self.assertEqual(model.generate(request), "first")
+            self.assertEqual(model.generate(request), "second")
+
+
+class OpenAIBackendBatchTests(unittest.TestCase):
+    def test_generate_batch_dedupe_packs_distinct_prompts_only(self) -> None:
+        completions = _ScriptedCompletions(["<answer id=0>one</answer><answer id=1>two</answer>"])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+        requests = [LLMRequest(task="rewrite_chunk", prompt=p) for p in ["x", "y", "x"]]
+
+        outputs = model.generate_batch(requests, dedupe=True)
+
+        self.assertEqual(outputs, ["one", "two", "one"])
+        self.assertEqual(len(completions.prompts), 1)
+        self.assertEqual(completions.prompts[0].count("<task id="), 2)
+
+    def test_generate_batch_packs_prompts_into_one_call(self) -> None:
+        completions = _ScriptedCompletions(["<answer id=0>one</answer><answer id=1>two</answer>"])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        outputs = model.generate_batch(
+            [
+                LLMRequest(task="rewrite_chunk", prompt="prompt one"),
+                LLMRequest(task="rewrite_chunk", prompt="prompt two"),
+            ]
+        )
+
+        self.assertEqual(outputs, ["one", "two"])
+        self.assertEqual(len(completions.prompts), 1)
+        self.assertIn("prompt one", completions.prompts[0])
+        self.assertIn("prompt two", completions.prompts[0])
+
+    def test_generate_batch_regenerates_untagged_answers(self) -> None:
+        completions = _ScriptedCompletions(["<answer id=0>one</answer>", " two "])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        outputs = model.generate_batch(
+            [
+                LLMRequest(task="rewrite_chunk", prompt="prompt one"),
+                LLMRequest(task="rewrite_chunk", prompt="prompt two"),
+            ]
+        )
+
+        self.assertEqual(outputs, ["one", "two"])
+        self.assertEqual(completions.prompts[1], "prompt two")
+
+
+def _stream_chunk(content: str | None) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _FakeStreamingCompletions:
+    def __init__(self, deltas: list[str | None], errors: list[Exception] | None = None) -> None:
+        self._deltas = deltas
+        self._errors = list(errors or [])
+        self.call_count = 0
+        self.last_kwargs: dict | None = None
+
+    def create(self, **kwargs):
+        self.call_count += 1
+        self.last_kwargs = kwargs
+        if self._errors:
+            raise self._errors.pop(0)
+        return iter([_stream_chunk(delta) for delta in self._deltas])
+
+
+class _FailingMidStreamCompletions:
+    def __init__(self) -> None:
+        self.call_count = 0
+
+    def create(self, **kwargs):
+        self.call_count += 1
+
+        def _chunks():
+            yield _stream_chunk("partial ")
+            raise _make_fake_status_error("Service unavailable", 503)
+
+        return _chunks()
+
+
+class OpenAIBackendStreamTests(unittest.TestCase):
+    def test_generate_stream_forwards_deltas_and_returns_full_text(self) -> None:
+        completions = _FakeStreamingCompletions([" Hello", None, ", world "])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+        received: list[str] = []
+
+        result = model.generate_stream(
+            LLMRequest(task="section_generation", prompt="p"),
+            on_delta=received.append,
+        )
+
+        self.assertEqual(result, "Hello, world")
+        self.assertEqual(received, [" Hello", ", world "])
+        self.assertTrue(completions.last_kwargs["stream"])
+
+    def test_stream_flag_on_request_uses_streaming_path(self) -> None:
+        completions = _FakeStreamingCompletions(["a", "b"])
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        result = model.generate(LLMRequest(task="section_generation", prompt="p", stream=True))
+
+        self.assertEqual(result, "ab")
+        self.assertTrue(completions.last_kwargs["stream"])
+
+    def test_stream_retries_failures_before_first_delta(self) -> None:
+        completions = _FakeStreamingCompletions(
+            ["ok"], errors=[_make_fake_status_error("Rate limit exceeded", 429)]
+        )
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        result = model._generate_stream_with_retry(
+            {"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+            LLMRequest(task="test", prompt="hello"),
+            on_delta=lambda _: None,
+            base_delay=0.01,
+        )
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(completions.call_count, 2)
+
+    def test_stream_does_not_restart_after_forwarding_output(self) -> None:
+        completions = _FailingMidStreamCompletions()
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        )
+
+        with self.assertRaises(_FakeAPIStatusError):
+            model.generate_stream(
+                LLMRequest(task="test", prompt="hello"),
+                on_delta=lambda _: None,
+            )
+        self.assertEqual(completions.call_count, 1)
+
+    def test_rewrite_model_stream_consumer_receives_deltas(self) -> None:
+        completions = _FakeStreamingCompletions(["re", "written"])
+        received: list[str] = []
+        model = OpenAIRewriteModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+            stream_consumer=received.append,
+        )
+        request = RewriteRequest(
+            style_instruction="qa",
+            global_anchor="anchor",
+            generated_prefix="prefix",
+            current_chunk="chunk",
+            retry_index=0,
+            strict_fidelity=False,
+        )
+
+        self.assertEqual(model.rewrite(request), "rewritten")
+        self.assertEqual(received, ["re", "written"])
+
+
+class OpenAIBackendAsyncTests(unittest.TestCase):
+    def test_agenerate_many_preserves_order_and_bounds_concurrency(self) -> None:
+        completions = _FakeAsyncCompletions()
+        model = _make_async_model(completions, max_concurrency=2)
+        requests = [LLMRequest(task="section_generation", prompt=f"p{i}") for i in range(5)]
+
+        outputs = asyncio.run(model.agenerate_many(requests))
+
+        self.assertEqual(outputs, [f"echo:p{i}" for i in range(5)])
+        self.assertEqual(completions.call_count, 5)
+        self.assertEqual(completions.max_in_flight, 2)
+
+    def test_generate_many_runs_from_sync_code(self) -> None:
+        completions = _FakeAsyncCompletions()
+        model = _make_async_model(completions)
+        requests = [LLMRequest(task="section_generation", prompt=f"p{i}") for i in range(3)]
+
+        first = model.generate_many(requests)
+        second = model.generate_many(requests[:1])
+
+        self.assertEqual(first, ["echo:p0", "echo:p1", "echo:p2"])
+        self.assertEqual(second, ["echo:p0"])
+        self.assertGreater(completions.max_in_flight, 1)
+
+    def test_generate_many_dedupe_sends_each_distinct_request_once(self) -> None:
+        completions = _FakeAsyncCompletions()
+        model = _make_async_model(completions)
+        requests = [LLMRequest(task="consistency_pass", prompt=p) for p in ["a", "b", "a", "a", "c"]]
+
+        outputs = model.generate_many(requests, dedupe=True)
+
+        self.assertEqual(outputs, ["echo:a", "echo:b", "echo:a", "echo:a", "echo:c"])
+        self.assertEqual(completions.call_count, 3)
+
+    def test_factory_async_client_is_rebuilt_per_event_loop(self) -> None:
+        built: list[SimpleNamespace] = []
+
+        def _factory(api_key: str, base_url: str) -> SimpleNamespace:
+            closed: list[bool] = []
+
+            async def _close() -> None:
+                closed.append(True)
+
+            client = SimpleNamespace(
+                chat=SimpleNamespace(completions=_FakeAsyncCompletions()),
+                close=_close,
+                closed=closed,
+            )
+            built.append(client)
+            return client
+
+        model = OpenAILLMModel(
+            config=OpenAIBackendConfig(api_key="test-key"),
+            client=SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions())),
+            async_client_factory=_factory,
+        )
+        self.addCleanup(model.close)
+        requests = [LLMRequest(task="section_generation", prompt=f"p{i}") for i in range(2)]
+
+        model.generate_many(requests)
+        model.generate_many(requests)
+        asyncio.run(model.agenerate_many(requests))
+        batch_loop = model._batch_loop
+
+        # One client for the private loop, reused across calls; a fresh one for asyncio.run
+        self.assertEqual(len(built), 2)
+        model.close()
+        self.assertTrue(batch_loop.is_closed())
+        self.assertEqual(built[0].closed, [True])
+
+        model.generate_many(requests)
+        self.assertEqual(len(built), 3)
+
+    def test_async_path_retries_rate_limit(self) -> None:
+        completions = _FakeAsyncCompletions(
+            errors=[_make_fake_status_error("Rate limit exceeded", 429)]
+        )
+        model = _make_async_model(completions)
+
+        result = asyncio.run(
+            model._agenerate_with_retry(
+                {"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+                LLMRequest(task="test", prompt="hello"),
+                base_delay=0.01,
+            )
+        )
+
+        self.assertEqual(result, "echo:hello")
+        self.assertEqual(completions.call_count, 2)
+
+    def test_async_path_fails_fast_on_client_error(self) -> None:
+        completions = _FakeAsyncCompletions(
+            errors=[_make_fake_status_error("Invalid API key", 401)]
+        )
+        model = _make_async_model(completions)
+
+        with self.assertRaisesRegex(ValueError, "401"):
+            asyncio.run(model.agenerate(LLMRequest(task="test", prompt="hello")))
+        self.assertEqual(completions.call_count, 1)
+
+    def test_arewrite_uses_async_client(self) -> None:
+        completions = _FakeAsyncCompletions()
+        model = OpenAIRewriteModel(llm_model=_make_async_model(completions))
+        request = RewriteRequest(
+            style_instruction="qa",
+            global_anchor="anchor",
+            generated_prefix="prefix",
+            current_chunk="current chunk",
+            retry_index=0,
+            strict_fidelity=False,
+        )
+
+        result = asyncio.run(model.arewrite(request))
+
+        self.assertIn("Current chunk:", result)
+        self.assertEqual(completions.call_count, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -31,6 +31,17 @@ class ScriptedRewriteModel:
         return value
 
 
+class ScriptedBatchRewriteModel(ScriptedRewriteModel):
+    def __init__(self, outputs: List[str], batch_outputs: List[List[str]]) -> None:
+        super().__init__(outputs)
+        self._batch_outputs = batch_outputs
+        self.batch_calls: List[List[RewriteRequest]] = []
+
+    def rewrite_batch(self, requests: List[RewriteRequest]) -> List[str]:
+        self.batch_calls.append(list(requests))
+        return self._batch_outputs[len(self.batch_calls) - 1]
+
+
 class ContainsGoodVerifier:
     def score(self, source_text: str, rewritten_text: str) -> float:
         if "good" in rewritten_text:
@@ -114,6 +125,106 @@ class PipelineTests(unittest.TestCase):
 
         self.assertEqual(model.calls[0].request.prompt_language, "zh")
 
+    def test_independent_chunks_are_batched_without_prefix_window(self) -> None:
+        tokenizer = WhitespaceTokenizer()
+        model = ScriptedBatchRewriteModel(
+            outputs=[],
+            batch_outputs=[["A0 A1", "B0 B1"], ["C0 C1"]],
+        )
+        config = PipelineConfig(
+            chunk_size=2,
+            length_mode="token",
+            prefix_window_tokens=0,
+            fidelity_threshold=0.0,
+            max_retries=1,
+            global_anchor_mode="none",
+            batch_size=2,
+        )
+        pipeline = ChunkWiseRephrasePipeline(model=model, tokenizer=tokenizer, config=config)
+
+        output = pipeline.run("t0 t1 t2 t3 t4 t5")
+
+        self.assertEqual(output, "A0 A1 B0 B1 C0 C1")
+        self.assertEqual([len(batch) for batch in model.batch_calls], [2, 1])
+        self.assertEqual(model.batch_calls[0][1].current_chunk, "t2 t3")
+        self.assertEqual(model.calls, [])
+
+    def test_batched_chunk_failing_fidelity_retries_individually(self) -> None:
+        tokenizer = WhitespaceTokenizer()
+        model = ScriptedBatchRewriteModel(
+            outputs=["good retry"],
+            batch_outputs=[["good first", "bad first"]],
+        )
+        config = PipelineConfig(
+            chunk_size=2,
+            length_mode="token",
+            prefix_window_tokens=0,
+            fidelity_threshold=0.8,
+            max_retries=2,
+            global_anchor_mode="none",
+            batch_size=4,
+        )
+        pipeline = ChunkWiseRephrasePipeline(
+            model=model,
+            tokenizer=tokenizer,
+            config=config,
+            verifier=ContainsGoodVerifier(),
+        )
+
+        output = pipeline.run("t0 t1 t2 t3")
+
+        self.assertEqual(output, "good first good retry")
+        self.assertEqual(len(model.calls), 1)
+        self.assertEqual(model.calls[0].request.retry_index, 1)
+
+    def test_batched_postprocess_workers_preserve_chunk_order(self) -> None:
+        tokenizer = WhitespaceTokenizer()
+        model = ScriptedBatchRewriteModel(
+            outputs=["good retry"],
+            batch_outputs=[["bad first", "good b"], ["good c", "good d"]],
+        )
+        config = PipelineConfig(
+            chunk_size=2,
+            length_mode="token",
+            prefix_window_tokens=0,
+            fidelity_threshold=0.8,
+            max_retries=2,
+            global_anchor_mode="none",
+            batch_size=2,
+            postprocess_workers=3,
+        )
+        pipeline = ChunkWiseRephrasePipeline(
+            model=model,
+            tokenizer=tokenizer,
+            config=config,
+            verifier=ContainsGoodVerifier(),
+        )
+
+        output = pipeline.run("t0 t1 t2 t3 t4 t5 t6 t7")
+
+        self.assertEqual(output, "good retry good b good c good d")
+        self.assertEqual(len(model.batch_calls), 2)
+        self.assertEqual(len(model.calls), 1)
+
+    def test_prefix_window_disables_batching(self) -> None:
+        tokenizer = WhitespaceTokenizer()
+        model = ScriptedBatchRewriteModel(outputs=["R0 R1", "R2 R3"], batch_outputs=[])
+        config = PipelineConfig(
+            chunk_size=2,
+            length_mode="token",
+            prefix_window_tokens=8,
+            fidelity_threshold=0.0,
+            max_retries=1,
+            global_anchor_mode="none",
+            batch_size=2,
+        )
+        pipeline = ChunkWiseRephrasePipeline(model=model, tokenizer=tokenizer, config=config)
+
+        _ = pipeline.run("t0 t1 t2 t3")
+
+        self.assertEqual(model.batch_calls, [])
+        self.assertEqual(len(model.calls), 2)
+
 
 class NumericFactCheckerAsVerifierTests(unittest.TestCase):
     """Test fidelity.NumericFactChecker as FidelityVerifier (for Rephrase Pipeline)."""
@@ -208,6 +319,30 @@ class NumericFactCheckerAsVerifierTests(unittest.TestCase):
         self.assertGreater(score, 0.0)
         self.assertLess(score, 1.0)
 
+    def test_composite_verifier_evaluates_components_once_per_pair(self) -> None:
+        from quality.fidelity import CompositeFidelityVerifier
+
+        class CountingVerifier:
+            def __init__(self) -> None:
+                self.score_calls = 0
+
+            def score(self, source_text: str, rewritten_text: str) -> float:
+                self.score_calls += 1
+                return 0.5
+
+            def get_issues(self, source_text: str, rewritten_text: str) -> list[str]:
+                return ["issue"]
+
+        component = CountingVerifier()
+        composite = CompositeFidelityVerifier([(component, 1.0)])
+
+        self.assertEqual(composite.score("a", "b"), 0.5)
+        self.assertEqual(composite.get_issues("a", "b"), ["issue"])
+        self.assertEqual(component.score_calls, 1)
+
+        composite.get_issues("a", "c")
+        self.assertEqual(component.score_calls, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,7 +7,12 @@ src_path = repo_root / "src"
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
-from prompts import RewriteRequest, render_rewrite_prompt
+from prompts import (
+    RewriteRequest,
+    parse_batch_response,
+    render_batch_prompt,
+    render_rewrite_prompt,
+)
 
 
 class RewritePromptLanguageTests(unittest.TestCase):
@@ -32,6 +37,23 @@ class RewritePromptLanguageTests(unittest.TestCase):
         self.assertIn("你是一名忠实改写助手。", prompt)
         self.assertIn("当前分块：", prompt)
 
+    def test_render_rewrite_prompt_reuses_rendering_for_equal_requests(self) -> None:
+        first = render_rewrite_prompt(self._build_request())
+        second = render_rewrite_prompt(self._build_request())
+        self.assertIs(first, second)
+
+
+class BatchPromptTests(unittest.TestCase):
+    def test_render_batch_prompt_tags_each_task(self) -> None:
+        prompt = render_batch_prompt(["first task", "second task"])
+        self.assertIn("<task id=0>\nfirst task\n</task>", prompt)
+        self.assertIn("<task id=1>\nsecond task\n</task>", prompt)
+        self.assertIn("<answer id=K>", prompt)
+
+    def test_parse_batch_response_aligns_answers_by_id(self) -> None:
+        raw = "<answer id=1> beta </answer>\n<answer id=0>alpha</answer><answer id=7>x</answer>"
+        self.assertEqual(parse_batch_response(raw, 3), ["alpha", "beta", None])
+
 
 if __name__ == "__main__":
     unittest.main()
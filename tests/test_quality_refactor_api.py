@@ -16,6 +16,16 @@ class QualityLayerApiTests(unittest.TestCase):
         self.assertAlmostEqual(_token_jaccard("a b", "a c"), 1 / 3)
         self.assertTrue(_words_in_order(["state", "table"], "A state, table keeps context."))
 
+    def test_bounded_token_jaccard_prunes_only_below_threshold(self) -> None:
+        from quality.base import _bounded_token_jaccard, _token_jaccard
+
+        # Sizes 2 vs 6 bound the score by 1/3
+        short, long = "a b", "a b c d e f"
+        self.assertAlmostEqual(_bounded_token_jaccard(short, long, 0.5), 1 / 3)
+        self.assertAlmostEqual(_bounded_token_jaccard(short, long, 0.2), _token_jaccard(short, long))
+        self.assertEqual(_bounded_token_jaccard("a", "", 0.9), 0.0)
+        self.assertEqual(_bounded_token_jaccard("", "", 0.9), 1.0)
+
     def test_quality_package_exports_grouped_api(self) -> None:
         from quality import (
             CompositeFidelityVerifier,